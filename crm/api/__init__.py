@@ -1,9 +1,10 @@
-from bs4 import BeautifulSoup
 import frappe
+from frappe.core.api.file import get_max_file_size
 from frappe.translate import get_all_translations
-from frappe.utils import validate_email_address, split_emails, cstr
+from frappe.utils import cstr, split_emails, validate_email_address
 from frappe.utils.telemetry import POSTHOG_HOST_FIELD, POSTHOG_PROJECT_FIELD
-from frappe.core.api.file import get_max_file_size
+
+from crm.utils.html_extract import extract_div
 
 
 @frappe.whitelist(allow_guest=True)
@@ -38,11 +39,7 @@ def get_user_signature():
 	if not signature:
 		return
 
-	soup = BeautifulSoup(signature, "html.parser")
-	html_signature = soup.find("div", {"class": "ql-editor read-mode"})
-	_signature = None
-	if html_signature:
-		_signature = html_signature.renderContents()
+	_signature = extract_div(signature, "ql-editor read-mode")
 	content = ""
 	if cstr(_signature) or signature:
 		content = f'<br><p class="signature">{signature}</p>'
@@ -1,297 +1,434 @@
+import heapq
 import json
 
 import frappe
-from bs4 import BeautifulSoup
 from frappe import _
-from frappe.desk.form.load import get_docinfo
 from frappe.query_builder import JoinType
-
-from crm.fcrm.doctype.crm_call_log.crm_call_log import parse_call_log
+from frappe.utils import cint, get_datetime, sbool
+
+from crm.api.doc import decode_cursor, encode_cursor
+from crm.fcrm.doctype.crm_activity.crm_activity import get_feed
+from crm.fcrm.doctype.crm_activity_archive.crm_activity_archive import get_archived_sources
+from crm.fcrm.doctype.crm_activity_search.crm_activity_search import search
+from crm.fcrm.doctype.crm_call_log.crm_call_log import parse_call_logs
+from crm.utils.html_extract import extract_first_anchor
+
+# fields whose changes are not shown in the timeline
+AVOID_FIELDS = {
+	"CRM Lead": [
+		"converted",
+		"response_by",
+		"sla_creation",
+		"sla",
+		"first_response_time",
+		"first_responded_on",
+	],
+	"CRM Deal": [
+		"lead",
+		"response_by",
+		"sla_creation",
+		"sla",
+		"first_response_time",
+		"first_responded_on",
+	],
+}
 
 
 @frappe.whitelist()
-def get_activities(name):
+def get_activities(name, since=None, before=None, limit=None, snippets=False):
+	"""
+	Return the timeline, calls, notes, tasks and attachments of a lead or deal.
+
+	The timeline can be loaded in pages: `limit` returns only the newest `limit`
+	activities, `before` the ones older than the oldest activity already shown and
+	`since` only the ones newer than the latest activity the client has. Both take the
+	`cursor` of that activity, a `(creation, name)` position; a plain datetime compares
+	on creation only. Calls, notes, tasks and attachments are not paginated and are left
+	empty when `before` is set.
+
+	With `snippets`, comments and communications come with a plain text `snippet` and
+	`content_length` instead of their content, which is loaded with `get_activity_content`.
+	"""
+	limit = cint(limit) or None
+	snippets = sbool(snippets)
+	since = get_timeline_position(since)
+	before = get_timeline_position(before)
 	if frappe.db.exists("CRM Deal", name):
-		return get_deal_activities(name)
+		return get_deal_activities(name, since, before, limit, snippets)
 	elif frappe.db.exists("CRM Lead", name):
-		return get_lead_activities(name)
+		return get_lead_activities(name, since, before, limit, snippets)
 	else:
 		frappe.throw(_("Document not found"), frappe.DoesNotExistError)
 
 
-def get_deal_activities(name):
-	get_docinfo("", "CRM Deal", name)
-	docinfo = frappe.response["docinfo"]
-	deal_meta = frappe.get_meta("CRM Deal")
-	deal_fields = {
-		field.fieldname: {"label": field.label, "options": field.options} for field in deal_meta.fields
-	}
-	avoid_fields = [
-		"lead",
-		"response_by",
-		"sla_creation",
-		"sla",
-		"first_response_time",
-		"first_responded_on",
-	]
-
+def get_deal_activities(name, since=None, before=None, limit=None, snippets=False):
+	frappe.has_permission("CRM Deal", "read", name, throw=True)
 	doc = frappe.db.get_values("CRM Deal", name, ["creation", "owner", "lead"])[0]
 	lead = doc[2]
 
-	activities = []
+	timelines = [("CRM Deal", name, "converted the lead to this deal" if lead else "created this deal")]
+	if lead:
+		frappe.has_permission("CRM Lead", "read", lead, throw=True)
+		timelines.append(("CRM Lead", lead, "created this lead"))
+
+	activities = get_timeline(timelines, since, before, limit, snippets)
+
 	calls = []
 	notes = []
 	tasks = []
 	attachments = []
-	creation_text = "created this deal"
 
-	if lead:
-		activities, calls, notes, tasks, attachments = get_lead_activities(lead)
-		creation_text = "converted the lead to this deal"
+	if not before:
+		linked = get_linked_records([lead, name] if lead else [name])
+		calls = linked.calls
+		notes = linked.notes
+		tasks = linked.tasks
+		if lead:
+			attachments = get_attachments("CRM Lead", lead)
+		attachments = attachments + get_attachments("CRM Deal", name)
 
-	activities.append(
-		{
-			"activity_type": "creation",
-			"creation": doc[0],
-			"owner": doc[1],
-			"data": creation_text,
-			"is_lead": False,
-		}
-	)
+	return activities, calls, notes, tasks, attachments
 
-	docinfo.versions.reverse()
 
-	for version in docinfo.versions:
-		data = json.loads(version.data)
-		if not data.get("changed"):
-			continue
+def get_lead_activities(name, since=None, before=None, limit=None, snippets=False):
+	frappe.has_permission("CRM Lead", "read", name, throw=True)
 
-		if change := data.get("changed")[0]:
-			field = deal_fields.get(change[0], None)
+	activities = get_timeline([("CRM Lead", name, "created this lead")], since, before, limit, snippets)
 
-			if not field or change[0] in avoid_fields or (not change[1] and not change[2]):
-				continue
+	calls = []
+	notes = []
+	tasks = []
+	attachments = []
 
-			field_label = field.get("label") or change[0]
-			field_option = field.get("options") or None
+	if not before:
+		linked = get_linked_records(name)
+		calls = linked.calls
+		notes = linked.notes
+		tasks = linked.tasks
+		attachments = get_attachments("CRM Lead", name)
+
+	return activities, calls, notes, tasks, attachments
+
+
+def get_timeline(timelines, since=None, before=None, limit=None, snippets=False):
+	"""
+	Build the merged timeline of `timelines`, a list of `(doctype, name, creation_text)`.
+
+	Each timeline is read lazily in pages of `limit` and the timelines are merged with a
+	heap merge, so only as many activities are read as the page needs. The page is
+	extended so that a group of consecutive versions by the same owner is never split.
+	"""
+	activities = heapq.merge(
+		*[iter_timeline(*timeline, since, before, limit, snippets) for timeline in timelines],
+		key=lambda x: x[0],
+		reverse=True,
+	)
+	if not limit:
+		return handle_multiple_versions([activity for _position, activity in activities])
+
+	page = []
+	for _position, activity in activities:
+		if len(page) >= limit and not continues_version_group(page[-1], activity):
+			break
+		page.append(activity)
+
+	return handle_multiple_versions(page)
+
+
+def iter_timeline(doctype, name, creation_text, since=None, before=None, page_length=None, snippets=False):
+	"""
+	Yield `((creation, name), entry)` of the timeline entries of a single lead or deal,
+	newest first, reading `page_length` at a time
+	"""
+	after = None
+	while True:
+		feed = get_feed(doctype, name, since, before, page_length, after)
+		yield from get_timeline_activities(doctype, name, creation_text, feed, snippets)
+
+		if not page_length or len(feed) < page_length:
+			return
+		after = (feed[-1].creation, feed[-1].name)
+
+
+def get_timeline_position(value):
+	"""`(creation, name)` of a timeline entry's `cursor`, or `(creation, None)` of a plain datetime"""
+	if not value:
+		return None
+	if value[:1].isdigit():
+		return get_datetime(value), None
+
+	values = decode_cursor(value)
+	if not isinstance(values, list) or len(values) != 2:
+		frappe.throw(_("Invalid cursor"))
+	return get_datetime(values[0]), values[1]
+
+
+def continues_version_group(previous, activity):
+	"""Same rule as `handle_multiple_versions` uses to group versions"""
+	is_version = activity["activity_type"] in ["changed", "added", "removed"]
+	return is_version and previous.get("owner") and activity["owner"] == previous["owner"]
+
+
+def get_timeline_activities(doctype, name, creation_text, feed, snippets=False):
+	"""
+	Return `((creation, name), entry)` of the timeline entries of a page of CRM Activity
+	`feed`, loading what it points to in bulk. Archived rows are read from the record's
+	CRM Activity Archive, which only happens once the timeline is scrolled back that far.
+	"""
+	is_lead = doctype == "CRM Lead"
+	meta = frappe.get_meta(doctype)
+	fields = {field.fieldname: {"label": field.label, "options": field.options} for field in meta.fields}
+	avoid_fields = AVOID_FIELDS[doctype]
+
+	comments = get_comments(
+		[a.source_name for a in feed if a.activity_type == "comment"], with_content=not snippets
+	)
+	comments.update(get_comments([a.source_name for a in feed if a.activity_type == "attachment_log"]))
+	communications = get_communications(
+		[a.source_name for a in feed if a.activity_type == "communication"], with_content=not snippets
+	)
+	if any(a.archived for a in feed):
+		archived = get_archived_sources(doctype, name)
+		for comment in archived.get("Comment", {}).values():
+			if comment.comment_type == "Comment":
+				comment.content = frappe.utils.markdown(comment.content) if not snippets else None
+			comments.setdefault(comment.name, comment)
+		for communication in archived.get("Communication", {}).values():
+			communications.setdefault(communication.name, communication)
+	comment_attachments = get_bulk_attachments(
+		"Comment", [c.name for c in comments.values() if c.comment_type == "Comment"]
+	)
+	communication_attachments = get_bulk_attachments("Communication", list(communications))
 
-			activity_type = "changed"
-			data = {
-				"field": change[0],
-				"field_label": field_label,
-				"old_value": change[1],
-				"value": change[2],
+	activities = []
+	for activity in feed:
+		entry = None
+		if activity.activity_type == "creation":
+			entry = {
+				"activity_type": "creation",
+				"creation": activity.creation,
+				"owner": activity.owner,
+				"data": creation_text,
+				"is_lead": is_lead,
 			}
 
-			if not change[1] and change[2]:
-				activity_type = "added"
-				data = {
-					"field": change[0],
-					"field_label": field_label,
-					"value": change[2],
+		elif activity.activity_type in ["changed", "added", "removed"]:
+			entry = get_version_activity(activity, fields, avoid_fields, is_lead)
+
+		elif activity.activity_type == "comment":
+			if comment := comments.get(activity.source_name):
+				entry = {
+					"name": comment.name,
+					"activity_type": "comment",
+					"creation": activity.creation,
+					"owner": comment.owner,
+					"attachments": comment_attachments[comment.name],
+					"is_lead": is_lead,
 				}
-			elif change[1] and not change[2]:
-				activity_type = "removed"
+				if snippets:
+					entry.update(snippet=activity.snippet, content_length=activity.content_length)
+				else:
+					entry["content"] = comment.content
+
+		elif activity.activity_type == "communication":
+			if communication := communications.get(activity.source_name):
 				data = {
-					"field": change[0],
-					"field_label": field_label,
-					"value": change[1],
+					"name": communication.name,
+					"subject": communication.subject,
+					"sender_full_name": communication.sender_full_name,
+					"sender": communication.sender,
+					"recipients": communication.recipients,
+					"cc": communication.cc,
+					"bcc": communication.bcc,
+					"attachments": communication_attachments[communication.name],
+					"read_by_recipient": communication.read_by_recipient,
+					"delivery_status": communication.delivery_status,
+				}
+				if snippets:
+					data.update(snippet=activity.snippet, content_length=activity.content_length)
+				else:
+					data["content"] = communication.content
+				entry = {
+					"activity_type": "communication",
+					"communication_type": communication.communication_type,
+					"creation": activity.creation,
+					"data": data,
+					"is_lead": is_lead,
 				}
 
-		activity = {
-			"activity_type": activity_type,
-			"creation": version.creation,
-			"owner": version.owner,
-			"data": data,
-			"is_lead": False,
-			"options": field_option,
-		}
-		activities.append(activity)
-
-	for comment in docinfo.comments:
-		activity = {
-			"name": comment.name,
-			"activity_type": "comment",
-			"creation": comment.creation,
-			"owner": comment.owner,
-			"content": comment.content,
-			"attachments": get_attachments("Comment", comment.name),
-			"is_lead": False,
-		}
-		activities.append(activity)
-
-	for communication in docinfo.communications + docinfo.automated_messages:
-		activity = {
-			"activity_type": "communication",
-			"communication_type": communication.communication_type,
-			"creation": communication.creation,
-			"data": {
-				"subject": communication.subject,
-				"content": communication.content,
-				"sender_full_name": communication.sender_full_name,
-				"sender": communication.sender,
-				"recipients": communication.recipients,
-				"cc": communication.cc,
-				"bcc": communication.bcc,
-				"attachments": get_attachments("Communication", communication.name),
-				"read_by_recipient": communication.read_by_recipient,
-				"delivery_status": communication.delivery_status,
-			},
-			"is_lead": False,
-		}
-		activities.append(activity)
-
-	for attachment_log in docinfo.attachment_logs:
-		activity = {
-			"name": attachment_log.name,
-			"activity_type": "attachment_log",
-			"creation": attachment_log.creation,
-			"owner": attachment_log.owner,
-			"data": parse_attachment_log(attachment_log.content, attachment_log.comment_type),
-			"is_lead": False,
-		}
-		activities.append(activity)
+		elif activity.activity_type == "attachment_log":
+			if attachment_log := comments.get(activity.source_name):
+				entry = {
+					"name": attachment_log.name,
+					"activity_type": "attachment_log",
+					"creation": activity.creation,
+					"owner": attachment_log.owner,
+					"data": parse_attachment_log(attachment_log.content, attachment_log.comment_type),
+					"is_lead": is_lead,
+				}
 
-	calls = calls + get_linked_calls(name).get("calls", [])
-	notes = notes + get_linked_notes(name) + get_linked_calls(name).get("notes", [])
-	tasks = tasks + get_linked_tasks(name) + get_linked_calls(name).get("tasks", [])
-	attachments = attachments + get_attachments("CRM Deal", name)
+		if entry:
+			entry["cursor"] = encode_cursor([activity.creation, activity.name])
+			activities.append(((activity.creation, activity.name), entry))
 
-	activities.sort(key=lambda x: x["creation"], reverse=True)
-	activities = handle_multiple_versions(activities)
+	return activities
 
-	return activities, calls, notes, tasks, attachments
 
+def get_version_activity(activity, fields, avoid_fields, is_lead):
+	"""Return the timeline entry of a field change, or None if the change is not shown"""
+	field = fields.get(activity.field, None)
+	if not field or activity.field in avoid_fields:
+		return
 
-def get_lead_activities(name):
-	get_docinfo("", "CRM Lead", name)
-	docinfo = frappe.response["docinfo"]
-	lead_meta = frappe.get_meta("CRM Lead")
-	lead_fields = {
-		field.fieldname: {"label": field.label, "options": field.options} for field in lead_meta.fields
-	}
-	avoid_fields = [
-		"converted",
-		"response_by",
-		"sla_creation",
-		"sla",
-		"first_response_time",
-		"first_responded_on",
-	]
+	field_label = field.get("label") or activity.field
+	field_option = field.get("options") or None
+	old_value = json.loads(activity.old_value) if activity.old_value else None
+	value = json.loads(activity.value) if activity.value else None
 
-	doc = frappe.db.get_values("CRM Lead", name, ["creation", "owner"])[0]
-	activities = [
-		{
-			"activity_type": "creation",
-			"creation": doc[0],
-			"owner": doc[1],
-			"data": "created this lead",
-			"is_lead": True,
+	data = {
+		"field": activity.field,
+		"field_label": field_label,
+		"old_value": old_value,
+		"value": value,
+	}
+	if activity.activity_type == "added":
+		data = {
+			"field": activity.field,
+			"field_label": field_label,
+			"value": value,
+		}
+	elif activity.activity_type == "removed":
+		data = {
+			"field": activity.field,
+			"field_label": field_label,
+			"value": old_value,
 		}
-	]
 
-	docinfo.versions.reverse()
+	return {
+		"activity_type": activity.activity_type,
+		"creation": activity.creation,
+		"owner": activity.owner,
+		"data": data,
+		"is_lead": is_lead,
+		"options": field_option,
+	}
 
-	for version in docinfo.versions:
-		data = json.loads(version.data)
-		if not data.get("changed"):
-			continue
 
-		if change := data.get("changed")[0]:
-			field = lead_fields.get(change[0], None)
+def get_comments(names, with_content=True):
+	"""Comments and attachment logs by name"""
+	if not names:
+		return {}
 
-			if not field or change[0] in avoid_fields or (not change[1] and not change[2]):
-				continue
+	comments = frappe.get_all(
+		"Comment",
+		filters={"name": ("in", names)},
+		fields=["name", "creation", "owner", "comment_type", *(["content"] if with_content else [])],
+	)
+	if with_content:
+		for comment in comments:
+			if comment.comment_type == "Comment":
+				comment.content = frappe.utils.markdown(comment.content)
+	return {comment.name: comment for comment in comments}
 
-			field_label = field.get("label") or change[0]
-			field_option = field.get("options") or None
 
-			activity_type = "changed"
-			data = {
-				"field": change[0],
-				"field_label": field_label,
-				"old_value": change[1],
-				"value": change[2],
-			}
+def get_communications(names, with_content=True):
+	"""Communications by name"""
+	if not names:
+		return {}
 
-			if not change[1] and change[2]:
-				activity_type = "added"
-				data = {
-					"field": change[0],
-					"field_label": field_label,
-					"value": change[2],
-				}
-			elif change[1] and not change[2]:
-				activity_type = "removed"
-				data = {
-					"field": change[0],
-					"field_label": field_label,
-					"value": change[1],
-				}
+	communications = frappe.get_all(
+		"Communication",
+		filters={"name": ("in", names)},
+		fields=[
+			"name",
+			"communication_type",
+			"creation",
+			"subject",
+			*(["content"] if with_content else []),
+			"sender_full_name",
+			"sender",
+			"recipients",
+			"cc",
+			"bcc",
+			"read_by_recipient",
+			"delivery_status",
+		],
+	)
+	return {communication.name: communication for communication in communications}
 
-		activity = {
-			"activity_type": activity_type,
-			"creation": version.creation,
-			"owner": version.owner,
-			"data": data,
-			"is_lead": True,
-			"options": field_option,
-		}
-		activities.append(activity)
-
-	for comment in docinfo.comments:
-		activity = {
-			"name": comment.name,
-			"activity_type": "comment",
-			"creation": comment.creation,
-			"owner": comment.owner,
-			"content": comment.content,
-			"attachments": get_attachments("Comment", comment.name),
-			"is_lead": True,
-		}
-		activities.append(activity)
-
-	for communication in docinfo.communications + docinfo.automated_messages:
-		activity = {
-			"activity_type": "communication",
-			"communication_type": communication.communication_type,
-			"creation": communication.creation,
-			"data": {
-				"subject": communication.subject,
-				"content": communication.content,
-				"sender_full_name": communication.sender_full_name,
-				"sender": communication.sender,
-				"recipients": communication.recipients,
-				"cc": communication.cc,
-				"bcc": communication.bcc,
-				"attachments": get_attachments("Communication", communication.name),
-				"read_by_recipient": communication.read_by_recipient,
-				"delivery_status": communication.delivery_status,
-			},
-			"is_lead": True,
-		}
-		activities.append(activity)
-
-	for attachment_log in docinfo.attachment_logs:
-		activity = {
-			"name": attachment_log.name,
-			"activity_type": "attachment_log",
-			"creation": attachment_log.creation,
-			"owner": attachment_log.owner,
-			"data": parse_attachment_log(attachment_log.content, attachment_log.comment_type),
-			"is_lead": True,
-		}
-		activities.append(activity)
 
-	calls = get_linked_calls(name).get("calls", [])
-	notes = get_linked_notes(name) + get_linked_calls(name).get("notes", [])
-	tasks = get_linked_tasks(name) + get_linked_calls(name).get("tasks", [])
-	attachments = get_attachments("CRM Lead", name)
+@frappe.whitelist()
+def get_activity_content(doctype, name, reference_doctype, reference_name):
+	"""
+	Full content of a comment or communication shown as a snippet in the timeline of the
+	lead or deal `reference_name`.
+
+	A communication can be on the timelines of several records, so the permission is
+	checked on the record the timeline belongs to, and the content is only returned if
+	it is on that timeline.
+	"""
+	if doctype not in ["Comment", "Communication"]:
+		frappe.throw(_("Content of {0} can not be loaded").format(doctype))
+
+	frappe.has_permission(reference_doctype, "read", reference_name, throw=True)
+
+	activity = frappe.db.get_value(
+		"CRM Activity",
+		{
+			"source_doctype": doctype,
+			"source_name": name,
+			"reference_doctype": reference_doctype,
+			"reference_name": reference_name,
+		},
+		["archived"],
+		as_dict=True,
+	)
+	if not activity:
+		frappe.throw(_("Activity not found"), frappe.DoesNotExistError)
 
-	activities.sort(key=lambda x: x["creation"], reverse=True)
-	activities = handle_multiple_versions(activities)
+	if activity.archived:
+		archived = get_archived_sources(reference_doctype, reference_name)
+		content = (archived.get(doctype, {}).get(name) or {}).get("content")
+	else:
+		content = frappe.db.get_value(doctype, name, "content")
+	if doctype == "Comment":
+		content = frappe.utils.markdown(content)
+	return content
 
-	return activities, calls, notes, tasks, attachments
+
+@frappe.whitelist()
+def search_activities(name, query, limit=20):
+	"""
+	Search the communications, comments, notes and call notes of a lead or deal, and of
+	the lead a deal was converted from, without loading the timeline.
+	"""
+	if frappe.db.exists("CRM Deal", name):
+		frappe.has_permission("CRM Deal", "read", name, throw=True)
+		references = [("CRM Deal", name)]
+		lead = frappe.db.get_value("CRM Deal", name, "lead")
+		if lead:
+			frappe.has_permission("CRM Lead", "read", lead, throw=True)
+			references.append(("CRM Lead", lead))
+	elif frappe.db.exists("CRM Lead", name):
+		frappe.has_permission("CRM Lead", "read", name, throw=True)
+		references = [("CRM Lead", name)]
+	else:
+		frappe.throw(_("Document not found"), frappe.DoesNotExistError)
+
+	return search(references, query, cint(limit) or 20)
+
+
+ATTACHMENT_FIELDS = [
+	"name",
+	"file_name",
+	"file_type",
+	"file_url",
+	"file_size",
+	"is_private",
+	"modified",
+	"creation",
+	"owner",
+]
 
 
 def get_attachments(doctype, name):
@@ -299,22 +436,29 @@ def get_attachments(doctype, name):
 		frappe.db.get_all(
 			"File",
 			filters={"attached_to_doctype": doctype, "attached_to_name": name},
-			fields=[
-				"name",
-				"file_name",
-				"file_type",
-				"file_url",
-				"file_size",
-				"is_private",
-				"modified",
-				"creation",
-				"owner",
-			],
+			fields=ATTACHMENT_FIELDS,
 		)
 		or []
 	)
 
 
+def get_bulk_attachments(doctype, names):
+	"""Return the attachments of all `names` of `doctype` in one query, grouped by name"""
+	attachments = {name: [] for name in names}
+	if not names:
+		return attachments
+
+	files = frappe.db.get_all(
+		"File",
+		filters={"attached_to_doctype": doctype, "attached_to_name": ["in", list(names)]},
+		fields=[*ATTACHMENT_FIELDS, "attached_to_name"],
+	)
+	for file in files:
+		attachments[file.pop("attached_to_name")].append(file)
+
+	return attachments
+
+
 def handle_multiple_versions(versions):
 	activities = []
 	grouped_versions = []
@@ -352,10 +496,31 @@ def parse_grouped_versions(versions):
 	return version
 
 
-def get_linked_calls(name):
+NOTE_FIELDS = ["name", "title", "content", "owner", "modified"]
+TASK_FIELDS = [
+	"name",
+	"title",
+	"description",
+	"assigned_to",
+	"due_date",
+	"priority",
+	"status",
+	"modified",
+]
+
+
+def get_linked_records(names):
+	"""
+	Return the calls, notes and tasks of one or more leads/deals: calls referencing or
+	linked to any of `names`, notes and tasks referencing them and notes and tasks linked
+	to those calls. Everything is resolved in a fixed number of queries.
+	"""
+	if isinstance(names, str):
+		names = [names]
+
 	calls = frappe.db.get_all(
 		"CRM Call Log",
-		filters={"reference_docname": name},
+		filters={"reference_docname": ["in", names]},
 		fields=[
 			"name",
 			"caller",
@@ -374,11 +539,14 @@ def get_linked_calls(name):
 	)
 
 	linked_calls = frappe.db.get_all(
-		"Dynamic Link", filters={"link_name": name, "parenttype": "CRM Call Log"}, pluck="parent"
+		"Dynamic Link",
+		filters={"link_name": ["in", names], "parenttype": "CRM Call Log"},
+		pluck="parent",
+		distinct=True,
 	)
 
-	notes = []
-	tasks = []
+	call_notes = []
+	call_tasks = []
 
 	if linked_calls:
 		CallLog = frappe.qb.DocType("CRM Call Log")
@@ -410,74 +578,39 @@ def get_linked_calls(name):
 
 		for call in _calls:
 			if call.get("link_doctype") == "FCRM Note":
-				notes.append(call.link_name)
+				call_notes.append(call.link_name)
 			elif call.get("link_doctype") == "CRM Task":
-				tasks.append(call.link_name)
+				call_tasks.append(call.link_name)
 
-		_calls = [call for call in _calls if call.get("link_doctype") not in ["FCRM Note", "CRM Task"]]
-		if _calls:
-			calls = calls + _calls
-
-	if notes:
-		notes = frappe.db.get_all(
-			"FCRM Note",
-			filters={"name": ("in", notes)},
-			fields=["name", "title", "content", "owner", "modified"],
-		)
-
-	if tasks:
-		tasks = frappe.db.get_all(
-			"CRM Task",
-			filters={"name": ("in", tasks)},
-			fields=[
-				"name",
-				"title",
-				"description",
-				"assigned_to",
-				"due_date",
-				"priority",
-				"status",
-				"modified",
-			],
-		)
+		# a call linked to both the lead and its deal is only listed once
+		seen = {call.name for call in calls}
+		for call in _calls:
+			if call.get("link_doctype") in ["FCRM Note", "CRM Task"] or call.name in seen:
+				continue
+			seen.add(call.name)
+			calls.append(call)
 
-	calls = [parse_call_log(call) for call in calls] if calls else []
+	notes = get_notes_or_tasks("FCRM Note", NOTE_FIELDS, names, call_notes)
+	tasks = get_notes_or_tasks("CRM Task", TASK_FIELDS, names, call_tasks)
 
-	return {"calls": calls, "notes": notes, "tasks": tasks}
+	calls = parse_call_logs(calls)
 
+	return frappe._dict(calls=calls, notes=notes, tasks=tasks)
 
-def get_linked_notes(name):
-	notes = frappe.db.get_all(
-		"FCRM Note",
-		filters={"reference_docname": name},
-		fields=["name", "title", "content", "owner", "modified"],
-	)
-	return notes or []
 
+def get_notes_or_tasks(doctype, fields, reference_names, linked_names):
+	"""Notes or tasks referencing `reference_names` or named in `linked_names`"""
+	or_filters = {"reference_docname": ["in", reference_names]}
+	if linked_names:
+		or_filters["name"] = ["in", linked_names]
 
-def get_linked_tasks(name):
-	tasks = frappe.db.get_all(
-		"CRM Task",
-		filters={"reference_docname": name},
-		fields=[
-			"name",
-			"title",
-			"description",
-			"assigned_to",
-			"due_date",
-			"priority",
-			"status",
-			"modified",
-		],
-	)
-	return tasks or []
+	return frappe.db.get_all(doctype, or_filters=or_filters, fields=fields) or []
 
 
 def parse_attachment_log(html, type):
-	soup = BeautifulSoup(html, "html.parser")
-	a_tag = soup.find("a")
+	anchor = extract_first_anchor(html)
 	type = "added" if type == "Attachment" else "removed"
-	if not a_tag:
+	if not anchor:
 		return {
 			"type": type,
 			"file_name": html.replace("Removed ", ""),
@@ -485,13 +618,14 @@ def parse_attachment_log(html, type):
 			"is_private": False,
 		}
 
+	file_url, file_name = anchor
 	is_private = False
-	if "private/files" in a_tag["href"]:
+	if "private/files" in file_url:
 		is_private = True
 
 	return {
 		"type": type,
-		"file_name": a_tag.text,
-		"file_url": a_tag["href"],
+		"file_name": file_name,
+		"file_url": file_url,
 		"is_private": is_private,
 	}
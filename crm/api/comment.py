@@ -2,8 +2,9 @@ from collections.abc import Iterable
 
 import frappe
 from frappe import _
-from bs4 import BeautifulSoup
+
 from crm.fcrm.doctype.crm_notification.crm_notification import notify_user
+from crm.utils.html_extract import extract_mentions
 
 
 def on_update(self, method):
@@ -52,18 +53,6 @@ def notify_mentions(doc):
         )
 
 
-def extract_mentions(html):
-    if not html:
-        return []
-    soup = BeautifulSoup(html, "html.parser")
-    mentions = []
-    for d in soup.find_all("span", attrs={"data-type": "mention"}):
-        mentions.append(
-            frappe._dict(full_name=d.get("data-label"), email=d.get("data-id"))
-        )
-    return mentions
-
-
 @frappe.whitelist()
 def add_attachments(name: str, attachments: Iterable[str | dict]) -> None:
     """Add attachments to the given Comment
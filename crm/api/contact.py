@@ -1,11 +1,19 @@
 import frappe
 from frappe import _
 
+from crm.utils import get_normalized_phone_number
+
 
 def validate(doc, method):
+	set_normalized_phone_numbers(doc)
 	update_deals_email_mobile_no(doc)
 
 
+def set_normalized_phone_numbers(doc):
+	for phone in doc.phone_nos:
+		phone.normalized_phone = get_normalized_phone_number(phone.phone)
+
+
 def update_deals_email_mobile_no(doc):
 	linked_deals = frappe.get_all(
 		"CRM Contacts",
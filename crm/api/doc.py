@@ -1,15 +1,45 @@
+import base64
+import hashlib
 import json
 
 import frappe
 from frappe import _
 from frappe.custom.doctype.property_setter.property_setter import make_property_setter
-from frappe.model import no_value_fields
+from frappe.model import default_fields, no_value_fields, optional_fields
 from frappe.model.document import get_controller
-from frappe.utils import make_filter_tuple
+from frappe.utils import cint, cstr, make_filter_tuple, sbool
 from pypika import Criterion
 
 from crm.api.views import get_views
+from crm.fcrm.doctype.crm_activity_counter.crm_activity_counter import (
+	ACTIVITY_COUNTER_DOCTYPES,
+	get_activity_counts,
+	is_counter_cache_enabled,
+)
 from crm.fcrm.doctype.crm_form_script.crm_form_script import get_form_script
+from crm.utils.instrumentation import checkpoint
+
+# list/kanban counts of these doctypes are cached and invalidated from their doc events
+COUNT_CACHE_DOCTYPES = ("CRM Lead", "CRM Deal")
+COUNT_CACHE_TTL = 5 * 60
+
+# standard columns that are never NULL, so that cursors on them can be compared as tuples
+NOT_NULL_SEEK_FIELDS = ("name", "creation", "modified")
+
+STANDARD_LIST_FIELDS = [
+	{"label": "Name", "fieldtype": "Data", "fieldname": "name"},
+	{"label": "Created On", "fieldtype": "Datetime", "fieldname": "creation"},
+	{"label": "Last Modified", "fieldtype": "Datetime", "fieldname": "modified"},
+	{
+		"label": "Modified By",
+		"fieldtype": "Link",
+		"fieldname": "modified_by",
+		"options": "User",
+	},
+	{"label": "Assigned To", "fieldtype": "Text", "fieldname": "_assign"},
+	{"label": "Owner", "fieldtype": "Link", "fieldname": "owner", "options": "User"},
+	{"label": "Like", "fieldtype": "Data", "fieldname": "_liked_by"},
+]
 
 
 @frappe.whitelist()
@@ -280,15 +310,20 @@ def get_data(
 	page_length_count=20,
 	column_field=None,
 	title_field=None,
-	columns=[],
-	rows=[],
-	kanban_columns=[],
-	kanban_fields=[],
+	columns=None,
+	rows=None,
+	kanban_columns=None,
+	kanban_fields=None,
 	view=None,
 	default_filters=None,
+	use_cursor=False,
+	cursor=None,
+	meta_version=None,
 ):
 	custom_view = False
-	filters = frappe._dict(filters)
+	filters = get_list_filters(filters, default_filters)
+	use_cursor = sbool(use_cursor) or bool(cursor)
+	next_cursor = None
 	rows = frappe.parse_json(rows or "[]")
 	columns = frappe.parse_json(columns or "[]")
 	kanban_fields = frappe.parse_json(kanban_fields or "[]")
@@ -297,22 +332,10 @@ def get_data(
 	custom_view_name = view.get("custom_view_name") if view else None
 	view_type = view.get("view_type") if view else None
 	group_by_field = view.get("group_by_field") if view else None
+	if group_by_field:
+		validate_list_field(doctype, group_by_field)
 
-	for key in filters:
-		value = filters[key]
-		if isinstance(value, list):
-			if "@me" in value:
-				value[value.index("@me")] = frappe.session.user
-			elif "%@me%" in value:
-				index = [i for i, v in enumerate(value) if v == "%@me%"]
-				for i in index:
-					value[i] = "%" + frappe.session.user + "%"
-		elif value == "@me":
-			filters[key] = frappe.session.user
-
-	if default_filters:
-		default_filters = frappe.parse_json(default_filters)
-		filters.update(default_filters)
+	checkpoint("filters")
 
 	is_default = True
 	data = []
@@ -373,17 +396,28 @@ def get_data(
 		if group_by_field and group_by_field not in rows:
 			rows.append(group_by_field)
 
-		data = (
-			frappe.get_list(
-				doctype,
-				fields=rows,
-				filters=filters,
-				order_by=order_by,
-				page_length=page_length,
+		checkpoint("view_settings")
+
+		if use_cursor:
+			add_order_by_fields(doctype, rows, order_by)
+			data, next_cursor = get_list_after_cursor(
+				doctype, rows, filters, order_by, cint(page_length), cursor
 			)
-			or []
-		)
+		else:
+			data = (
+				frappe.get_list(
+					doctype,
+					fields=rows,
+					filters=filters,
+					order_by=order_by,
+					page_length=page_length,
+				)
+				or []
+			)
+		checkpoint("get_list")
+
 		data = parse_list_data(data, doctype)
+		checkpoint("parse_list_data")
 
 	if view_type == "kanban":
 		if not rows:
@@ -417,6 +451,18 @@ def get_data(
 			if field not in rows:
 				rows.append(field)
 
+		if use_cursor:
+			add_order_by_fields(doctype, rows, order_by)
+
+		checkpoint("view_settings")
+
+		# counts of all columns come from one grouped (and cached) query
+		counts = get_list_counts(doctype, filters, column_field)
+		checkpoint("counts")
+
+		# load cards of all plain columns in one windowed query instead of one query per column
+		windowed_data = get_kanban_data(doctype, rows, filters, order_by, column_field, kanban_columns)
+
 		for kc in kanban_columns:
 			# Start with base filters
 			column_filters = []
@@ -436,10 +482,22 @@ def get_data(
 			else:
 				page_length = kc.get("page_length", 20)
 
-				if order:
+				column_cursor = None
+
+				if use_cursor and order:
+					column_data, column_cursor = get_records_based_on_order_after_cursor(
+						doctype, rows, column_filters, cint(page_length), order, kc.get("cursor")
+					)
+				elif use_cursor and kc.get("cursor"):
+					column_data, column_cursor = get_list_after_cursor(
+						doctype, rows, column_filters, order_by, cint(page_length), kc.get("cursor")
+					)
+				elif order:
 					column_data = get_records_based_on_order(
 						doctype, rows, column_filters, page_length, order
 					)
+				elif kc.get("name") in windowed_data:
+					column_data = windowed_data[kc.get("name")]
 				else:
 					column_data = frappe.get_list(
 						doctype,
@@ -449,11 +507,15 @@ def get_data(
 						page_length=page_length,
 					)
 
-				all_count = frappe.get_list(
-					doctype,
-					filters=column_filters,
-					fields="count(*) as total_count",
-				)[0].total_count
+				if use_cursor:
+					if not (order or kc.get("cursor")):
+						column_cursor = get_next_cursor(doctype, column_data, order_by, cint(page_length))
+					kc["next_cursor"] = column_cursor
+
+				if column_field and kc.get("name"):
+					all_count = counts.group_counts.get(kc.get("name"), 0)
+				else:
+					all_count = counts.total_count
 
 				kc["all_count"] = all_count
 				kc["count"] = len(column_data)
@@ -466,55 +528,37 @@ def get_data(
 
 			data.append({"column": kc, "fields": kanban_fields, "data": column_data})
 
-	fields = frappe.get_meta(doctype).fields
-	fields = [field for field in fields if field.fieldtype not in no_value_fields]
-	fields = [
-		{
-			"label": _(field.label),
-			"fieldtype": field.fieldtype,
-			"fieldname": field.fieldname,
-			"options": field.options,
-		}
-		for field in fields
-		if field.label and field.fieldname
-	]
+		checkpoint("get_list")
 
-	std_fields = [
-		{"label": "Name", "fieldtype": "Data", "fieldname": "name"},
-		{"label": "Created On", "fieldtype": "Datetime", "fieldname": "creation"},
-		{"label": "Last Modified", "fieldtype": "Datetime", "fieldname": "modified"},
-		{
-			"label": "Modified By",
-			"fieldtype": "Link",
-			"fieldname": "modified_by",
-			"options": "User",
-		},
-		{"label": "Assigned To", "fieldtype": "Text", "fieldname": "_assign"},
-		{"label": "Owner", "fieldtype": "Link", "fieldname": "owner", "options": "User"},
-		{"label": "Like", "fieldtype": "Data", "fieldname": "_liked_by"},
-	]
+		# only with the counter table, where decorating all cards is a single lookup
+		if doctype in ACTIVITY_COUNTER_DOCTYPES and is_counter_cache_enabled():
+			set_activity_counts([d for column in data for d in column["data"]], doctype)
+			checkpoint("activity_counts")
 
-	for field in std_fields:
+	list_meta = get_list_meta(doctype, view_type)
+	fields = list_meta.fields
+	checkpoint("list_meta")
+
+	for field in STANDARD_LIST_FIELDS:
 		if field.get("fieldname") not in rows:
 			rows.append(field.get("fieldname"))
-		if field not in fields:
-			field["label"] = _(field["label"])
-			fields.append(field)
+
+	if view_type != "kanban":
+		counts = get_list_counts(doctype, filters)
+		checkpoint("counts")
 
 	if not is_default and custom_view_name:
 		is_default = frappe.db.get_value("CRM View Settings", custom_view_name, "load_default_columns")
 
 	if group_by_field and view_type == "group_by":
+		# group headings and their counts come from the whole filtered set, not just this page
+		group_counts = get_group_by_counts(doctype, filters, group_by_field)
 
 		def get_options(type, options):
 			if type == "Select":
 				return [option for option in options.split("\n")]
 			else:
-				has_empty_values = any([not d.get(group_by_field) for d in data])
-				options = list(set([d.get(group_by_field) for d in data]))
-				options = [u for u in options if u]
-				if has_empty_values:
-					options.append("")
+				options = list(group_counts)
 
 				if order_by and group_by_field in order_by:
 					order_by_fields = order_by.split(",")
@@ -522,11 +566,11 @@ def get_data(
 						(field.split(" ")[0], field.split(" ")[1]) for field in order_by_fields
 					]
 					if (group_by_field, "asc") in order_by_fields:
-						options.sort()
+						options.sort(key=empty_first)
 					elif (group_by_field, "desc") in order_by_fields:
-						options.sort(reverse=True)
+						options.sort(key=empty_first, reverse=True)
 				else:
-					options.sort()
+					options.sort(key=empty_first)
 				return options
 
 		for field in fields:
@@ -536,9 +580,12 @@ def get_data(
 					"fieldname": field.get("fieldname"),
 					"fieldtype": field.get("fieldtype"),
 					"options": get_options(field.get("fieldtype"), field.get("options")),
+					"counts": {cstr(value): count for value, count in group_counts.items()},
 				}
 
-	return {
+		checkpoint("group_by")
+
+	response = {
 		"data": data,
 		"columns": columns,
 		"rows": rows,
@@ -551,15 +598,234 @@ def get_data(
 		"page_length": page_length,
 		"page_length_count": page_length_count,
 		"is_default": is_default,
-		"views": get_views(doctype),
-		"total_count": frappe.get_list(doctype, filters=filters, fields="count(*) as total_count")[
-			0
-		].total_count,
+		"views": list_meta.views,
+		"total_count": counts.total_count,
 		"row_count": len(data),
+		"next_cursor": next_cursor,
+		"form_script": list_meta.form_script,
+		"list_script": list_meta.list_script,
+		"view_type": view_type,
+		"meta_version": list_meta.version,
+	}
+
+	# client already holds this version of the metadata
+	if meta_version and meta_version == list_meta.version:
+		for key in ("fields", "views", "form_script", "list_script"):
+			response.pop(key)
+
+	return response
+
+
+def get_group_by_counts(doctype, filters, group_by_field):
+	"""
+	Return `{value: count}` of `group_by_field` over all records matching `filters`,
+	empty values as `""`. `filters` are expected as returned by `get_list_filters`.
+	"""
+	group_counts = {}
+	for value, count in get_list_counts(doctype, filters, group_by_field).group_counts.items():
+		value = value if value not in (None, "") else ""
+		group_counts[value] = group_counts.get(value, 0) + count
+	return group_counts
+
+
+def empty_first(value):
+	return (value != "", value)
+
+
+@frappe.whitelist()
+def get_group_by_data(
+	doctype: str,
+	filters: dict,
+	order_by: str,
+	group_by_field: str,
+	group_value=None,
+	rows=None,
+	page_length=20,
+	cursor=None,
+	default_filters=None,
+):
+	"""
+	Return one page of the records of a single group in `group_by` view.
+
+	Lets the client load the records of a group only when it is expanded, using
+	keyset pagination for the following pages. `filters` and `default_filters` are
+	applied as in `get_data`, so that the records match the counts of the group.
+	"""
+	validate_list_field(doctype, group_by_field)
+	filters = get_list_filters(frappe.parse_json(filters or "{}"), default_filters)
+	rows = frappe.parse_json(rows or "[]")
+	if not rows:
+		_list = get_controller(doctype)
+		rows = _list.default_list_data().get("rows") if hasattr(_list, "default_list_data") else ["name"]
+
+	group_filters = convert_filter_to_tuple(doctype, filters)
+	if group_value:
+		group_filters.append([doctype, group_by_field, "=", group_value])
+	else:
+		group_filters.append([doctype, group_by_field, "is", "not set"])
+
+	rows = list(rows)
+	add_order_by_fields(doctype, rows, order_by)
+	data, next_cursor = get_list_after_cursor(
+		doctype, rows, group_filters, order_by, cint(page_length), cursor
+	)
+
+	return {
+		"data": parse_list_data(data, doctype),
+		"group_value": group_value or "",
+		"next_cursor": next_cursor,
+	}
+
+
+def get_list_meta(doctype, view_type=None):
+	"""
+	Return the static part of the `get_data` response: fields, views and form scripts.
+
+	The result is cached per doctype, view type and user, and is rebuilt when the
+	version changes, i.e. when the doctype meta, its customizations, CRM View Settings
+	or CRM Form Script of the doctype are modified.
+
+	:return: `frappe._dict(version, fields, views, form_script, list_script)`
+	"""
+	version = get_list_meta_version(doctype)
+	cache_key = f"crm:list_meta:{doctype}:{view_type or 'list'}:{frappe.session.user}"
+	list_meta = frappe.cache.get_value(cache_key)
+	if list_meta and list_meta.get("version") == version:
+		return frappe._dict(list_meta)
+
+	fields = frappe.get_meta(doctype).fields
+	fields = [field for field in fields if field.fieldtype not in no_value_fields]
+	fields = [
+		{
+			"label": _(field.label),
+			"fieldtype": field.fieldtype,
+			"fieldname": field.fieldname,
+			"options": field.options,
+		}
+		for field in fields
+		if field.label and field.fieldname
+	]
+
+	for field in STANDARD_LIST_FIELDS:
+		if field not in fields:
+			field = field.copy()
+			field["label"] = _(field["label"])
+			fields.append(field)
+
+	checkpoint("fields")
+
+	views = get_views(doctype)
+	checkpoint("views")
+
+	list_meta = {
+		"version": version,
+		"fields": fields,
+		"views": views,
 		"form_script": get_form_script(doctype),
 		"list_script": get_form_script(doctype, "List"),
-		"view_type": view_type,
 	}
+	checkpoint("form_scripts")
+	frappe.cache.set_value(cache_key, list_meta)
+
+	return frappe._dict(list_meta)
+
+
+def get_list_meta_version(doctype):
+	meta = frappe.get_meta(doctype)
+	version = frappe.cache.get_value(f"crm:list_meta_version:{doctype}") or ""
+	return hashlib.sha1(f"{meta.modified}:{version}:{frappe.local.lang}".encode()).hexdigest()[:16]
+
+
+def clear_list_meta_cache(doc, method=None):
+	"""Invalidate cached list metadata of the doctype `doc` belongs to, called from doc events"""
+	doctype = doc.get("dt") or doc.get("doc_type")
+	if doctype:
+		frappe.cache.set_value(f"crm:list_meta_version:{doctype}", frappe.generate_hash(length=10))
+
+
+def get_list_filters(filters, default_filters=None):
+	"""Return `filters` of a list request with `@me` replaced and the view's `default_filters` added"""
+	filters = frappe._dict(filters)
+	replace_me_in_filters(filters)
+
+	if default_filters:
+		filters.update(frappe.parse_json(default_filters))
+
+	return filters
+
+
+def replace_me_in_filters(filters):
+	"""Replace `@me` in filter values with the session user"""
+	for key in filters:
+		value = filters[key]
+		if isinstance(value, list):
+			if "@me" in value:
+				value[value.index("@me")] = frappe.session.user
+			elif "%@me%" in value:
+				index = [i for i, v in enumerate(value) if v == "%@me%"]
+				for i in index:
+					value[i] = "%" + frappe.session.user + "%"
+		elif value == "@me":
+			filters[key] = frappe.session.user
+	return filters
+
+
+def get_list_counts(doctype, filters, group_by=None):
+	"""
+	Return the total count of records matching `filters` and, if `group_by` is set,
+	the count per `group_by` value, both computed with a single grouped query.
+
+	Results are cached per doctype, filters and user for doctypes listed in
+	`COUNT_CACHE_DOCTYPES`, until a record of that doctype changes.
+
+	:return: `frappe._dict(total_count=int, group_counts={value: int})`
+	"""
+	cache_key = None
+	if doctype in COUNT_CACHE_DOCTYPES:
+		cache_key = get_list_counts_cache_key(doctype, filters, group_by)
+		if (counts := frappe.cache.get_value(cache_key)) is not None:
+			return frappe._dict(counts)
+
+	if group_by:
+		validate_list_field(doctype, group_by)
+		result = frappe.get_list(
+			doctype,
+			filters=filters,
+			fields=[f"`tab{doctype}`.`{group_by}` as group_value", "count(*) as total_count"],
+			group_by=f"`tab{doctype}`.`{group_by}`",
+			order_by=f"`tab{doctype}`.`{group_by}` asc",
+		)
+		group_counts = {d.group_value: d.total_count for d in result}
+		total_count = sum(group_counts.values())
+	else:
+		group_counts = {}
+		total_count = frappe.get_list(doctype, filters=filters, fields="count(*) as total_count")[
+			0
+		].total_count
+
+	counts = {"total_count": total_count, "group_counts": group_counts}
+	if cache_key:
+		frappe.cache.set_value(cache_key, counts, expires_in_sec=COUNT_CACHE_TTL)
+
+	return frappe._dict(counts)
+
+
+def get_list_counts_cache_key(doctype, filters, group_by=None):
+	version = frappe.cache.get_value(f"crm:list_counts_version:{doctype}") or 0
+	filters_hash = hashlib.sha1(
+		json.dumps([filters, group_by], sort_keys=True, default=str).encode()
+	).hexdigest()
+	return f"crm:list_counts:{doctype}:{version}:{frappe.session.user}:{filters_hash}"
+
+
+def clear_list_counts_cache(doc, method=None):
+	"""
+	Invalidate cached list counts of `doc.doctype`, called from doc events. For a ToDo
+	the counts of its reference doctype are invalidated, as assignments change `_assign`.
+	"""
+	doctype = doc.reference_type if doc.doctype == "ToDo" else doc.doctype
+	if doctype in COUNT_CACHE_DOCTYPES:
+		frappe.cache.set_value(f"crm:list_counts_version:{doctype}", frappe.generate_hash(length=10))
 
 
 def parse_list_data(data, doctype):
@@ -578,6 +844,284 @@ def convert_filter_to_tuple(doctype, filters):
 	return filters
 
 
+def get_kanban_data(doctype, rows, filters, order_by, column_field, kanban_columns):
+	"""
+	Fetch the top `page_length` records of every kanban column with a single query.
+
+	Records are ranked per `column_field` value with a window function over the same
+	permission-aware query `frappe.get_list` would build. Columns with a custom card
+	order, deleted columns and columns without a value are left to the caller.
+
+	:return: dict of column name -> list of records
+	"""
+	if not column_field:
+		return {}
+
+	page_lengths = {}
+	for kc in kanban_columns:
+		if kc.get("delete") or kc.get("order") or kc.get("cursor") or not kc.get("name"):
+			continue
+		page_lengths[kc.get("name")] = cint(kc.get("page_length", 20))
+
+	if not page_lengths:
+		return {}
+
+	# interpolated into the window expression, so it has to be a column of the doctype
+	validate_list_field(doctype, column_field)
+
+	table = f"`tab{doctype}`"
+	fields = list(rows)
+	if column_field not in fields:
+		fields.append(column_field)
+
+	column_filters = convert_filter_to_tuple(doctype, filters) if filters else []
+	column_filters = list(column_filters)
+	column_filters.append([doctype, column_field, "in", list(page_lengths)])
+
+	# ranks must be unique within a column for the cards to match paging by `get_list`
+	order_by = add_name_tiebreaker(order_by or "modified desc")
+	window_order_by = qualify_order_by(doctype, order_by)
+	fields.append(
+		f"row_number() over (partition by {table}.`{column_field}` order by {window_order_by}) as _kanban_rank"
+	)
+
+	query = frappe.get_list(
+		doctype,
+		fields=fields,
+		filters=column_filters,
+		order_by=window_order_by,
+		page_length=0,
+		run=0,
+	)
+	records = frappe.db.sql(
+		f"""select * from ({query}) as _kanban where _kanban._kanban_rank <= %(max_rank)s
+		order by _kanban._kanban_rank, _kanban.name""",
+		{"max_rank": max(page_lengths.values())},
+		as_dict=True,
+	)
+
+	data = {name: [] for name in page_lengths}
+	for record in records:
+		column = record.get(column_field)
+		if column not in data or record.pop("_kanban_rank") > page_lengths[column]:
+			continue
+		if column_field not in rows:
+			record.pop(column_field, None)
+		data[column].append(record)
+
+	return data
+
+
+def validate_list_field(doctype, fieldname):
+	"""Throw unless `fieldname` is a field or a standard column of `doctype`"""
+	if fieldname in (*default_fields, *optional_fields) or frappe.get_meta(doctype).has_field(fieldname):
+		return
+	frappe.throw(_("Invalid field {0} for {1}").format(fieldname, doctype))
+
+
+def qualify_order_by(doctype, order_by):
+	"""Prefix plain fieldnames in `order_by` with the doctype table, e.g. `modified desc`"""
+	_order_by = []
+	for part in order_by.split(","):
+		part = part.strip()
+		if not part:
+			continue
+		fieldname, _sep, direction = part.partition(" ")
+		if "`" not in fieldname and "." not in fieldname and "(" not in fieldname:
+			fieldname = f"`tab{doctype}`.`{fieldname}`"
+		_order_by.append(f"{fieldname} {direction}".strip())
+	return ", ".join(_order_by)
+
+
+def add_name_tiebreaker(order_by):
+	"""Append `name` to `order_by`, in the direction of its last key, unless it is ordered by name"""
+	parts = [part.strip() for part in order_by.split(",") if part.strip()]
+	fieldnames = [part.partition(" ")[0].replace("`", "").split(".")[-1] for part in parts]
+	if "name" in fieldnames:
+		return order_by
+
+	direction = "asc" if parts and parts[-1].partition(" ")[2].strip().lower() == "asc" else "desc"
+	return ", ".join([*parts, f"name {direction}"])
+
+
+def get_order_by_keys(doctype, order_by):
+	"""
+	Return `order_by` as a list of `(fieldname, direction)` with `name` as the final
+	tie breaker, so that the keys identify a unique position in the result.
+	"""
+	meta = frappe.get_meta(doctype)
+	keys = []
+	for part in (order_by or "modified desc").split(","):
+		part = part.strip()
+		if not part:
+			continue
+		fieldname, _sep, direction = part.partition(" ")
+		fieldname = fieldname.replace("`", "").split(".")[-1]
+		direction = "asc" if direction.strip().lower() == "asc" else "desc"
+		if not meta.has_field(fieldname) and fieldname not in (*default_fields, *optional_fields):
+			frappe.throw(_("Cannot paginate by {0}").format(fieldname))
+		keys.append((fieldname, direction))
+
+	if "name" not in [key[0] for key in keys]:
+		keys.append(("name", keys[-1][1] if keys else "desc"))
+
+	return keys
+
+
+def add_order_by_fields(doctype, rows, order_by):
+	for fieldname, _direction in get_order_by_keys(doctype, order_by):
+		if fieldname not in rows:
+			rows.append(fieldname)
+
+
+def encode_cursor(value):
+	return base64.urlsafe_b64encode(json.dumps(value, default=str).encode()).decode()
+
+
+def decode_cursor(cursor):
+	try:
+		return json.loads(base64.urlsafe_b64decode(cursor.encode()))
+	except Exception:
+		frappe.throw(_("Invalid cursor"))
+
+
+def get_next_cursor(doctype, records, order_by, page_length):
+	"""Return the cursor pointing after the last record, or None if `records` is not a full page"""
+	if not records or len(records) < page_length:
+		return None
+	keys = get_order_by_keys(doctype, order_by)
+	return encode_cursor({"values": [records[-1].get(fieldname) for fieldname, _direction in keys]})
+
+
+def get_seek_condition(keys, values, alias):
+	"""
+	Build the keyset predicate selecting rows that come after `values` in `keys` order.
+
+	Keys of one direction that can not be NULL are compared as a tuple, e.g.
+	`(modified, name) < (%s, %s)`. Otherwise the predicate is expanded key by key and
+	follows MariaDB ordering where NULLs sort first in ascending and last in
+	descending order.
+	"""
+	directions = {direction for _fieldname, direction in keys}
+	if (
+		len(directions) == 1
+		and None not in values
+		and all(fieldname in NOT_NULL_SEEK_FIELDS for fieldname, _direction in keys)
+	):
+		operator = "<" if "desc" in directions else ">"
+		columns = ", ".join(f"{alias}.`{fieldname}`" for fieldname, _direction in keys)
+		params = {f"_seek_{i}": value for i, value in enumerate(values)}
+		placeholders = ", ".join(f"%({param})s" for param in params)
+		return f"(({columns}) {operator} ({placeholders}))", params
+
+	conditions = []
+	params = {}
+	equal_conditions = []
+	for i, ((fieldname, direction), value) in enumerate(zip(keys, values, strict=True)):
+		column = f"{alias}.`{fieldname}`"
+		param = f"_seek_{i}"
+		params[param] = value
+
+		if value is None:
+			after = "0 = 1" if direction == "desc" else f"{column} is not null"
+			equal = f"{column} is null"
+		else:
+			if direction == "desc":
+				after = f"({column} < %({param})s or {column} is null)"
+			else:
+				after = f"{column} > %({param})s"
+			equal = f"{column} = %({param})s"
+
+		conditions.append("(" + " and ".join([*equal_conditions, after]) + ")")
+		equal_conditions.append(equal)
+
+	return "(" + " or ".join(conditions) + ")", params
+
+
+def get_list_after_cursor(doctype, fields, filters, order_by, page_length, cursor=None):
+	"""
+	Fetch the page of `page_length` records that follows `cursor` (keyset pagination).
+
+	Unlike increasing `page_length`, only the requested page is read, using a seek
+	predicate on the `order_by` keys plus `name`.
+
+	:return: records and the cursor for the next page
+	"""
+	keys = get_order_by_keys(doctype, order_by)
+	fields = list(dict.fromkeys(fields))
+	for fieldname, _direction in keys:
+		if fieldname not in fields:
+			fields.append(fieldname)
+
+	query = frappe.get_list(
+		doctype,
+		fields=fields,
+		filters=filters,
+		order_by=qualify_order_by(doctype, order_by or "modified desc"),
+		page_length=0,
+		run=0,
+	)
+
+	condition, params = "", {}
+	if cursor:
+		values = decode_cursor(cursor).get("values") or []
+		if len(values) != len(keys):
+			frappe.throw(_("Invalid cursor"))
+		condition, params = get_seek_condition(keys, values, "_page")
+		condition = f"where {condition}"
+
+	params["page_length"] = page_length
+	outer_order_by = ", ".join(f"_page.`{fieldname}` {direction}" for fieldname, direction in keys)
+	records = frappe.db.sql(
+		f"select * from ({query}) as _page {condition} order by {outer_order_by} limit %(page_length)s",
+		params,
+		as_dict=True,
+	)
+
+	return records, get_next_cursor(doctype, records, order_by, page_length)
+
+
+def get_records_based_on_order_after_cursor(doctype, rows, filters, page_length, order, cursor=None):
+	"""
+	Cursor variant of `get_records_based_on_order`.
+
+	Records named in `order` are returned first, in that order, followed by the
+	remaining records by `creation desc`. The cursor tracks the position in `order`
+	and then the keyset position in the remaining records.
+
+	:return: records and the cursor for the next page
+	"""
+	filters = convert_filter_to_tuple(doctype, filters)
+	state = decode_cursor(cursor) if cursor else {}
+	index = state.get("index", 0)
+	values = state.get("values")
+	records = []
+
+	# walk the manual order, skipping names filtered out
+	while values is None and index < len(order) and len(records) < page_length:
+		names = order[index : index + page_length - len(records)]
+		index += len(names)
+		in_filters = [*filters, [doctype, "name", "in", names]]
+		fields = list(dict.fromkeys([*rows, "name"]))
+		found = {
+			d.name: d for d in frappe.get_list(doctype, fields=fields, filters=in_filters, page_length=0)
+		}
+		records.extend(found[name] for name in names if name in found)
+
+	if len(records) < page_length:
+		not_in_filters = [*filters, [doctype, "name", "not in", order]] if order else filters
+		remaining_cursor = encode_cursor({"values": values}) if values else None
+		remaining_records, next_cursor = get_list_after_cursor(
+			doctype, rows, not_in_filters, "creation desc", page_length - len(records), remaining_cursor
+		)
+		records.extend(remaining_records)
+		if not next_cursor:
+			return records, None
+		return records, encode_cursor({"index": index, **decode_cursor(next_cursor)})
+
+	return records, encode_cursor({"index": index, "values": None})
+
+
 def get_records_based_on_order(doctype, rows, filters, page_length, order):
 	records = []
 	filters = convert_filter_to_tuple(doctype, filters)
@@ -696,33 +1240,16 @@ def get_fields(doctype: str, allow_all_fieldtypes: bool = False):
 
 
 def getCounts(d, doctype):
-	d["_email_count"] = (
-		frappe.db.count(
-			"Communication",
-			filters={
-				"reference_doctype": doctype,
-				"reference_name": d.get("name"),
-				"communication_type": "Communication",
-			},
-		)
-		or 0
-	)
-	d["_email_count"] = d["_email_count"] + frappe.db.count(
-		"Communication",
-		filters={
-			"reference_doctype": doctype,
-			"reference_name": d.get("name"),
-			"communication_type": "Automated Message",
-		},
-	)
-	d["_comment_count"] = frappe.db.count(
-		"Comment",
-		filters={"reference_doctype": doctype, "reference_name": d.get("name"), "comment_type": "Comment"},
-	)
-	d["_task_count"] = frappe.db.count(
-		"CRM Task", filters={"reference_doctype": doctype, "reference_docname": d.get("name")}
-	)
-	d["_note_count"] = frappe.db.count(
-		"FCRM Note", filters={"reference_doctype": doctype, "reference_docname": d.get("name")}
-	)
-	return d
+	return set_activity_counts([d], doctype)[0]
+
+
+def set_activity_counts(data, doctype):
+	"""Set `_email_count`, `_comment_count`, `_task_count` and `_note_count` on all rows of `data` in bulk"""
+	counts = get_activity_counts(doctype, [d.get("name") for d in data])
+	for d in data:
+		_counts = counts.get(d.get("name")) or {}
+		d["_email_count"] = _counts.get("email_count", 0)
+		d["_comment_count"] = _counts.get("comment_count", 0)
+		d["_task_count"] = _counts.get("task_count", 0)
+		d["_note_count"] = _counts.get("note_count", 0)
+	return data
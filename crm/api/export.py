@@ -0,0 +1,186 @@
+import csv
+import io
+import json
+import os
+import tempfile
+
+import frappe
+from frappe import _
+from frappe.model.document import get_controller
+from frappe.utils import cint, now_datetime, sbool
+from werkzeug.wrappers import Response
+from werkzeug.wsgi import FileWrapper
+
+from crm.api.doc import get_list_after_cursor, get_list_filters, parse_list_data
+
+EXPORT_CHUNK_SIZE = 1000
+# exports up to this size are spooled in memory, larger ones in a temporary file
+EXPORT_SPOOL_SIZE = 8 * 1024 * 1024
+EXPORT_FORMATS = {
+	"CSV": ("csv", "text/csv"),
+	"JSONL": ("jsonl", "application/x-ndjson"),
+}
+
+
+@frappe.whitelist()
+def export_data(
+	doctype: str,
+	filters=None,
+	order_by=None,
+	columns=None,
+	file_format="CSV",
+	to_file=False,
+	default_filters=None,
+):
+	"""
+	Export the records of a list view as CSV or JSON Lines.
+
+	Takes the same `doctype`, `filters`, `order_by` and `columns` as `crm.api.doc.get_data`.
+	Records are read and written in chunks within the request, so memory use does not
+	grow with the row count, and the spooled result is streamed back. With `to_file`
+	the export runs in the background and is saved as a private File, the user is
+	notified with `crm_export_ready` when it is done.
+	"""
+	frappe.has_permission(doctype, "export", throw=True)
+	if file_format not in EXPORT_FORMATS:
+		frappe.throw(_("Unsupported export format {0}").format(file_format))
+
+	filters = get_list_filters(frappe.parse_json(filters or "{}"), default_filters)
+
+	columns = frappe.parse_json(columns or "[]")
+	order_by = order_by or "modified desc"
+
+	if sbool(to_file):
+		frappe.enqueue(
+			export_to_file,
+			queue="long",
+			timeout=3600,
+			doctype=doctype,
+			filters=filters,
+			order_by=order_by,
+			columns=columns,
+			file_format=file_format,
+		)
+		return
+
+	extension, content_type = EXPORT_FORMATS[file_format]
+	# written before returning, as the response is sent after the request's db connection is closed
+	file = tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_SIZE)
+	write_export(file, doctype, filters, order_by, columns, file_format)
+	file.seek(0)
+
+	response = Response(FileWrapper(file), mimetype=content_type, direct_passthrough=True)
+	response.headers["Content-Disposition"] = (
+		f'attachment; filename="{get_export_file_name(doctype, extension)}"'
+	)
+	return response
+
+
+def export_to_file(doctype, filters, order_by, columns, file_format):
+	extension, _content_type = EXPORT_FORMATS[file_format]
+	file_name = get_export_file_name(doctype, extension)
+	file_path = frappe.get_site_path("private", "files", file_name)
+
+	with open(file_path, "wb") as file:
+		write_export(file, doctype, filters, order_by, columns, file_format)
+
+	_file = frappe.get_doc(
+		{
+			"doctype": "File",
+			"file_name": file_name,
+			"file_url": f"/private/files/{file_name}",
+			"is_private": 1,
+			"file_size": os.path.getsize(file_path),
+		}
+	).insert(ignore_permissions=True)
+
+	frappe.publish_realtime(
+		"crm_export_ready",
+		{"doctype": doctype, "file_url": _file.file_url, "file_name": _file.file_name},
+		user=frappe.session.user,
+	)
+
+
+def get_export_file_name(doctype, extension):
+	timestamp = now_datetime().strftime("%Y%m%d%H%M%S")
+	return f"{frappe.scrub(doctype)}_{timestamp}_{frappe.generate_hash(length=6)}.{extension}"
+
+
+def get_export_columns(doctype, columns):
+	"""Return fieldnames and labels to export, defaulting to the list view columns of `doctype`"""
+	if not columns:
+		_list = get_controller(doctype)
+		if hasattr(_list, "default_list_data"):
+			columns = _list.default_list_data().get("columns")
+		else:
+			columns = [{"label": "Name", "key": "name"}, {"label": "Last Modified", "key": "modified"}]
+
+	fields = []
+	labels = []
+	for column in columns:
+		if isinstance(column, str):
+			column = {"key": column, "label": column}
+		if column.get("key") and column.get("key") not in fields:
+			fields.append(column.get("key"))
+			labels.append(_(column.get("label") or column.get("key")))
+
+	return fields, labels
+
+
+def write_export(file, doctype, filters, order_by, columns, file_format):
+	"""Write all records matching `filters` to the binary `file` chunk by chunk"""
+	for text in iter_export(doctype, filters, order_by, columns, file_format):
+		file.write(text.encode())
+
+
+def iter_export(doctype, filters, order_by, columns, file_format):
+	"""Yield the export of all records matching `filters` as text, the header first and then a chunk at a time"""
+	fields, labels = get_export_columns(doctype, columns)
+	buffer = io.StringIO(newline="")
+
+	if file_format == "CSV":
+		csv_writer = csv.writer(buffer)
+		csv_writer.writerow(labels)
+		yield buffer.getvalue()
+
+	for chunk in get_export_chunks(doctype, fields, filters, order_by):
+		buffer.seek(0)
+		buffer.truncate()
+		for row in chunk:
+			if file_format == "CSV":
+				csv_writer.writerow([row.get(field) for field in fields])
+			else:
+				buffer.write(json.dumps({field: row.get(field) for field in fields}, default=str) + "\n")
+		yield buffer.getvalue()
+
+
+def get_export_chunks(doctype, fields, filters, order_by, chunk_size=None):
+	"""
+	Yield records matching `filters` in chunks of `chunk_size`, each passed through the
+	controller's `parse_list_data`.
+
+	Records are streamed from an unbuffered cursor. Controllers that implement
+	`parse_list_data` may query the database per chunk, which is not possible while
+	an unbuffered cursor is open, so their records are read in keyset paginated chunks.
+	"""
+	chunk_size = cint(chunk_size) or EXPORT_CHUNK_SIZE
+	if hasattr(get_controller(doctype), "parse_list_data"):
+		cursor = None
+		while True:
+			chunk, cursor = get_list_after_cursor(doctype, fields, filters, order_by, chunk_size, cursor)
+			if chunk:
+				yield parse_list_data(chunk, doctype)
+			if not cursor:
+				return
+
+	query = frappe.get_list(doctype, fields=fields, filters=filters, order_by=order_by, page_length=0, run=0)
+
+	with frappe.db.unbuffered_cursor():
+		chunk = []
+		for row in frappe.db.sql(query, as_dict=True, as_iterator=True):
+			chunk.append(row)
+			if len(chunk) >= chunk_size:
+				yield chunk
+				chunk = []
+		if chunk:
+			yield chunk
@@ -1,9 +1,12 @@
 import frappe
 from frappe import _
+from crm.api.doc import clear_list_counts_cache
 from crm.fcrm.doctype.crm_notification.crm_notification import notify_user
 
 
 def after_insert(doc, method):
+    clear_list_counts_cache(doc)
+
     if (
         doc.reference_type in ["CRM Lead", "CRM Deal"]
         and doc.reference_name
@@ -27,6 +30,8 @@ def after_insert(doc, method):
 
 
 def on_update(doc, method):
+    clear_list_counts_cache(doc)
+
     if (
         doc.has_value_changed("status")
         and doc.status == "Cancelled"
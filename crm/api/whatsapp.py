@@ -5,6 +5,8 @@ from frappe import _
 
 from crm.api.doc import get_assigned_users
 from crm.fcrm.doctype.crm_notification.crm_notification import notify_user
+from crm.integrations.phone_cache import get_cached
+from crm.utils import get_normalized_phone_number
 
 
 def validate(doc, method):
@@ -33,9 +35,9 @@ def notify_agent(doc):
 			doctype = doctype[4:].lower()
 		notification_text = f"""
             <div class="mb-2 leading-5 text-ink-gray-5">
-                <span class="font-medium text-ink-gray-9">{ _('You') }</span>
-                <span>{ _('received a whatsapp message in {0}').format(doctype) }</span>
-                <span class="font-medium text-ink-gray-9">{ doc.reference_name }</span>
+                <span class="font-medium text-ink-gray-9">{_("You")}</span>
+                <span>{_("received a whatsapp message in {0}").format(doctype)}</span>
+                <span class="font-medium text-ink-gray-9">{doc.reference_name}</span>
             </div>
         """
 		assigned_users = get_assigned_users(doc.reference_doctype, doc.reference_name)
@@ -57,27 +59,32 @@ def notify_agent(doc):
 
 def get_lead_or_deal_from_number(number):
 	"""Get lead/deal from the given number."""
+	mobile_no = parse_mobile_no(number)
+	# whatsapp sends numbers with their country code but without the leading +
+	normalized = get_normalized_phone_number(mobile_no if mobile_no.startswith("+") else f"+{mobile_no}")
+	if not normalized:
+		return None, "CRM Lead"
 
-	def find_record(doctype, mobile_no, where=""):
-		mobile_no = parse_mobile_no(mobile_no)
+	doc, doctype = get_cached("record", [normalized], find_leads_or_deals)[normalized]
+	return doc, doctype
+
+
+def find_leads_or_deals(numbers):
+	return {number: find_lead_or_deal(number) for number in numbers}
 
-		query = f"""
-            SELECT name, mobile_no
-            FROM `tab{doctype}`
-            WHERE CONCAT('+', REGEXP_REPLACE(mobile_no, '[^0-9]', '')) = {mobile_no}
-        """
 
-		data = frappe.db.sql(query + where, as_dict=True)
-		return data[0].name if data else None
+def find_lead_or_deal(normalized):
+	def find_record(doctype, filters=None):
+		return frappe.db.get_value(doctype, {"normalized_mobile_no": normalized, **(filters or {})})
 
 	doctype = "CRM Deal"
 
-	doc = find_record(doctype, number) or None
+	doc = find_record(doctype)
 	if not doc:
 		doctype = "CRM Lead"
-		doc = find_record(doctype, number, "AND converted is not True")
+		doc = find_record(doctype, {"converted": 0})
 		if not doc:
-			doc = find_record(doctype, number)
+			doc = find_record(doctype)
 
 	return doc, doctype
 
@@ -299,7 +306,7 @@ def send_whatsapp_template(reference_doctype, reference_name, template, to):
 @frappe.whitelist()
 def react_on_whatsapp_message(emoji, reply_to_name):
 	reply_to_doc = frappe.get_doc("WhatsApp Message", reply_to_name)
-	to = reply_to_doc.type == "Incoming" and reply_to_doc.get("from") or reply_to_doc.to
+	to = (reply_to_doc.type == "Incoming" and reply_to_doc.get("from")) or reply_to_doc.to
 	doc = frappe.new_doc("WhatsApp Message")
 	doc.update(
 		{
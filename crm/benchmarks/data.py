@@ -0,0 +1,228 @@
+"""
+Deterministic synthetic data for the CRM benchmarks.
+
+The same `seed` and counts always produce the same records. All generated records
+are tagged with `BENCHMARK_TAG` so that `clear` can remove them again.
+"""
+
+import json
+import random
+
+import frappe
+from frappe.utils import add_to_date, get_datetime
+
+from crm.fcrm.doctype.crm_activity.crm_activity import backfill_records
+
+BENCHMARK_TAG = "crm-benchmark"
+BASE_DATETIME = get_datetime("2024-01-01 09:00:00")
+
+FIRST_NAMES = ["Aarav", "Maya", "Liam", "Sofia", "Noah", "Zara", "Omar", "Ines", "Kenji", "Lena"]
+LAST_NAMES = ["Shah", "Garcia", "Smith", "Rossi", "Kim", "Novak", "Haddad", "Silva", "Mori", "Berg"]
+CALL_STATUSES = ["Completed", "No Answer", "Busy", "Failed"]
+
+
+def seed(
+	leads=1000,
+	deals=200,
+	contacts=500,
+	versions_per_record=10,
+	comments_per_record=5,
+	calls_per_record=3,
+	notifications=500,
+	seed=42,
+):
+	"""
+	Insert synthetic leads, deals, contacts, versions, comments, call logs and notifications.
+
+	Usage: `bench --site <site> execute crm.benchmarks.data.seed --kwargs "{'leads': 10000}"`
+	"""
+	rng = random.Random(seed)
+	frappe.set_user("Administrator")
+
+	lead_statuses = frappe.get_all("CRM Lead Status", pluck="name") or ["New"]
+	deal_statuses = frappe.get_all("CRM Deal Status", pluck="name") or ["Qualification"]
+	users = frappe.get_all("User", filters={"enabled": 1, "user_type": "System User"}, pluck="name")
+
+	contact_names = [insert_contact(rng, i) for i in range(contacts)]
+	lead_names = [insert_lead(rng, i, lead_statuses) for i in range(leads)]
+	deal_names = [insert_deal(rng, i, deal_statuses, contact_names) for i in range(deals)]
+
+	for doctype, names in (("CRM Lead", lead_names), ("CRM Deal", deal_names)):
+		for name in names:
+			insert_versions(rng, doctype, name, versions_per_record, users)
+			insert_comments(rng, doctype, name, comments_per_record, users)
+			insert_call_logs(rng, doctype, name, calls_per_record, users)
+		# versions and comments are inserted without doc events, write their activities
+		backfill_records(doctype, names)
+
+	insert_notifications(rng, notifications, users, lead_names)
+
+	frappe.db.commit()
+	return {"leads": lead_names, "deals": deal_names, "contacts": contact_names}
+
+
+def get_phone_number(rng):
+	return f"+91 9{rng.randint(100000000, 999999999)}"
+
+
+def get_creation(rng, days=365):
+	return add_to_date(BASE_DATETIME, seconds=rng.randint(0, days * 24 * 3600))
+
+
+def insert_contact(rng, i):
+	contact = frappe.get_doc(
+		{
+			"doctype": "Contact",
+			"first_name": rng.choice(FIRST_NAMES),
+			"last_name": f"{rng.choice(LAST_NAMES)} {i}",
+			"company_name": BENCHMARK_TAG,
+		}
+	)
+	contact.append("phone_nos", {"phone": get_phone_number(rng), "is_primary_mobile_no": 1})
+	contact.insert(ignore_permissions=True)
+	return contact.name
+
+
+def insert_lead(rng, i, statuses):
+	lead = frappe.get_doc(
+		{
+			"doctype": "CRM Lead",
+			"first_name": rng.choice(FIRST_NAMES),
+			"last_name": f"{rng.choice(LAST_NAMES)} {i}",
+			"organization": BENCHMARK_TAG,
+			"mobile_no": get_phone_number(rng),
+			"status": rng.choice(statuses),
+		}
+	)
+	lead.flags.ignore_email_validation = True
+	lead.insert(ignore_permissions=True)
+	return lead.name
+
+
+def insert_deal(rng, i, statuses, contacts):
+	deal = frappe.get_doc(
+		{
+			"doctype": "CRM Deal",
+			"organization_name": BENCHMARK_TAG,
+			"status": rng.choice(statuses),
+			"annual_revenue": rng.randint(1, 1000) * 1000,
+			"mobile_no": get_phone_number(rng),
+		}
+	)
+	if contacts:
+		deal.append("contacts", {"contact": rng.choice(contacts), "is_primary": 1})
+	deal.insert(ignore_permissions=True)
+	return deal.name
+
+
+def insert_versions(rng, doctype, name, count, users):
+	for _i in range(count):
+		old, new = rng.sample(["New", "Contacted", "Nurture", "Qualified", "Unqualified"], 2)
+		version = frappe.get_doc(
+			{
+				"doctype": "Version",
+				"ref_doctype": doctype,
+				"docname": name,
+				"data": json.dumps({"changed": [["status", old, new]], "added": [], "removed": []}),
+			}
+		)
+		version.db_insert()
+		set_creation("Version", version.name, rng, users)
+
+
+def insert_comments(rng, doctype, name, count, users):
+	for i in range(count):
+		comment = frappe.get_doc(
+			{
+				"doctype": "Comment",
+				"comment_type": "Comment",
+				"reference_doctype": doctype,
+				"reference_name": name,
+				"content": f"<p>{BENCHMARK_TAG} comment {i} about pricing and follow up</p>",
+			}
+		)
+		comment.db_insert()
+		set_creation("Comment", comment.name, rng, users)
+
+
+def insert_call_logs(rng, doctype, name, count, users):
+	for _i in range(count):
+		call_type = rng.choice(["Incoming", "Outgoing"])
+		user = rng.choice(users) if users else None
+		call = frappe.get_doc(
+			{
+				"doctype": "CRM Call Log",
+				"id": f"{BENCHMARK_TAG}-{rng.getrandbits(64):016x}",
+				"type": call_type,
+				"status": rng.choice(CALL_STATUSES),
+				"from": get_phone_number(rng),
+				"to": get_phone_number(rng),
+				"receiver": user if call_type == "Incoming" else None,
+				"caller": user if call_type == "Outgoing" else None,
+				"duration": rng.randint(0, 1800),
+				"reference_doctype": doctype,
+				"reference_docname": name,
+			}
+		)
+		call.db_insert()
+		set_creation("CRM Call Log", call.name, rng, users)
+
+
+def insert_notifications(rng, count, users, leads):
+	if not users or not leads:
+		return
+	for i in range(count):
+		notification = frappe.get_doc(
+			{
+				"doctype": "CRM Notification",
+				"from_user": rng.choice(users),
+				"to_user": "Administrator",
+				"type": "Mention",
+				"read": rng.random() < 0.5,
+				"message": f"{BENCHMARK_TAG} notification {i}",
+				"notification_text": f"<p>{BENCHMARK_TAG} notification {i}</p>",
+				"reference_doctype": "CRM Lead",
+				"reference_name": rng.choice(leads),
+			}
+		)
+		notification.db_insert()
+		set_creation("CRM Notification", notification.name, rng, users)
+
+
+def set_creation(doctype, name, rng, users):
+	creation = get_creation(rng)
+	frappe.db.set_value(
+		doctype,
+		name,
+		{
+			"creation": creation,
+			"modified": creation,
+			"owner": rng.choice(users) if users else "Administrator",
+		},
+		update_modified=False,
+	)
+
+
+def clear():
+	"""Delete all records created by `seed`"""
+	frappe.set_user("Administrator")
+
+	leads = frappe.get_all("CRM Lead", filters={"organization": BENCHMARK_TAG}, pluck="name")
+	deals = frappe.get_all("CRM Deal", filters={"organization_name": BENCHMARK_TAG}, pluck="name")
+	names = leads + deals
+
+	if names:
+		frappe.db.delete("CRM Activity", {"reference_name": ("in", names)})
+		frappe.db.delete("Version", {"docname": ("in", names)})
+		frappe.db.delete("Comment", {"reference_name": ("in", names)})
+		frappe.db.delete("CRM Call Log", {"reference_docname": ("in", names)})
+		frappe.db.delete("CRM Notification", {"reference_name": ("in", names)})
+		frappe.db.delete("CRM Deal", {"name": ("in", deals)})
+		frappe.db.delete("CRM Lead", {"name": ("in", leads)})
+
+	contacts = frappe.get_all("Contact", filters={"company_name": BENCHMARK_TAG}, pluck="name")
+	if contacts:
+		frappe.db.delete("Contact Phone", {"parent": ("in", contacts)})
+		frappe.db.delete("Contact", {"name": ("in", contacts)})
+
+	frappe.db.commit()
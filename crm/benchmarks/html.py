@@ -0,0 +1,71 @@
+"""
+Benchmarks of `crm.utils.html_extract` against the BeautifulSoup code it replaced.
+
+Run them with the other benchmarks:
+
+    bench --site <site> execute crm.benchmarks.run.run --kwargs "{'only': ['html:']}"
+"""
+
+from bs4 import BeautifulSoup
+
+from crm.utils.html_extract import extract_div, extract_first_anchor, extract_mentions
+
+WORDS = ["pricing", "follow", "up", "next", "week", "contract", "renewal", "discount", "demo", "call"]
+
+
+def bs4_extract_mentions(html):
+	soup = BeautifulSoup(html, "html.parser")
+	return [
+		(d.get("data-label"), d.get("data-id")) for d in soup.find_all("span", attrs={"data-type": "mention"})
+	]
+
+
+def bs4_extract_first_anchor(html):
+	a_tag = BeautifulSoup(html, "html.parser").find("a")
+	return (a_tag["href"], a_tag.text) if a_tag else None
+
+
+def bs4_extract_signature(html):
+	div = BeautifulSoup(html, "html.parser").find("div", {"class": "ql-editor read-mode"})
+	return div.renderContents() if div else None
+
+
+def get_comment(rng, paragraphs=8):
+	parts = []
+	for i in range(paragraphs):
+		text = " ".join(rng.choice(WORDS) for _i in range(30))
+		if i % 3 == 0:
+			user = f"user{rng.randint(1, 50)}@example.com"
+			text += f' <span class="mention" data-type="mention" data-id="{user}" data-label="{user}">@{user}</span>'
+		parts.append(f"<p>{text}</p>")
+	return "".join(parts)
+
+
+def get_attachment_log(rng):
+	file_name = f"{rng.choice(WORDS)}-{rng.randint(1, 10**6)}.pdf"
+	return f'<a href="/private/files/{file_name}" target="_blank">{file_name}</a>'
+
+
+def get_signature(rng):
+	lines = "".join(f"<p>{' '.join(rng.choice(WORDS) for _i in range(6))}</p>" for _i in range(4))
+	return f'<div class="ql-editor read-mode">{lines}<p><img src="/files/logo.png"></p></div>'
+
+
+def get_benchmarks(rng):
+	"""Return `(name, fn, make_args)` of the HTML extraction benchmarks"""
+	# the timeline renders the same attachment logs over and over
+	attachment_logs = [get_attachment_log(rng) for _i in range(50)]
+
+	return [
+		("html:mentions:bs4", bs4_extract_mentions, lambda: (get_comment(rng),)),
+		("html:mentions", extract_mentions, lambda: (get_comment(rng),)),
+		("html:attachment_log:bs4", bs4_extract_first_anchor, lambda: (rng.choice(attachment_logs),)),
+		(
+			"html:attachment_log:uncached",
+			extract_first_anchor.__wrapped__,
+			lambda: (get_attachment_log(rng),),
+		),
+		("html:attachment_log", extract_first_anchor, lambda: (rng.choice(attachment_logs),)),
+		("html:signature:bs4", bs4_extract_signature, lambda: (get_signature(rng),)),
+		("html:signature", extract_div, lambda: (get_signature(rng), "ql-editor read-mode")),
+	]
@@ -0,0 +1,175 @@
+"""
+Latency benchmarks of the CRM hot paths.
+
+Seed data first with `crm.benchmarks.data.seed`, then run on a local bench:
+
+    bench --site <site> execute crm.benchmarks.run.run
+    bench --site <site> execute crm.benchmarks.run.run --kwargs "{'iterations': 50, 'only': ['get_data']}"
+
+Every benchmark is called `iterations` times and reports latency percentiles (ms)
+and the number of SQL queries per call.
+"""
+
+import random
+import statistics
+import time
+from datetime import timedelta
+
+import frappe
+from frappe.utils import add_to_date
+
+from crm.benchmarks.data import BASE_DATETIME, BENCHMARK_TAG
+
+
+class QueryCounter:
+	"""Count queries run through `frappe.db.sql` while active"""
+
+	def __enter__(self):
+		self.count = 0
+		self._sql = frappe.db.sql
+
+		def sql(*args, **kwargs):
+			self.count += 1
+			return self._sql(*args, **kwargs)
+
+		frappe.db.sql = sql
+		return self
+
+	def __exit__(self, *args):
+		frappe.db.sql = self._sql
+
+
+def measure(name, fn, args_list):
+	"""Call `fn` once per args in `args_list` and return latency and query statistics"""
+	timings = []
+	queries = []
+	for args in args_list:
+		with QueryCounter() as counter:
+			start = time.perf_counter()
+			fn(*args)
+			timings.append((time.perf_counter() - start) * 1000)
+		queries.append(counter.count)
+		# keep request-local state (docinfo, caches) from growing across calls
+		frappe.local.response = frappe._dict()
+		frappe.db.rollback()
+
+	return {
+		"name": name,
+		"calls": len(timings),
+		"p50_ms": round(percentile(timings, 50), 2),
+		"p90_ms": round(percentile(timings, 90), 2),
+		"p95_ms": round(percentile(timings, 95), 2),
+		"p99_ms": round(percentile(timings, 99), 2),
+		"max_ms": round(max(timings), 2),
+		"mean_ms": round(statistics.mean(timings), 2),
+		"mean_queries": round(statistics.mean(queries), 2),
+		"max_queries": max(queries),
+	}
+
+
+def percentile(values, p):
+	values = sorted(values)
+	index = (len(values) - 1) * p / 100
+	lower = int(index)
+	upper = min(lower + 1, len(values) - 1)
+	return values[lower] + (values[upper] - values[lower]) * (index - lower)
+
+
+def get_benchmarks(rng):
+	"""Return `(name, fn, make_args)` of every benchmark, `make_args` picks the arguments of one call"""
+	from crm.api.activities import get_activities
+	from crm.api.doc import get_data
+	from crm.api.notifications import get_notifications
+	from crm.benchmarks.html import get_benchmarks as get_html_benchmarks
+	from crm.integrations.api import get_contact_by_phone_number
+	from crm.utils import get_parsed_phone_number
+
+	leads = frappe.get_all("CRM Lead", filters={"organization": BENCHMARK_TAG}, pluck="name")
+	deals = frappe.get_all("CRM Deal", filters={"organization_name": BENCHMARK_TAG}, pluck="name")
+	numbers = frappe.get_all(
+		"CRM Lead", filters={"organization": BENCHMARK_TAG, "mobile_no": ("is", "set")}, pluck="mobile_no"
+	)
+	if not leads:
+		frappe.throw("No benchmark data found, run crm.benchmarks.data.seed first")
+
+	def list_view(doctype, view_type, **kwargs):
+		view = {"view_type": view_type}
+		if view_type == "group_by":
+			view["group_by_field"] = "status"
+		return get_data(
+			doctype=doctype,
+			filters={},
+			order_by="modified desc",
+			page_length=20,
+			view=view,
+			column_field="status" if view_type == "kanban" else None,
+			**kwargs,
+		)
+
+	def sla_span():
+		start = add_to_date(BASE_DATETIME, minutes=rng.randint(0, 7 * 24 * 60))
+		return start, rng.randint(60, 3 * 24 * 3600)
+
+	sla = get_sla()
+	benchmarks = []
+	for doctype in ("CRM Lead", "CRM Deal"):
+		for view_type in ("list", "group_by", "kanban"):
+			benchmarks.append(
+				(
+					f"get_data:{doctype}:{view_type}",
+					list_view,
+					lambda doctype=doctype, view_type=view_type: (doctype, view_type),
+				)
+			)
+
+	benchmarks.append(("get_activities:CRM Lead", get_activities, lambda: (rng.choice(leads),)))
+	if deals:
+		benchmarks.append(("get_activities:CRM Deal", get_activities, lambda: (rng.choice(deals),)))
+	benchmarks += [
+		("get_contact_by_phone_number", get_contact_by_phone_number, lambda: (rng.choice(numbers),)),
+		("phone:parse:uncached", get_parsed_phone_number.__wrapped__, lambda: (rng.choice(numbers),)),
+		("phone:parse", get_parsed_phone_number, lambda: (rng.choice(numbers),)),
+		("get_notifications", get_notifications, lambda: ()),
+		("sla:calc_time", sla.calc_time, sla_span),
+		(
+			"sla:calc_elapsed_time",
+			sla.calc_elapsed_time,
+			lambda: (lambda start, seconds: (start, add_to_date(start, seconds=seconds)))(*sla_span()),
+		),
+	]
+	benchmarks += get_html_benchmarks(rng)
+	return benchmarks
+
+
+def get_sla():
+	"""An unsaved SLA with office hours on weekdays, so that no setup is needed"""
+	sla = frappe.new_doc("CRM Service Level Agreement")
+	for day in ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday"):
+		sla.append(
+			"working_hours",
+			{"workday": day, "start_time": timedelta(hours=9), "end_time": timedelta(hours=18)},
+		)
+	return sla
+
+
+def run(iterations=20, only=None, seed=42):
+	"""Run all (or `only` the given) benchmarks and print a latency report"""
+	frappe.set_user("Administrator")
+	rng = random.Random(seed)
+
+	results = []
+	for name, fn, make_args in get_benchmarks(rng):
+		if only and not any(name.startswith(o) for o in only):
+			continue
+		results.append(measure(name, fn, [make_args() for _i in range(iterations)]))
+
+	print_report(results)
+	return results
+
+
+def print_report(results):
+	columns = ["name", "calls", "p50_ms", "p90_ms", "p95_ms", "p99_ms", "max_ms", "mean_queries"]
+	widths = {c: max(len(c), *(len(str(r[c])) for r in results)) for c in columns} if results else {}
+	print("  ".join(c.ljust(widths.get(c, len(c))) for c in columns))
+	for r in results:
+		print("  ".join(str(r[c]).ljust(widths[c]) for c in columns))
@@ -0,0 +1,433 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+import html
+import json
+
+import frappe
+from frappe.model.document import Document
+from frappe.query_builder import Order
+from frappe.utils import cstr, strip_html_tags
+from pypika import Tuple
+
+TIMELINE_DOCTYPES = ("CRM Lead", "CRM Deal")
+
+# comment type -> activity type
+COMMENT_ACTIVITY_TYPES = {
+	"Comment": "comment",
+	"Attachment": "attachment_log",
+	"Attachment Removed": "attachment_log",
+}
+
+COMMUNICATION_TYPES = ("Communication", "Automated Message")
+
+SNIPPET_LENGTH = 200
+
+ACTIVITY_FIELDS = [
+	"name",
+	"creation",
+	"modified",
+	"owner",
+	"modified_by",
+	"reference_doctype",
+	"reference_name",
+	"activity_type",
+	"source_doctype",
+	"source_name",
+	"field",
+	"old_value",
+	"value",
+	"snippet",
+	"content_length",
+]
+
+
+class CRMActivity(Document):
+	pass
+
+
+def get_feed(reference_doctype, reference_name, since=None, before=None, limit=None, after=None):
+	"""
+	Return the activities of a lead or deal between the positions `since` and `before`, newest first.
+
+	Field changes are stored normalized, with `old_value` and `value` JSON encoded. Comments,
+	communications and attachment logs only point to their source row (`source_doctype`,
+	`source_name`) so that edits to them are always shown, along with a plain text `snippet`
+	and the `content_length` of their content.
+
+	:param since: `(creation, name)` to read activities after, with name None to compare on creation only
+	:param before: `(creation, name)` to read activities before, likewise
+	:param after: `(creation, name)` of the last activity of the previous page, to read the next one
+	"""
+	Activity = frappe.qb.DocType("CRM Activity")
+	query = (
+		frappe.qb.from_(Activity)
+		.select(
+			Activity.name,
+			Activity.activity_type,
+			Activity.creation,
+			Activity.owner,
+			Activity.source_doctype,
+			Activity.source_name,
+			Activity.field,
+			Activity.old_value,
+			Activity.value,
+			Activity.snippet,
+			Activity.content_length,
+			Activity.archived,
+		)
+		.where(Activity.reference_doctype == reference_doctype)
+		.where(Activity.reference_name == reference_name)
+		.orderby(Activity.creation, order=Order.desc)
+		.orderby(Activity.name, order=Order.desc)
+	)
+	position = Tuple(Activity.creation, Activity.name)
+	if since:
+		creation, name = since
+		query = query.where(position > Tuple(creation, name) if name else Activity.creation > creation)
+	for creation, name in filter(None, (before, after)):
+		query = query.where(position < Tuple(creation, name) if name else Activity.creation < creation)
+	if limit:
+		query = query.limit(limit)
+
+	return query.run(as_dict=True)
+
+
+def make_activity(
+	reference_doctype,
+	reference_name,
+	activity_type,
+	creation,
+	owner,
+	source_doctype,
+	source_name,
+	field=None,
+	old_value=None,
+	value=None,
+	content=None,
+):
+	return frappe._dict(
+		reference_doctype=reference_doctype,
+		reference_name=reference_name,
+		activity_type=activity_type,
+		creation=creation,
+		owner=owner,
+		source_doctype=source_doctype,
+		source_name=source_name,
+		field=field,
+		old_value=old_value,
+		value=value,
+		snippet=get_snippet(content) if content else None,
+		content_length=len(content) if content else 0,
+	)
+
+
+def get_snippet(content):
+	"""Plain text start of html `content`, for timelines that load full bodies on demand"""
+	return get_text(content)[:SNIPPET_LENGTH]
+
+
+def get_text(content):
+	"""Plain text of html `content` with whitespace collapsed"""
+	return " ".join(html.unescape(strip_html_tags(cstr(content))).split())
+
+
+def insert_activities(activities):
+	activities = [a for a in activities if a]
+	if not activities:
+		return
+
+	values = []
+	for activity in activities:
+		values.append(
+			(
+				frappe.generate_hash(length=10),
+				activity.creation,
+				activity.creation,
+				activity.owner,
+				activity.owner,
+				activity.reference_doctype,
+				activity.reference_name,
+				activity.activity_type,
+				activity.source_doctype,
+				activity.source_name,
+				activity.field,
+				None if activity.old_value is None else json.dumps(activity.old_value, default=str),
+				None if activity.value is None else json.dumps(activity.value, default=str),
+				activity.snippet,
+				activity.content_length,
+			)
+		)
+
+	frappe.db.bulk_insert("CRM Activity", ACTIVITY_FIELDS, values)
+
+
+def get_creation_activity(doc):
+	return make_activity(doc.doctype, doc.name, "creation", doc.creation, doc.owner, doc.doctype, doc.name)
+
+
+def get_version_activity(version):
+	"""Activity of the first change in a Version, as shown in the timeline"""
+	data = json.loads(version.data) if isinstance(version.data, str) else version.data
+	if not data or not data.get("changed") or not data.get("changed")[0]:
+		return
+
+	field, old_value, value = data.get("changed")[0][:3]
+	if not old_value and not value:
+		return
+
+	activity_type = "changed"
+	if not old_value:
+		activity_type = "added"
+	elif not value:
+		activity_type = "removed"
+
+	return make_activity(
+		version.ref_doctype,
+		version.docname,
+		activity_type,
+		version.creation,
+		version.owner,
+		"Version",
+		version.name,
+		field,
+		old_value,
+		value,
+	)
+
+
+def get_comment_activity(comment):
+	activity_type = COMMENT_ACTIVITY_TYPES.get(comment.comment_type)
+	if not activity_type or comment.reference_doctype not in TIMELINE_DOCTYPES:
+		return
+
+	return make_activity(
+		comment.reference_doctype,
+		comment.reference_name,
+		activity_type,
+		comment.creation,
+		comment.owner,
+		"Comment",
+		comment.name,
+		content=comment.content if activity_type == "comment" else None,
+	)
+
+
+def get_communication_activity(communication, reference_doctype, reference_name):
+	return make_activity(
+		reference_doctype,
+		reference_name,
+		"communication",
+		communication.creation,
+		communication.owner,
+		"Communication",
+		communication.name,
+		content=communication.content,
+	)
+
+
+def get_communication_references(communication):
+	"""Leads and deals a communication is referenced from or timeline-linked to"""
+	if communication.communication_type not in COMMUNICATION_TYPES:
+		return []
+
+	references = []
+	if communication.reference_doctype in TIMELINE_DOCTYPES and communication.reference_name:
+		references.append((communication.reference_doctype, communication.reference_name))
+	for link in communication.get("timeline_links") or []:
+		if link.link_doctype in TIMELINE_DOCTYPES:
+			references.append((link.link_doctype, link.link_name))
+
+	return list(dict.fromkeys(references))
+
+
+def add_activity(doc, method=None):
+	"""Write the timeline activities of `doc`, called from doc events"""
+	if doc.doctype in TIMELINE_DOCTYPES:
+		activities = [get_creation_activity(doc)]
+	elif doc.doctype == "Version":
+		activities = [get_version_activity(doc)] if doc.ref_doctype in TIMELINE_DOCTYPES else []
+	elif doc.doctype == "Comment":
+		activities = [get_comment_activity(doc)]
+	elif doc.doctype == "Communication":
+		# timeline links can be added after insert, so this also runs on update
+		references = get_communication_references(doc)
+		if not references:
+			return
+		existing = {
+			(d.reference_doctype, d.reference_name)
+			for d in frappe.get_all(
+				"CRM Activity",
+				filters={"source_doctype": "Communication", "source_name": doc.name},
+				fields=["reference_doctype", "reference_name"],
+			)
+		}
+		activities = [
+			get_communication_activity(doc, *reference)
+			for reference in references
+			if reference not in existing
+		]
+	else:
+		return
+
+	insert_activities(activities)
+
+
+def remove_activities(doc, method=None):
+	"""Delete the timeline activities of a deleted lead/deal or of a deleted source row"""
+	if doc.doctype in TIMELINE_DOCTYPES:
+		frappe.db.delete("CRM Activity", {"reference_doctype": doc.doctype, "reference_name": doc.name})
+		frappe.db.delete(
+			"CRM Activity Archive", {"reference_doctype": doc.doctype, "reference_name": doc.name}
+		)
+	else:
+		frappe.db.delete("CRM Activity", {"source_doctype": doc.doctype, "source_name": doc.name})
+
+
+def update_snippet(doc, method=None):
+	"""Refresh the snippet of an edited comment or communication"""
+	if not doc.has_value_changed("content"):
+		return
+
+	if doc.doctype == "Comment" and doc.comment_type != "Comment":
+		return
+
+	Activity = frappe.qb.DocType("CRM Activity")
+	(
+		frappe.qb.update(Activity)
+		.set(Activity.snippet, get_snippet(doc.content))
+		.set(Activity.content_length, len(doc.content or ""))
+		.where(Activity.source_doctype == doc.doctype)
+		.where(Activity.source_name == doc.name)
+	).run()
+
+
+def backfill_snippets(chunk_size=500):
+	"""Set snippets of activities written before snippets were stored"""
+	Activity = frappe.qb.DocType("CRM Activity")
+	for source_doctype in ("Comment", "Communication"):
+		last = ""
+		while activities := frappe.get_all(
+			"CRM Activity",
+			filters={
+				"source_doctype": source_doctype,
+				"activity_type": ("in", ["comment", "communication"]),
+				"snippet": ("is", "not set"),
+				"name": (">", last),
+			},
+			fields=["name", "source_name"],
+			order_by="name asc",
+			limit=chunk_size,
+		):
+			contents = dict(
+				frappe.get_all(
+					source_doctype,
+					filters={"name": ("in", [a.source_name for a in activities])},
+					fields=["name", "content"],
+					as_list=True,
+				)
+			)
+			for activity in activities:
+				content = contents.get(activity.source_name) or ""
+				(
+					frappe.qb.update(Activity)
+					.set(Activity.snippet, get_snippet(content))
+					.set(Activity.content_length, len(content))
+					.where(Activity.name == activity.name)
+				).run()
+			frappe.db.commit()
+			last = activities[-1].name
+
+
+def backfill_activities(doctypes=TIMELINE_DOCTYPES, chunk_size=500):
+	"""Write activities for existing leads and deals, skipping the ones already present"""
+	for doctype in doctypes:
+		last = ""
+		while names := frappe.get_all(
+			doctype, filters={"name": (">", last)}, pluck="name", order_by="name asc", limit=chunk_size
+		):
+			backfill_records(doctype, names)
+			frappe.db.commit()
+			last = names[-1]
+
+
+def backfill_records(doctype, names):
+	existing = {
+		(d.source_doctype, d.source_name, d.reference_name)
+		for d in frappe.get_all(
+			"CRM Activity",
+			filters={"reference_doctype": doctype, "reference_name": ("in", names)},
+			fields=["source_doctype", "source_name", "reference_name"],
+		)
+	}
+
+	activities = []
+	for doc in frappe.get_all(doctype, filters={"name": ("in", names)}, fields=["name", "creation", "owner"]):
+		doc.doctype = doctype
+		activities.append(get_creation_activity(doc))
+
+	versions = frappe.get_all(
+		"Version",
+		filters={"ref_doctype": doctype, "docname": ("in", names)},
+		fields=["name", "ref_doctype", "docname", "creation", "owner", "data"],
+	)
+	activities += [get_version_activity(version) for version in versions]
+
+	comments = frappe.get_all(
+		"Comment",
+		filters={
+			"reference_doctype": doctype,
+			"reference_name": ("in", names),
+			"comment_type": ("in", list(COMMENT_ACTIVITY_TYPES)),
+		},
+		fields=[
+			"name",
+			"reference_doctype",
+			"reference_name",
+			"comment_type",
+			"creation",
+			"owner",
+			"content",
+		],
+	)
+	activities += [get_comment_activity(comment) for comment in comments]
+
+	communication_fields = ["name", "creation", "owner", "content"]
+	communication_filters = {"communication_type": ("in", COMMUNICATION_TYPES)}
+	for communication in frappe.get_all(
+		"Communication",
+		filters={"reference_doctype": doctype, "reference_name": ("in", names), **communication_filters},
+		fields=[*communication_fields, "reference_name"],
+	):
+		activities.append(get_communication_activity(communication, doctype, communication.reference_name))
+
+	links = frappe.get_all(
+		"Communication Link",
+		filters={"link_doctype": doctype, "link_name": ("in", names), "parenttype": "Communication"},
+		fields=["parent", "link_name"],
+	)
+	if links:
+		linked = {
+			d.name: d
+			for d in frappe.get_all(
+				"Communication",
+				filters={"name": ("in", list({link.parent for link in links})), **communication_filters},
+				fields=communication_fields,
+			)
+		}
+		for link in links:
+			if link.parent in linked:
+				activities.append(get_communication_activity(linked[link.parent], doctype, link.link_name))
+
+	seen = set(existing)
+	new_activities = []
+	for activity in activities:
+		if not activity:
+			continue
+		key = (activity.source_doctype, activity.source_name, activity.reference_name)
+		if key in seen:
+			continue
+		seen.add(key)
+		new_activities.append(activity)
+
+	insert_activities(new_activities)
@@ -0,0 +1,190 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+from datetime import timedelta
+
+import frappe
+from frappe.tests import IntegrationTestCase
+from frappe.utils import get_datetime
+
+from crm.api.activities import get_activities, get_timeline_position
+from crm.api.doc import encode_cursor
+from crm.fcrm.doctype.crm_activity.crm_activity import insert_activities, make_activity
+
+
+class TestCRMActivity(IntegrationTestCase):
+	def setUp(self):
+		frappe.set_user("Administrator")
+		self.lead = frappe.get_doc({"doctype": "CRM Lead", "first_name": "Activity"}).insert(
+			ignore_permissions=True
+		)
+
+	def tearDown(self):
+		frappe.db.rollback()
+
+	def get_activities(self, **filters):
+		return frappe.get_all(
+			"CRM Activity",
+			filters={"reference_doctype": "CRM Lead", "reference_name": self.lead.name, **filters},
+			fields=["activity_type", "source_doctype", "source_name", "snippet", "content_length"],
+		)
+
+	def test_activities_are_written_on_insert(self):
+		self.assertEqual(
+			self.get_activities(activity_type="creation"),
+			[
+				{
+					"activity_type": "creation",
+					"source_doctype": "CRM Lead",
+					"source_name": self.lead.name,
+					"snippet": None,
+					"content_length": 0,
+				}
+			],
+		)
+
+		comment = frappe.get_doc(
+			{
+				"doctype": "Comment",
+				"comment_type": "Comment",
+				"reference_doctype": "CRM Lead",
+				"reference_name": self.lead.name,
+				"content": "<p>Called &amp; left a message</p>",
+			}
+		).insert(ignore_permissions=True)
+
+		activities = self.get_activities(activity_type="comment")
+		self.assertEqual(len(activities), 1)
+		self.assertEqual(activities[0].source_name, comment.name)
+		self.assertEqual(activities[0].snippet, "Called & left a message")
+
+		comment.delete(ignore_permissions=True)
+		self.assertEqual(self.get_activities(activity_type="comment"), [])
+
+
+class TestCRMActivityTimeline(IntegrationTestCase):
+	"""Paging of `crm.api.activities.get_activities` over the CRM Activity feed"""
+
+	def setUp(self):
+		frappe.set_user("Administrator")
+		self.lead = frappe.get_doc({"doctype": "CRM Lead", "first_name": "Timeline"}).insert(
+			ignore_permissions=True
+		)
+		# oldest first, with versions of one owner to be grouped and entries sharing a second
+		self.add_comment("CRM Lead", self.lead.name, 0)
+		self.add_version("CRM Lead", self.lead.name, 1, "status", "New", "Contacted")
+		self.add_version("CRM Lead", self.lead.name, 1, "first_name", "Timeline", "Feed")
+		self.add_version("CRM Lead", self.lead.name, 2, "status", "Contacted", "Nurture")
+		self.add_comment("CRM Lead", self.lead.name, 3)
+		self.add_version("CRM Lead", self.lead.name, 4, "status", "Nurture", "Qualified", "sales@example.com")
+		self.add_comment("CRM Lead", self.lead.name, 4)
+		self.add_version("CRM Lead", self.lead.name, 5, "first_name", "Feed", "Paged")
+		self.add_comment("CRM Lead", self.lead.name, 6)
+
+	def tearDown(self):
+		frappe.db.rollback()
+
+	def add_comment(self, doctype, name, second):
+		comment = frappe.get_doc(
+			{
+				"doctype": "Comment",
+				"comment_type": "Comment",
+				"reference_doctype": doctype,
+				"reference_name": name,
+				"content": f"Comment at {second}",
+			}
+		).insert(ignore_permissions=True)
+		frappe.db.set_value(
+			"CRM Activity", {"source_doctype": "Comment", "source_name": comment.name}, "creation", at(second)
+		)
+
+	def add_version(self, doctype, name, second, field, old_value, value, owner="Administrator"):
+		insert_activities(
+			[
+				make_activity(
+					doctype,
+					name,
+					"changed",
+					at(second),
+					owner,
+					"Version",
+					frappe.generate_hash(length=10),
+					field,
+					old_value,
+					value,
+				)
+			]
+		)
+
+	def get_pages(self, name, limit):
+		pages, before = [], None
+		while page := get_activities(name, before=before, limit=limit)[0]:
+			pages.extend(page)
+			before = encode_cursor(min(get_positions(page)))
+		return pages
+
+	def test_pages_match_unpaged_timeline(self):
+		activities = get_activities(self.lead.name)[0]
+		self.assertEqual(len(get_positions(activities)), 10)
+		# the versions at 1 and 2 by the same owner are shown as one group
+		self.assertIn(2, [len(a.get("other_versions", [])) for a in activities])
+
+		for limit in (1, 2, 3):
+			self.assertEqual(self.get_pages(self.lead.name, limit), activities, limit)
+
+	def test_since_returns_newer_activities(self):
+		activities = get_activities(self.lead.name)[0]
+		positions = get_positions(activities)
+		comment = next(a for a in activities if "Comment at 3" in a.get("content", ""))
+		position = get_timeline_position(comment["cursor"])
+
+		newer = get_activities(self.lead.name, since=comment["cursor"])[0]
+		self.assertEqual(get_positions(newer), [p for p in positions if p > position])
+
+		# a plain datetime compares on creation only
+		newer = get_activities(self.lead.name, since=str(at(4)))[0]
+		self.assertEqual(get_positions(newer), [p for p in positions if p[0] > at(4)])
+
+	def test_cursor_round_trip(self):
+		activity = get_activities(self.lead.name, limit=1)[0][0]
+		creation, name = get_timeline_position(activity["cursor"])
+		self.assertEqual(creation, activity["creation"])
+		self.assertTrue(frappe.db.exists("CRM Activity", name))
+
+		self.assertEqual(get_timeline_position(str(at(4))), (at(4), None))
+		with self.assertRaises(frappe.ValidationError):
+			get_timeline_position(encode_cursor({"values": []}))
+
+	def test_deal_timeline_merges_lead_timeline(self):
+		deal = frappe.get_doc(
+			{
+				"doctype": "CRM Deal",
+				"deal_name": "Timeline",
+				"lead": self.lead.name,
+				"status": "Qualification",
+			}
+		).insert(ignore_permissions=True)
+		self.add_comment("CRM Deal", deal.name, 1)
+		self.add_version("CRM Deal", deal.name, 4, "status", "Qualification", "Negotiation")
+
+		lead_positions = get_positions(get_activities(self.lead.name)[0])
+		activities = get_activities(deal.name)[0]
+		positions = get_positions(activities)
+		self.assertEqual(len(positions), len(lead_positions) + 3)
+		self.assertTrue(set(lead_positions) < set(positions))
+
+		for limit in (1, 2, 4):
+			self.assertEqual(self.get_pages(deal.name, limit), activities, limit)
+
+
+def at(second):
+	return get_datetime("2025-01-06 10:00:00") + timedelta(seconds=second)
+
+
+def get_positions(activities):
+	"""`(creation, name)` of `activities` and their grouped versions, newest first"""
+	positions = []
+	for activity in activities:
+		for entry in [activity, *activity.get("other_versions", [])]:
+			positions.append(get_timeline_position(entry["cursor"]))
+	return sorted(positions, reverse=True)
@@ -0,0 +1,179 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests import IntegrationTestCase
+
+from crm.api.activities import (
+	NOTE_FIELDS,
+	TASK_FIELDS,
+	get_attachments,
+	get_bulk_attachments,
+	get_linked_records,
+)
+
+
+class TestLinkedRecords(IntegrationTestCase):
+	"""The fused loaders of `crm.api.activities` against one query per record"""
+
+	def setUp(self):
+		frappe.set_user("Administrator")
+		self.lead = (
+			frappe.get_doc({"doctype": "CRM Lead", "first_name": "Linked"})
+			.insert(ignore_permissions=True)
+			.name
+		)
+		self.deal = (
+			frappe.get_doc(
+				{"doctype": "CRM Deal", "deal_name": "Linked", "lead": self.lead, "status": "Qualification"}
+			)
+			.insert(ignore_permissions=True)
+			.name
+		)
+
+		self.add_note("CRM Lead", self.lead)
+		self.add_note("CRM Deal", self.deal)
+		self.add_task("CRM Deal", self.deal)
+		call_note = self.add_note()
+		call_task = self.add_task()
+
+		self.add_call("CRM Lead", self.lead)
+		self.add_call("CRM Deal", self.deal)
+		# linked to the lead and the deal, with a note and a task of the call
+		self.add_call(
+			"CRM Deal",
+			self.deal,
+			links=[
+				("CRM Lead", self.lead),
+				("CRM Deal", self.deal),
+				("FCRM Note", call_note),
+				("CRM Task", call_task),
+			],
+		)
+
+	def tearDown(self):
+		frappe.db.rollback()
+
+	def add_note(self, reference_doctype=None, reference_name=None):
+		return (
+			frappe.get_doc(
+				{
+					"doctype": "FCRM Note",
+					"title": "Linked note",
+					"reference_doctype": reference_doctype,
+					"reference_docname": reference_name,
+				}
+			)
+			.insert(ignore_permissions=True)
+			.name
+		)
+
+	def add_task(self, reference_doctype=None, reference_name=None):
+		return (
+			frappe.get_doc(
+				{
+					"doctype": "CRM Task",
+					"title": "Linked task",
+					"reference_doctype": reference_doctype,
+					"reference_docname": reference_name,
+				}
+			)
+			.insert(ignore_permissions=True)
+			.name
+		)
+
+	def add_call(self, reference_doctype, reference_name, links=()):
+		return (
+			frappe.get_doc(
+				{
+					"doctype": "CRM Call Log",
+					"id": frappe.generate_hash(length=12),
+					"type": "Outgoing",
+					"status": "Completed",
+					"from": "+15550100",
+					"to": "+15550101",
+					"reference_doctype": reference_doctype,
+					"reference_docname": reference_name,
+					"links": [{"link_doctype": doctype, "link_name": name} for doctype, name in links],
+				}
+			)
+			.insert(ignore_permissions=True)
+			.name
+		)
+
+	def get_per_record(self, name):
+		"""Calls, notes and tasks of a single lead or deal, one query at a time"""
+		calls = set(frappe.get_all("CRM Call Log", filters={"reference_docname": name}, pluck="name"))
+		call_notes, call_tasks = [], []
+		for call in frappe.get_all(
+			"Dynamic Link", filters={"link_name": name, "parenttype": "CRM Call Log"}, pluck="parent"
+		):
+			for link in frappe.get_doc("CRM Call Log", call).links:
+				if link.link_doctype == "FCRM Note":
+					call_notes.append(link.link_name)
+				elif link.link_doctype == "CRM Task":
+					call_tasks.append(link.link_name)
+				else:
+					calls.add(call)
+
+		notes = frappe.get_all("FCRM Note", filters={"reference_docname": name}, fields=NOTE_FIELDS)
+		notes += frappe.get_all("FCRM Note", filters={"name": ("in", call_notes)}, fields=NOTE_FIELDS)
+		tasks = frappe.get_all("CRM Task", filters={"reference_docname": name}, fields=TASK_FIELDS)
+		tasks += frappe.get_all("CRM Task", filters={"name": ("in", call_tasks)}, fields=TASK_FIELDS)
+		return calls, notes, tasks
+
+	def test_linked_records_match_per_record_queries(self):
+		for names in ([self.lead], [self.lead, self.deal]):
+			expected_calls, expected_notes, expected_tasks = set(), {}, {}
+			for name in names:
+				calls, notes, tasks = self.get_per_record(name)
+				expected_calls |= calls
+				expected_notes.update({note.name: note for note in notes})
+				expected_tasks.update({task.name: task for task in tasks})
+
+			linked = get_linked_records(names)
+			call_names = [call["name"] for call in linked.calls]
+			# a call linked to both the lead and the deal is listed once
+			self.assertEqual(len(call_names), len(set(call_names)))
+			self.assertEqual(set(call_names), expected_calls)
+			self.assertEqual({note.name: note for note in linked.notes}, expected_notes)
+			self.assertEqual({task.name: task for task in linked.tasks}, expected_tasks)
+
+		self.assertEqual(len(expected_calls), 3)
+		self.assertEqual(len(expected_notes), 3)
+		self.assertEqual(len(expected_tasks), 2)
+
+	def test_bulk_attachments_match_per_record_queries(self):
+		comments = [
+			frappe.get_doc(
+				{
+					"doctype": "Comment",
+					"comment_type": "Comment",
+					"reference_doctype": "CRM Lead",
+					"reference_name": self.lead,
+					"content": f"Attachments {i}",
+				}
+			)
+			.insert(ignore_permissions=True)
+			.name
+			for i in range(3)
+		]
+		for i, comment in enumerate(comments[:2]):
+			for j in range(i + 1):
+				frappe.get_doc(
+					{
+						"doctype": "File",
+						"file_name": f"linked-{i}-{j}.txt",
+						"content": "attached",
+						"attached_to_doctype": "Comment",
+						"attached_to_name": comment,
+					}
+				).insert(ignore_permissions=True)
+
+		attachments = get_bulk_attachments("Comment", comments)
+		self.assertEqual([len(attachments[comment]) for comment in comments], [1, 2, 0])
+		for comment in comments:
+			self.assertEqual(
+				sorted(attachments[comment], key=lambda file: file.name),
+				sorted(get_attachments("Comment", comment), key=lambda file: file.name),
+			)
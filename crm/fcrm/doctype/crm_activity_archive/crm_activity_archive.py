@@ -0,0 +1,210 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+import base64
+import json
+import zlib
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import add_days, cint, now_datetime
+
+# statuses after which a lead or deal is not worked on anymore
+CLOSED_STATUSES = {
+	"CRM Lead": ["Unqualified", "Junk"],
+	"CRM Deal": ["Won", "Lost"],
+}
+
+# communications stay in place, they are threaded, linked to several records and carry
+# email attachments
+ARCHIVED_SOURCES = ("Version", "Comment")
+
+
+class CRMActivityArchive(Document):
+	def autoname(self):
+		self.name = get_archive_name(self.reference_doctype, self.reference_name)
+
+
+def get_archive_name(reference_doctype, reference_name):
+	return f"{reference_doctype}-{reference_name}"
+
+
+def compress(data):
+	return base64.b64encode(zlib.compress(frappe.as_json(data, indent=None).encode())).decode()
+
+
+def decompress(data):
+	return json.loads(zlib.decompress(base64.b64decode(data))) if data else {}
+
+
+def get_archived_sources(reference_doctype, reference_name):
+	"""Archived source rows of a lead or deal, as `{source_doctype: {name: row}}`"""
+	data = frappe.db.get_value(
+		"CRM Activity Archive", get_archive_name(reference_doctype, reference_name), "data"
+	)
+	return {
+		doctype: {name: frappe._dict(row) for name, row in rows.items()}
+		for doctype, rows in decompress(data).items()
+	}
+
+
+def archive_closed_records(chunk_size=100):
+	"""Archive the timeline history of leads and deals closed longer than the configured days"""
+	days = cint(frappe.db.get_single_value("FCRM Settings", "archive_timeline_after_days"))
+	if not days:
+		return
+
+	cutoff = add_days(now_datetime(), -days)
+	for doctype, names in get_closed_records(cutoff).items():
+		for i in range(0, len(names), chunk_size):
+			chunk = names[i : i + chunk_size]
+			pending = frappe.get_all(
+				"CRM Activity",
+				filters={
+					"reference_doctype": doctype,
+					"reference_name": ("in", chunk),
+					"source_doctype": ("in", ARCHIVED_SOURCES),
+					"archived": 0,
+				},
+				pluck="reference_name",
+				distinct=True,
+			)
+			for name in pending:
+				archive_record(doctype, name)
+			frappe.db.commit()
+
+
+def get_closed_records(cutoff):
+	"""
+	Leads and deals closed and not modified since `cutoff`, as `{doctype: names}`.
+
+	A converted lead is closed once all deals made from it are closed since `cutoff`.
+	"""
+	deals = frappe.get_all(
+		"CRM Deal",
+		filters=[["status", "in", CLOSED_STATUSES["CRM Deal"]], ["modified", "<", cutoff]],
+		fields=["name", "lead"],
+	)
+	leads = frappe.get_all(
+		"CRM Lead",
+		filters=[["status", "in", CLOSED_STATUSES["CRM Lead"]], ["modified", "<", cutoff]],
+		pluck="name",
+	)
+
+	if converted := list({deal.lead for deal in deals if deal.lead}):
+		# deals of the same lead that are still worked on
+		open_deals = set(
+			frappe.get_all(
+				"CRM Deal",
+				filters=[["lead", "in", converted], ["name", "not in", [deal.name for deal in deals]]],
+				pluck="lead",
+			)
+		)
+		converted = [lead for lead in converted if lead not in open_deals]
+	if converted:
+		leads += frappe.get_all(
+			"CRM Lead", filters=[["name", "in", converted], ["modified", "<", cutoff]], pluck="name"
+		)
+
+	return {"CRM Lead": list(dict.fromkeys(leads)), "CRM Deal": [deal.name for deal in deals]}
+
+
+def archive_record(reference_doctype, reference_name):
+	"""
+	Move the Version and Comment rows of a lead or deal into its CRM Activity Archive and
+	flag their activities as archived. The activities themselves stay, so the timeline
+	reads archived rows only when it reaches them, and activity counters keep counting
+	archived comments from them. Comments with attachments are left in place.
+
+	Rows are moved without doc events, `unarchive_record` restores them.
+	"""
+	activities = frappe.get_all(
+		"CRM Activity",
+		filters={
+			"reference_doctype": reference_doctype,
+			"reference_name": reference_name,
+			"source_doctype": ("in", ARCHIVED_SOURCES),
+			"archived": 0,
+		},
+		fields=["name", "source_doctype", "source_name"],
+	)
+
+	comments = [a.source_name for a in activities if a.source_doctype == "Comment"]
+	if comments:
+		with_files = set(
+			frappe.get_all(
+				"File",
+				filters={"attached_to_doctype": "Comment", "attached_to_name": ("in", comments)},
+				pluck="attached_to_name",
+			)
+		)
+		activities = [
+			a for a in activities if not (a.source_doctype == "Comment" and a.source_name in with_files)
+		]
+
+	if not activities:
+		return
+
+	sources = {}
+	for source_doctype in ARCHIVED_SOURCES:
+		names = [a.source_name for a in activities if a.source_doctype == source_doctype]
+		if names:
+			rows = frappe.get_all(source_doctype, filters={"name": ("in", names)}, fields=["*"])
+			sources[source_doctype] = {row.name: row for row in rows}
+
+	archive_name = get_archive_name(reference_doctype, reference_name)
+	if frappe.db.exists("CRM Activity Archive", archive_name):
+		archive = frappe.get_doc("CRM Activity Archive", archive_name)
+		data = decompress(archive.data)
+		for source_doctype, rows in sources.items():
+			data.setdefault(source_doctype, {}).update(rows)
+	else:
+		archive = frappe.new_doc("CRM Activity Archive")
+		archive.reference_doctype = reference_doctype
+		archive.reference_name = reference_name
+		data = sources
+
+	archive.data = compress(data)
+	archive.activity_count = sum(len(rows) for rows in data.values())
+	archive.archived_on = now_datetime()
+	archive.save(ignore_permissions=True)
+
+	# deleted without doc events, the activities and search entries of these rows stay
+	for source_doctype, rows in sources.items():
+		if rows:
+			frappe.db.delete(source_doctype, {"name": ("in", list(rows))})
+
+	set_archived([a.name for a in activities], 1)
+
+
+@frappe.whitelist(methods=["POST"])
+def unarchive_record(reference_doctype, reference_name):
+	"""Restore the archived rows of a lead or deal and delete its CRM Activity Archive"""
+	frappe.only_for("System Manager")
+
+	archive_name = get_archive_name(reference_doctype, reference_name)
+	if not frappe.db.exists("CRM Activity Archive", archive_name):
+		return
+
+	data = decompress(frappe.db.get_value("CRM Activity Archive", archive_name, "data"))
+	for source_doctype, rows in data.items():
+		existing = set(frappe.get_all(source_doctype, filters={"name": ("in", list(rows))}, pluck="name"))
+		for name, row in rows.items():
+			if name not in existing:
+				frappe.get_doc({**row, "doctype": source_doctype}).db_insert()
+
+	activities = frappe.get_all(
+		"CRM Activity",
+		filters={"reference_doctype": reference_doctype, "reference_name": reference_name, "archived": 1},
+		pluck="name",
+	)
+	set_archived(activities, 0)
+	frappe.delete_doc("CRM Activity Archive", archive_name, ignore_permissions=True)
+
+
+def set_archived(activities, archived):
+	if not activities:
+		return
+
+	Activity = frappe.qb.DocType("CRM Activity")
+	frappe.qb.update(Activity).set(Activity.archived, archived).where(Activity.name.isin(activities)).run()
@@ -0,0 +1,110 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests import IntegrationTestCase
+from frappe.utils import add_days, now_datetime
+
+from crm.api.activities import get_activities
+from crm.fcrm.doctype.crm_activity_archive.crm_activity_archive import (
+	archive_record,
+	get_archive_name,
+	get_archived_sources,
+	get_closed_records,
+	unarchive_record,
+)
+from crm.fcrm.doctype.crm_activity_counter.crm_activity_counter import count_activities
+
+
+class TestCRMActivityArchive(IntegrationTestCase):
+	def setUp(self):
+		frappe.set_user("Administrator")
+		self.lead = frappe.get_doc({"doctype": "CRM Lead", "first_name": "Archive"}).insert(
+			ignore_permissions=True
+		)
+		self.comment = self.add_comment("Archived comment")
+
+	def tearDown(self):
+		frappe.db.rollback()
+
+	def add_comment(self, content):
+		return frappe.get_doc(
+			{
+				"doctype": "Comment",
+				"comment_type": "Comment",
+				"reference_doctype": "CRM Lead",
+				"reference_name": self.lead.name,
+				"content": content,
+			}
+		).insert(ignore_permissions=True)
+
+	def get_comment_activity(self):
+		return frappe.db.get_value(
+			"CRM Activity",
+			{"source_doctype": "Comment", "source_name": self.comment.name},
+			["name", "archived"],
+			as_dict=True,
+		)
+
+	def get_timeline_comments(self):
+		activities = get_activities(self.lead.name)[0]
+		return {a["name"]: a["content"] for a in activities if a["activity_type"] == "comment"}
+
+	def test_archive_round_trip(self):
+		archive_record("CRM Lead", self.lead.name)
+
+		self.assertFalse(frappe.db.exists("Comment", self.comment.name))
+		self.assertTrue(self.get_comment_activity().archived)
+		self.assertIn(self.comment.name, get_archived_sources("CRM Lead", self.lead.name)["Comment"])
+		self.assertIn("Archived comment", self.get_timeline_comments()[self.comment.name])
+
+		unarchive_record("CRM Lead", self.lead.name)
+
+		self.assertEqual(frappe.db.get_value("Comment", self.comment.name, "content"), "Archived comment")
+		self.assertFalse(self.get_comment_activity().archived)
+		self.assertFalse(
+			frappe.db.exists("CRM Activity Archive", get_archive_name("CRM Lead", self.lead.name))
+		)
+		self.assertIn("Archived comment", self.get_timeline_comments()[self.comment.name])
+
+	def test_counts_include_archived_comments(self):
+		self.add_comment("Second comment")
+		self.assertEqual(count_activities("CRM Lead", [self.lead.name])[self.lead.name]["comment_count"], 2)
+
+		archive_record("CRM Lead", self.lead.name)
+		self.assertEqual(count_activities("CRM Lead", [self.lead.name])[self.lead.name]["comment_count"], 2)
+
+		self.add_comment("After archiving")
+		self.assertEqual(count_activities("CRM Lead", [self.lead.name])[self.lead.name]["comment_count"], 3)
+
+	def test_comments_with_attachments_are_not_archived(self):
+		frappe.get_doc(
+			{
+				"doctype": "File",
+				"file_name": "archive.txt",
+				"content": "attached",
+				"attached_to_doctype": "Comment",
+				"attached_to_name": self.comment.name,
+			}
+		).insert(ignore_permissions=True)
+
+		archive_record("CRM Lead", self.lead.name)
+		self.assertTrue(frappe.db.exists("Comment", self.comment.name))
+		self.assertFalse(self.get_comment_activity().archived)
+
+	def test_converted_lead_is_closed_with_its_deal(self):
+		past = add_days(now_datetime(), -10)
+		cutoff = add_days(now_datetime(), -5)
+		deal = frappe.get_doc(
+			{"doctype": "CRM Deal", "deal_name": "Archive", "lead": self.lead.name, "status": "Won"}
+		).insert(ignore_permissions=True)
+		frappe.db.set_value("CRM Lead", self.lead.name, "converted", 1, update_modified=False)
+		for doctype, name in (("CRM Lead", self.lead.name), ("CRM Deal", deal.name)):
+			frappe.db.set_value(doctype, name, "modified", past, update_modified=False)
+		self.assertIn(self.lead.name, get_closed_records(cutoff)["CRM Lead"])
+
+		# not while its deal is open
+		frappe.db.set_value("CRM Deal", deal.name, "status", "Negotiation", update_modified=False)
+		closed = get_closed_records(cutoff)
+		self.assertNotIn(deal.name, closed["CRM Deal"])
+		self.assertNotIn(self.lead.name, closed["CRM Lead"])
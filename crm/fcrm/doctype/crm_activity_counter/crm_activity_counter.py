@@ -0,0 +1,156 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+from frappe.query_builder.functions import Count
+
+ACTIVITY_COUNTER_DOCTYPES = ("CRM Lead", "CRM Deal")
+
+# source table -> (reference name field, extra filters, counter field)
+ACTIVITY_SOURCES = {
+	"Communication": (
+		"reference_name",
+		{"communication_type": ("in", ["Communication", "Automated Message"])},
+		"email_count",
+	),
+	"Comment": ("reference_name", {"comment_type": "Comment"}, "comment_count"),
+	"CRM Task": ("reference_docname", {}, "task_count"),
+	"FCRM Note": ("reference_docname", {}, "note_count"),
+}
+
+COUNTER_FIELDS = ("email_count", "comment_count", "task_count", "note_count")
+
+
+class CRMActivityCounter(Document):
+	def autoname(self):
+		self.name = get_counter_name(self.reference_doctype, self.reference_name)
+
+
+def get_counter_name(reference_doctype, reference_name):
+	return f"{reference_doctype}-{reference_name}"
+
+
+def is_counter_cache_enabled():
+	return frappe.db.get_single_value("FCRM Settings", "enable_activity_counter_cache")
+
+
+def get_activity_counts(doctype, names):
+	"""
+	Return email, comment, task and note counts of all `names` of `doctype`.
+
+	Counts are read from CRM Activity Counter when the counter cache is enabled,
+	otherwise they are computed with one grouped query per source table.
+
+	:return: `{name: {"email_count": int, "comment_count": int, "task_count": int, "note_count": int}}`
+	"""
+	names = list(dict.fromkeys(n for n in names if n))
+	if not names:
+		return {}
+
+	if doctype not in ACTIVITY_COUNTER_DOCTYPES or not is_counter_cache_enabled():
+		return count_activities(doctype, names)
+
+	counters = frappe.get_all(
+		"CRM Activity Counter",
+		filters={"reference_doctype": doctype, "reference_name": ("in", names)},
+		fields=["reference_name", *COUNTER_FIELDS],
+	)
+	counts = {d.reference_name: {f: d.get(f) or 0 for f in COUNTER_FIELDS} for d in counters}
+
+	# backfill counters for records that have none yet
+	missing = [name for name in names if name not in counts]
+	if missing:
+		missing_counts = count_activities(doctype, missing)
+		for name, _counts in missing_counts.items():
+			set_counter(doctype, name, _counts)
+		counts.update(missing_counts)
+
+	return counts
+
+
+def count_activities(doctype, names):
+	"""Count activities of `names` with one `GROUP BY` query per source table, and archived comments"""
+	counts = {name: dict.fromkeys(COUNTER_FIELDS, 0) for name in names}
+
+	for source, (reference_field, filters, counter_field) in ACTIVITY_SOURCES.items():
+		Source = frappe.qb.DocType(source)
+		query = (
+			frappe.qb.from_(Source)
+			.select(Source[reference_field], Count("*").as_("count"))
+			.where(Source.reference_doctype == doctype)
+			.where(Source[reference_field].isin(names))
+			.groupby(Source[reference_field])
+		)
+		for field, value in filters.items():
+			if isinstance(value, tuple):
+				query = query.where(Source[field].isin(value[1]))
+			else:
+				query = query.where(Source[field] == value)
+
+		for name, count in query.run():
+			if name in counts:
+				counts[name][counter_field] = count
+
+	# archived comments are moved out of the Comment table, their activities remain
+	Activity = frappe.qb.DocType("CRM Activity")
+	query = (
+		frappe.qb.from_(Activity)
+		.select(Activity.reference_name, Count("*").as_("count"))
+		.where(Activity.reference_doctype == doctype)
+		.where(Activity.reference_name.isin(names))
+		.where(Activity.source_doctype == "Comment")
+		.where(Activity.activity_type == "comment")
+		.where(Activity.archived == 1)
+		.groupby(Activity.reference_name)
+	)
+	for name, count in query.run():
+		if name in counts:
+			counts[name]["comment_count"] += count
+
+	return counts
+
+
+def set_counter(doctype, name, counts):
+	counter_name = get_counter_name(doctype, name)
+	if frappe.db.exists("CRM Activity Counter", counter_name):
+		frappe.db.set_value("CRM Activity Counter", counter_name, counts, update_modified=False)
+		return
+
+	try:
+		frappe.get_doc(
+			{
+				"doctype": "CRM Activity Counter",
+				"reference_doctype": doctype,
+				"reference_name": name,
+				**counts,
+			}
+		).db_insert()
+	except frappe.DuplicateEntryError:
+		frappe.db.set_value("CRM Activity Counter", counter_name, counts, update_modified=False)
+
+
+def update_activity_counter(doc, method=None):
+	"""
+	Refresh the counter of the lead/deal `doc` refers to, called from activity doc events.
+
+	On update only activities moved to another record are recounted, for both the
+	record they referred to before and the one they refer to now.
+	"""
+	if not is_counter_cache_enabled():
+		return
+
+	references = {get_reference(doc)}
+	if method == "on_update":
+		doc_before_save = doc.get_doc_before_save()
+		if not doc_before_save or get_reference(doc_before_save) in references:
+			return
+		references.add(get_reference(doc_before_save))
+
+	for doctype, name in references:
+		if doctype in ACTIVITY_COUNTER_DOCTYPES and name:
+			set_counter(doctype, name, count_activities(doctype, [name])[name])
+
+
+def get_reference(doc):
+	return doc.get("reference_doctype"), doc.get("reference_name") or doc.get("reference_docname")
@@ -0,0 +1,78 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests import IntegrationTestCase
+
+from crm.fcrm.doctype.crm_activity_counter.crm_activity_counter import (
+	get_activity_counts,
+	get_counter_name,
+)
+
+COUNTER_MODULE = "crm.fcrm.doctype.crm_activity_counter.crm_activity_counter"
+
+
+class TestCRMActivityCounter(IntegrationTestCase):
+	def setUp(self):
+		frappe.set_user("Administrator")
+		self.leads = [
+			frappe.get_doc({"doctype": "CRM Lead", "first_name": f"Counter {i}"})
+			.insert(ignore_permissions=True)
+			.name
+			for i in range(2)
+		]
+
+	def tearDown(self):
+		frappe.db.rollback()
+
+	def add_comment(self, lead):
+		return frappe.get_doc(
+			{
+				"doctype": "Comment",
+				"comment_type": "Comment",
+				"reference_doctype": "CRM Lead",
+				"reference_name": lead,
+				"content": "Counted",
+			}
+		).insert(ignore_permissions=True)
+
+	def get_comment_count(self, lead):
+		return frappe.db.get_value(
+			"CRM Activity Counter", get_counter_name("CRM Lead", lead), "comment_count"
+		)
+
+	def test_counters_are_backfilled(self):
+		# not maintained while the counter cache is disabled
+		with patch(f"{COUNTER_MODULE}.is_counter_cache_enabled", return_value=False):
+			self.add_comment(self.leads[0])
+		self.assertIsNone(self.get_comment_count(self.leads[0]))
+
+		with patch(f"{COUNTER_MODULE}.is_counter_cache_enabled", return_value=True):
+			counts = get_activity_counts("CRM Lead", self.leads)
+
+		self.assertEqual(counts[self.leads[0]]["comment_count"], 1)
+		self.assertEqual(counts[self.leads[1]]["comment_count"], 0)
+		self.assertEqual(self.get_comment_count(self.leads[0]), 1)
+		self.assertEqual(self.get_comment_count(self.leads[1]), 0)
+
+	def test_counter_is_incremented_on_insert(self):
+		with patch(f"{COUNTER_MODULE}.is_counter_cache_enabled", return_value=True):
+			self.add_comment(self.leads[0])
+			self.assertEqual(self.get_comment_count(self.leads[0]), 1)
+			comment = self.add_comment(self.leads[0])
+			self.assertEqual(self.get_comment_count(self.leads[0]), 2)
+
+			comment.delete(ignore_permissions=True)
+			self.assertEqual(self.get_comment_count(self.leads[0]), 1)
+
+	def test_counters_follow_repointed_activity(self):
+		with patch(f"{COUNTER_MODULE}.is_counter_cache_enabled", return_value=True):
+			comment = self.add_comment(self.leads[0])
+			comment.reload()
+			comment.reference_name = self.leads[1]
+			comment.save(ignore_permissions=True)
+
+		self.assertEqual(self.get_comment_count(self.leads[0]), 0)
+		self.assertEqual(self.get_comment_count(self.leads[1]), 1)
@@ -0,0 +1,349 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+import re
+
+import frappe
+from frappe.model.document import Document
+
+from crm.fcrm.doctype.crm_activity.crm_activity import (
+	COMMUNICATION_TYPES,
+	TIMELINE_DOCTYPES,
+	get_communication_references,
+	get_text,
+)
+
+FULLTEXT_INDEX = "crm_activity_search_fulltext"
+SNIPPET_LENGTH = 160
+
+# InnoDB's default FULLTEXT stopwords, they are not indexed and never match
+FULLTEXT_STOPWORDS = frozenset(
+	(
+		"a about an are as at be by com de en for from how i in is it la of on or that the this to was"
+		" what when where who will with und www"
+	).split()
+)
+
+SEARCH_FIELDS = [
+	"name",
+	"creation",
+	"modified",
+	"owner",
+	"modified_by",
+	"reference_doctype",
+	"reference_name",
+	"source_doctype",
+	"source_name",
+	"source_creation",
+	"title",
+	"content",
+]
+
+SOURCE_FIELDS = {
+	"Comment": ["name", "creation", "comment_type", "reference_doctype", "reference_name", "content"],
+	"Communication": [
+		"name",
+		"creation",
+		"communication_type",
+		"reference_doctype",
+		"reference_name",
+		"subject",
+		"content",
+	],
+	"FCRM Note": ["name", "creation", "title", "content", "reference_doctype", "reference_docname"],
+}
+
+
+class CRMActivitySearch(Document):
+	pass
+
+
+def add_fulltext_index():
+	"""Add the FULLTEXT index searches run against, on MariaDB"""
+	if frappe.db.db_type != "mariadb" or not frappe.db.table_exists("CRM Activity Search"):
+		return
+
+	if frappe.db.sql("show index from `tabCRM Activity Search` where Key_name=%s", FULLTEXT_INDEX):
+		return
+
+	frappe.db.sql_ddl(
+		f"alter table `tabCRM Activity Search` add fulltext index `{FULLTEXT_INDEX}` (title, content)"
+	)
+
+
+def search(references, query, limit=20):
+	"""
+	Search communications, comments and notes of `references`, a list of `(doctype, name)`.
+
+	Every word of `query` has to match, as a prefix. Hits are ranked by relevance on MariaDB
+	and by recency otherwise, and come with a snippet around the first match.
+
+	Words the FULLTEXT index does not hold, shorter than its minimum token size, are
+	matched as substrings instead and stopwords are left out, unless the query has
+	nothing else.
+	"""
+	words = re.findall(r"\w+", query or "")
+	if not words or not references:
+		return []
+
+	terms, like_words = [], words
+	if frappe.db.db_type == "mariadb":
+		terms, like_words = get_fulltext_terms(words)
+
+	values = {"limit": limit * 2}
+	conditions = []
+	for i, (doctype, name) in enumerate(references):
+		conditions.append(f"(reference_doctype=%(doctype_{i})s and reference_name=%(name_{i})s)")
+		values[f"doctype_{i}"] = doctype
+		values[f"name_{i}"] = name
+	reference_condition = " or ".join(conditions)
+
+	like = "like" if frappe.db.db_type == "mariadb" else "ilike"
+	word_conditions = []
+	for i, word in enumerate(like_words):
+		word_conditions.append(f"(title {like} %(word_{i})s or content {like} %(word_{i})s)")
+		values[f"word_{i}"] = f"%{word}%"
+	word_condition = "".join(f" and {condition}" for condition in word_conditions)
+
+	if terms:
+		values["against"] = " ".join(f"+{term}*" for term in terms)
+		hits = frappe.db.sql(
+			f"""
+			select source_doctype, source_name, source_creation, title, content,
+				match(title, content) against (%(against)s in boolean mode) as score
+			from `tabCRM Activity Search`
+			where ({reference_condition})
+				and match(title, content) against (%(against)s in boolean mode){word_condition}
+			order by score desc, source_creation desc
+			limit %(limit)s
+			""",
+			values,
+			as_dict=True,
+		)
+	else:
+		hits = frappe.db.sql(
+			f"""
+			select source_doctype, source_name, source_creation, title, content, 0 as score
+			from `tabCRM Activity Search`
+			where ({reference_condition}){word_condition}
+			order by source_creation desc
+			limit %(limit)s
+			""",
+			values,
+			as_dict=True,
+		)
+
+	results = []
+	seen = set()
+	for hit in hits:
+		# a communication linked to both the lead and its deal is indexed for each
+		if (hit.source_doctype, hit.source_name) in seen:
+			continue
+		seen.add((hit.source_doctype, hit.source_name))
+		hit.snippet = get_match_snippet(hit.pop("content") or "", words)
+		results.append(hit)
+
+	return results[:limit]
+
+
+def get_fulltext_terms(words):
+	"""
+	Split `words` into terms to require in a boolean mode FULLTEXT search and words to
+	match as substrings. Stopwords are dropped, unless `words` has nothing else.
+	"""
+	min_token_size = get_fulltext_min_token_size()
+	words = [word for word in words if word.lower() not in FULLTEXT_STOPWORDS] or words
+	terms = [word for word in words if len(word) >= min_token_size and word.lower() not in FULLTEXT_STOPWORDS]
+	return terms, [word for word in words if word not in terms]
+
+
+def get_fulltext_min_token_size():
+	return frappe.cache.get_value(
+		"crm:fulltext_min_token_size",
+		generator=lambda: frappe.db.sql("select @@innodb_ft_min_token_size")[0][0],
+	)
+
+
+def get_match_snippet(text, words):
+	"""Window of `text` around the first occurrence of any of `words`"""
+	match = re.search("|".join(re.escape(word) for word in words), text, re.IGNORECASE)
+	start = max(0, match.start() - SNIPPET_LENGTH // 4) if match else 0
+	snippet = text[start : start + SNIPPET_LENGTH]
+	if start:
+		snippet = "…" + snippet
+	if start + SNIPPET_LENGTH < len(text):
+		snippet += "…"
+	return snippet
+
+
+def get_entries(doctype, rows):
+	"""Search entries of `rows` of a source doctype, one per lead/deal a row belongs to"""
+	references = {}
+	if doctype == "Comment":
+		for row in rows:
+			if row.comment_type == "Comment" and row.reference_doctype in TIMELINE_DOCTYPES:
+				references[row.name] = [(row.reference_doctype, row.reference_name)]
+	elif doctype == "Communication":
+		for row in rows:
+			references[row.name] = get_communication_references(row)
+	elif doctype == "FCRM Note":
+		references = get_note_references(rows)
+
+	entries = []
+	for row in rows:
+		title = row.get("subject") or row.get("title")
+		content = get_text(row.content)
+		for reference_doctype, reference_name in references.get(row.name) or []:
+			entries.append(
+				(
+					frappe.generate_hash(length=10),
+					row.creation,
+					row.creation,
+					"Administrator",
+					"Administrator",
+					reference_doctype,
+					reference_name,
+					doctype,
+					row.name,
+					row.creation,
+					title,
+					content,
+				)
+			)
+	return entries
+
+
+def get_note_references(notes):
+	"""Leads and deals of notes, directly or through the call logs they were taken on"""
+	references = {note.name: [] for note in notes}
+	for note in notes:
+		if note.reference_doctype in TIMELINE_DOCTYPES and note.reference_docname:
+			references[note.name].append((note.reference_doctype, note.reference_docname))
+
+	names = list(references)
+	call_notes = {}
+	for link in frappe.get_all(
+		"Dynamic Link",
+		filters={"parenttype": "CRM Call Log", "link_doctype": "FCRM Note", "link_name": ("in", names)},
+		fields=["parent", "link_name"],
+	):
+		call_notes.setdefault(link.parent, []).append(link.link_name)
+	for call in frappe.get_all("CRM Call Log", filters={"note": ("in", names)}, fields=["name", "note"]):
+		call_notes.setdefault(call.name, []).append(call.note)
+
+	if call_notes:
+		calls = list(call_notes)
+		for call in frappe.get_all(
+			"CRM Call Log",
+			filters={"name": ("in", calls)},
+			fields=["name", "reference_doctype", "reference_docname"],
+		):
+			if call.reference_doctype in TIMELINE_DOCTYPES and call.reference_docname:
+				for note in call_notes[call.name]:
+					references[note].append((call.reference_doctype, call.reference_docname))
+		for link in frappe.get_all(
+			"Dynamic Link",
+			filters={
+				"parenttype": "CRM Call Log",
+				"parent": ("in", calls),
+				"link_doctype": ("in", TIMELINE_DOCTYPES),
+			},
+			fields=["parent", "link_doctype", "link_name"],
+		):
+			for note in call_notes[link.parent]:
+				references[note].append((link.link_doctype, link.link_name))
+
+	return {name: list(dict.fromkeys(refs)) for name, refs in references.items()}
+
+
+def index_sources(doctype, rows):
+	"""Replace the search entries of `rows` of `doctype`"""
+	if not rows:
+		return
+
+	frappe.db.delete(
+		"CRM Activity Search",
+		{"source_doctype": doctype, "source_name": ("in", [row.name for row in rows])},
+	)
+	entries = get_entries(doctype, rows)
+	if entries:
+		frappe.db.bulk_insert("CRM Activity Search", SEARCH_FIELDS, entries)
+
+
+def update_search_index(doc, method=None):
+	"""Index a saved comment, communication or note, called from doc events"""
+	if doc.doctype != "CRM Call Log" and not has_search_changes(doc):
+		return
+
+	if doc.doctype == "CRM Call Log":
+		# linking a call to a lead/deal or a note changes which records its notes belong to
+		notes = [doc.note] if doc.note else []
+		notes += [link.link_name for link in doc.get("links") or [] if link.link_doctype == "FCRM Note"]
+		if notes:
+			index_sources(
+				"FCRM Note",
+				frappe.get_all(
+					"FCRM Note", filters={"name": ("in", notes)}, fields=SOURCE_FIELDS["FCRM Note"]
+				),
+			)
+		return
+
+	row = frappe._dict({field: doc.get(field) for field in SOURCE_FIELDS[doc.doctype]})
+	if doc.doctype == "Communication":
+		row.timeline_links = doc.get("timeline_links")
+	index_sources(doc.doctype, [row])
+
+
+def has_search_changes(doc):
+	"""Whether saving `doc` changes its search entries, e.g. not when a communication is marked as seen"""
+	if not (doc_before_save := doc.get_doc_before_save()):
+		return True
+	if any(doc.has_value_changed(field) for field in SOURCE_FIELDS[doc.doctype]):
+		return True
+	if doc.doctype == "Communication":
+		return get_communication_references(doc) != get_communication_references(doc_before_save)
+	return False
+
+
+def remove_from_search_index(doc, method=None):
+	if doc.doctype == "CRM Call Log":
+		update_search_index(doc)
+		return
+
+	frappe.db.delete("CRM Activity Search", {"source_doctype": doc.doctype, "source_name": doc.name})
+
+
+def build_search_index(chunk_size=500):
+	"""Index existing comments, communications and notes of leads and deals"""
+	filters = {
+		"Comment": {"comment_type": "Comment", "reference_doctype": ("in", TIMELINE_DOCTYPES)},
+		"Communication": {"communication_type": ("in", COMMUNICATION_TYPES)},
+		"FCRM Note": {},
+	}
+	for doctype, fields in SOURCE_FIELDS.items():
+		last = ""
+		while rows := frappe.get_all(
+			doctype,
+			filters={**filters[doctype], "name": (">", last)},
+			fields=fields,
+			order_by="name asc",
+			limit=chunk_size,
+		):
+			if doctype == "Communication":
+				links = {}
+				for link in frappe.get_all(
+					"Communication Link",
+					filters={
+						"parenttype": "Communication",
+						"parent": ("in", [row.name for row in rows]),
+						"link_doctype": ("in", TIMELINE_DOCTYPES),
+					},
+					fields=["parent", "link_doctype", "link_name"],
+				):
+					links.setdefault(link.parent, []).append(link)
+				for row in rows:
+					row.timeline_links = links.get(row.name)
+
+			index_sources(doctype, rows)
+			frappe.db.commit()
+			last = rows[-1].name
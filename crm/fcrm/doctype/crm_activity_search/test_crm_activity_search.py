@@ -0,0 +1,78 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests import IntegrationTestCase
+
+from crm.api.activities import search_activities
+from crm.fcrm.doctype.crm_activity_search.crm_activity_search import get_fulltext_terms
+
+
+class TestCRMActivitySearch(IntegrationTestCase):
+	def setUp(self):
+		frappe.set_user("Administrator")
+		self.lead = frappe.get_doc({"doctype": "CRM Lead", "first_name": "Search"}).insert(
+			ignore_permissions=True
+		)
+		self.communication = frappe.get_doc(
+			{
+				"doctype": "Communication",
+				"communication_type": "Communication",
+				"communication_medium": "Email",
+				"sent_or_received": "Received",
+				"sender": "buyer@example.com",
+				"subject": "Quarterly pricing",
+				"content": "<p>Please send the revised proposal for Q3 by Friday.</p>",
+				"reference_doctype": "CRM Lead",
+				"reference_name": self.lead.name,
+			}
+		).insert(ignore_permissions=True)
+		# FULLTEXT indexes only see committed rows
+		frappe.db.commit()
+
+	def tearDown(self):
+		frappe.set_user("Administrator")
+		frappe.delete_doc("Communication", self.communication.name, force=True, ignore_permissions=True)
+		frappe.delete_doc("CRM Lead", self.lead.name, force=True, ignore_permissions=True)
+		frappe.db.commit()
+
+	def get_entries(self):
+		return frappe.get_all(
+			"CRM Activity Search",
+			filters={"source_doctype": "Communication", "source_name": self.communication.name},
+			fields=["name", "title", "content"],
+		)
+
+	def test_search_finds_communication(self):
+		for query in ("pricing", "revised propos", "proposal for the q3", "the"):
+			results = search_activities(self.lead.name, query)
+			self.assertEqual(
+				[(r.source_doctype, r.source_name) for r in results],
+				[("Communication", self.communication.name)],
+				query,
+			)
+		self.assertEqual(search_activities(self.lead.name, "invoice"), [])
+
+	def test_search_checks_permission(self):
+		frappe.set_user("Guest")
+		with self.assertRaises(frappe.PermissionError):
+			search_activities(self.lead.name, "pricing")
+
+	def test_fulltext_terms_leave_out_stopwords_and_short_words(self):
+		terms, like_words = get_fulltext_terms(["proposal", "for", "the", "Q3"])
+		self.assertNotIn("for", terms + like_words)
+		self.assertNotIn("the", terms + like_words)
+		self.assertIn("proposal", terms)
+		self.assertEqual(get_fulltext_terms(["the"]), ([], ["the"]))
+
+	def test_reindex_only_on_content_changes(self):
+		entries = self.get_entries()
+
+		self.communication.reload()
+		self.communication.seen = 1
+		self.communication.save(ignore_permissions=True)
+		self.assertEqual(self.get_entries(), entries)
+
+		self.communication.content = "<p>Signed</p>"
+		self.communication.save(ignore_permissions=True)
+		self.assertEqual([entry.content for entry in self.get_entries()], ["Signed"])
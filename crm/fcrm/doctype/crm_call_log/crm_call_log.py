@@ -4,7 +4,7 @@
 import frappe
 from frappe.model.document import Document
 
-from crm.integrations.api import get_contact_by_phone_number
+from crm.integrations.api import get_contact_by_phone_number, get_contacts_by_phone_numbers
 from crm.utils import seconds_to_duration
 
 
@@ -81,7 +81,7 @@ class CRMCallLog(Document):
 		return {"columns": columns, "rows": rows}
 
 	def parse_list_data(calls):
-		return [parse_call_log(call) for call in calls] if calls else []
+		return parse_call_logs(calls)
 
 	def has_link(self, doctype, name):
 		for link in self.links:
@@ -95,17 +95,60 @@ class CRMCallLog(Document):
 		self.append("links", {"link_doctype": reference_doctype, "link_name": reference_name})
 
 
+def parse_call_logs(calls):
+	"""
+	Parse a page of call logs. Contacts and users of all calls are resolved up front with a
+	few batched queries, `parse_call_log` then reads them from the request cache.
+	"""
+	if not calls:
+		return []
+
+	numbers = []
+	users = []
+	for call in calls:
+		if call.get("type") == "Incoming":
+			numbers.append(call.get("from"))
+			users.append(call.get("receiver"))
+		elif call.get("type") == "Outgoing":
+			numbers.append(call.get("to"))
+			users.append(call.get("caller"))
+
+	get_contacts_by_phone_numbers(numbers)
+	get_users([user for user in users if user])
+
+	return [parse_call_log(call) for call in calls]
+
+
+def get_users(users):
+	"""Full name and image of `users`, memoized for the request"""
+	cache = frappe.local.cache.setdefault("crm_call_log_users", {})
+	missing = [user for user in dict.fromkeys(users) if user not in cache]
+	if missing:
+		for user in frappe.get_all(
+			"User", filters={"name": ("in", missing)}, fields=["name", "full_name", "user_image"]
+		):
+			cache[user.name] = [user.full_name, user.user_image]
+
+	return {user: cache[user] for user in users if user in cache}
+
+
+def get_user(user):
+	if not user:
+		return [None, None]
+
+	cache = frappe.local.cache.setdefault("crm_call_log_users", {})
+	if user not in cache:
+		cache[user] = frappe.db.get_values("User", user, ["full_name", "user_image"])[0]
+	return cache[user]
+
+
 def parse_call_log(call):
 	call["show_recording"] = False
 	call["_duration"] = seconds_to_duration(call.get("duration"))
 	if call.get("type") == "Incoming":
 		call["activity_type"] = "incoming_call"
 		contact = get_contact_by_phone_number(call.get("from"))
-		receiver = (
-			frappe.db.get_values("User", call.get("receiver"), ["full_name", "user_image"])[0]
-			if call.get("receiver")
-			else [None, None]
-		)
+		receiver = get_user(call.get("receiver"))
 		call["_caller"] = {
 			"label": contact.get("full_name", "Unknown"),
 			"image": contact.get("image"),
@@ -117,11 +160,7 @@ def parse_call_log(call):
 	elif call.get("type") == "Outgoing":
 		call["activity_type"] = "outgoing_call"
 		contact = get_contact_by_phone_number(call.get("to"))
-		caller = (
-			frappe.db.get_values("User", call.get("caller"), ["full_name", "user_image"])[0]
-			if call.get("caller")
-			else [None, None]
-		)
+		caller = get_user(call.get("caller"))
 		call["_caller"] = {
 			"label": caller[0],
 			"image": caller[1],
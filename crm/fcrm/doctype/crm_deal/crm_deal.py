@@ -10,6 +10,7 @@ from crm.fcrm.doctype.crm_service_level_agreement.utils import get_sla
 from crm.fcrm.doctype.crm_status_change_log.crm_status_change_log import (
 	add_status_change_log,
 )
+from crm.utils import get_normalized_phone_number
 
 
 class CRMDeal(Document):
@@ -19,6 +20,7 @@ class CRMDeal(Document):
 	def validate(self):
 		self.set_primary_contact()
 		self.set_primary_email_mobile_no()
+		self.set_normalized_mobile_no()
 		if not self.is_new() and self.has_value_changed("deal_owner") and self.deal_owner:
 			self.share_with_agent(self.deal_owner)
 			self.assign_agent(self.deal_owner)
@@ -45,6 +47,9 @@ class CRMDeal(Document):
 				else:
 					d.is_primary = 0
 
+	def set_normalized_mobile_no(self):
+		self.normalized_mobile_no = get_normalized_phone_number(self.mobile_no)
+
 	def set_primary_email_mobile_no(self):
 		if not self.contacts:
 			self.email = ""
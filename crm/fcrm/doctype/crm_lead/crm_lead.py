@@ -11,6 +11,7 @@ from crm.fcrm.doctype.crm_service_level_agreement.utils import get_sla
 from crm.fcrm.doctype.crm_status_change_log.crm_status_change_log import (
 	add_status_change_log,
 )
+from crm.utils import get_normalized_phone_number
 
 
 class CRMLead(Document):
@@ -22,6 +23,7 @@ class CRMLead(Document):
 		self.set_lead_name()
 		self.set_title()
 		self.validate_email()
+		self.set_normalized_mobile_no()
 		if not self.is_new() and self.has_value_changed("lead_owner") and self.lead_owner:
 			self.share_with_agent(self.lead_owner)
 			self.assign_agent(self.lead_owner)
@@ -64,6 +66,9 @@ class CRMLead(Document):
 	def set_title(self):
 		self.title = self.organization or self.lead_name
 
+	def set_normalized_mobile_no(self):
+		self.normalized_mobile_no = get_normalized_phone_number(self.mobile_no)
+
 	def validate_email(self):
 		if self.email:
 			if not self.flags.ignore_email_validation:
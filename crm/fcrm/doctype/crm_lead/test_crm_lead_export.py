@@ -0,0 +1,74 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+import csv
+import io
+import json
+from unittest.mock import patch
+
+import frappe
+from frappe.tests import IntegrationTestCase
+
+from crm.api.export import export_data, get_export_chunks
+
+COLUMNS = [{"label": "Name", "key": "name"}, {"label": "First Name", "key": "first_name"}]
+
+
+@patch("crm.api.export.EXPORT_CHUNK_SIZE", 2)
+class TestCRMLeadExport(IntegrationTestCase):
+	def setUp(self):
+		frappe.set_user("Administrator")
+		self.organization = frappe.generate_hash(length=12)
+		self.leads = [
+			frappe.get_doc(
+				{"doctype": "CRM Lead", "first_name": f"Export {i}", "organization": self.organization}
+			)
+			.insert(ignore_permissions=True)
+			.name
+			for i in range(5)
+		]
+
+	def tearDown(self):
+		frappe.set_user("Administrator")
+		frappe.db.rollback()
+
+	def export(self, file_format, order_by="name asc"):
+		response = export_data(
+			"CRM Lead",
+			filters={"organization": self.organization},
+			order_by=order_by,
+			columns=COLUMNS,
+			file_format=file_format,
+		)
+		return b"".join(response.response).decode()
+
+	def test_export_is_read_in_chunks(self):
+		chunks = list(
+			get_export_chunks("CRM Lead", ["name"], {"organization": self.organization}, "name asc")
+		)
+		self.assertEqual([len(chunk) for chunk in chunks], [2, 2, 1])
+
+	def test_csv_export_has_all_rows_in_order(self):
+		rows = list(csv.reader(io.StringIO(self.export("CSV"))))
+		self.assertEqual(rows[0], ["Name", "First Name"])
+		self.assertEqual([row[0] for row in rows[1:]], sorted(self.leads))
+
+		rows = list(csv.reader(io.StringIO(self.export("CSV", "name desc"))))
+		self.assertEqual([row[0] for row in rows[1:]], sorted(self.leads, reverse=True))
+
+	def test_jsonl_export_has_all_rows_in_order(self):
+		rows = [json.loads(line) for line in self.export("JSONL").splitlines()]
+		self.assertEqual([row["name"] for row in rows], sorted(self.leads))
+		self.assertEqual(set(rows[0]), {"name", "first_name"})
+
+	def test_export_applies_default_filters(self):
+		response = export_data(
+			"CRM Lead",
+			filters={"organization": self.organization},
+			order_by="name asc",
+			columns=COLUMNS,
+			file_format="JSONL",
+			default_filters={"name": self.leads[0]},
+		)
+		rows = b"".join(response.response).decode().splitlines()
+		self.assertEqual([json.loads(row)["name"] for row in rows], self.leads[:1])
@@ -0,0 +1,196 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+import frappe
+from frappe.custom.doctype.property_setter.property_setter import make_property_setter
+from frappe.desk.form.assign_to import add as add_assignment
+from frappe.tests import IntegrationTestCase
+
+from crm.api.doc import (
+	get_data,
+	get_group_by_counts,
+	get_group_by_data,
+	get_kanban_data,
+	get_list_after_cursor,
+	get_list_counts,
+	get_list_filters,
+	get_list_meta_version,
+	get_seek_condition,
+)
+
+MODIFIED = "2025-01-06 10:00:00"
+
+
+class TestCRMLeadListViews(IntegrationTestCase):
+	"""Kanban, cursor and group by views of `crm.api.doc` over CRM Leads"""
+
+	def setUp(self):
+		frappe.set_user("Administrator")
+		self.organization = frappe.generate_hash(length=12)
+		self.leads = []
+		for i in range(5):
+			lead = frappe.get_doc(
+				{
+					"doctype": "CRM Lead",
+					"first_name": f"List View {i}",
+					"organization": self.organization,
+					"status": "New",
+				}
+			).insert(ignore_permissions=True)
+			# same sort value for all leads, so that only `name` orders them
+			frappe.db.set_value("CRM Lead", lead.name, "modified", MODIFIED, update_modified=False)
+			self.leads.append(lead.name)
+
+	def tearDown(self):
+		frappe.set_user("Administrator")
+		frappe.db.rollback()
+
+	def test_kanban_orders_duplicate_sort_values_by_name(self):
+		filters = {"organization": self.organization}
+		expected = sorted(self.leads, reverse=True)
+
+		for page_length in (2, 5):
+			data = get_kanban_data(
+				"CRM Lead",
+				["name"],
+				filters,
+				"modified desc",
+				"status",
+				[{"name": "New", "page_length": page_length}],
+			)
+			self.assertEqual([d.name for d in data["New"]], expected[:page_length])
+
+	def test_kanban_rejects_unknown_column_field(self):
+		column_field = "status`) as _kanban_rank, (select sleep(5)) as `x"
+		with self.assertRaises(frappe.ValidationError):
+			get_kanban_data(
+				"CRM Lead",
+				["name"],
+				{"organization": self.organization},
+				"modified desc",
+				column_field,
+				[{"name": "New"}],
+			)
+
+	def test_list_counts_are_cached_until_a_lead_changes(self):
+		filters = {"organization": self.organization}
+		self.assertEqual(get_list_counts("CRM Lead", filters, "status").group_counts, {"New": 5})
+
+		# deleted without doc events, so the cached counts are served
+		frappe.db.delete("CRM Lead", self.leads[0])
+		self.assertEqual(get_list_counts("CRM Lead", filters, "status").group_counts, {"New": 5})
+
+		frappe.get_doc("CRM Lead", self.leads[1]).db_set("status", "Contacted")
+		self.assertEqual(
+			get_list_counts("CRM Lead", filters, "status").group_counts, {"Contacted": 1, "New": 3}
+		)
+
+	def test_list_counts_are_invalidated_by_assignments(self):
+		filters = get_list_filters({"organization": self.organization, "_assign": ["like", "%@me%"]})
+		self.assertEqual(get_list_counts("CRM Lead", filters).total_count, 0)
+
+		add_assignment({"doctype": "CRM Lead", "name": self.leads[0], "assign_to": ["Administrator"]})
+		self.assertEqual(get_list_counts("CRM Lead", filters).total_count, 1)
+
+	def test_list_counts_reject_unknown_group_by(self):
+		with self.assertRaises(frappe.ValidationError):
+			get_list_counts("CRM Lead", {}, "status` as group_value, version() as `x")
+
+	def test_list_meta_is_omitted_for_current_version(self):
+		filters = {"organization": self.organization}
+		response = get_data("CRM Lead", filters, "modified desc")
+		self.assertIn("fields", response)
+
+		response = get_data("CRM Lead", filters, "modified desc", meta_version=response["meta_version"])
+		for key in ("fields", "views", "form_script", "list_script"):
+			self.assertNotIn(key, response)
+		self.assertEqual(response["total_count"], 5)
+
+		response = get_data("CRM Lead", filters, "modified desc", meta_version="outdated")
+		self.assertIn("fields", response)
+
+	def test_list_meta_version_changes_with_customizations(self):
+		def assert_version_changes(create):
+			version = get_list_meta_version("CRM Lead")
+			create()
+			self.assertNotEqual(get_list_meta_version("CRM Lead"), version)
+
+		assert_version_changes(
+			lambda: frappe.get_doc(
+				{"doctype": "CRM View Settings", "label": "Meta", "dt": "CRM Lead", "type": "list"}
+			).insert(ignore_permissions=True)
+		)
+		assert_version_changes(
+			lambda: frappe.get_doc(
+				{
+					"doctype": "CRM Form Script",
+					"name": frappe.generate_hash(),
+					"dt": "CRM Lead",
+					"view": "List",
+				}
+			).insert(ignore_permissions=True)
+		)
+		assert_version_changes(
+			lambda: make_property_setter(
+				"CRM Lead", "status", "bold", 1, "Check", validate_fields_for_doctype=False
+			)
+		)
+		# only the doc event, as inserting a custom field alters the table and commits
+		assert_version_changes(
+			lambda: frappe.get_doc(
+				{"doctype": "Custom Field", "dt": "CRM Lead", "fieldname": "meta_test", "fieldtype": "Data"}
+			).run_method("on_change")
+		)
+
+	def test_cursor_pages_duplicate_sort_values_without_gaps(self):
+		filters = [["CRM Lead", "organization", "=", self.organization]]
+
+		for order_by, expected in (
+			("modified desc", sorted(self.leads, reverse=True)),
+			("modified asc", sorted(self.leads)),
+		):
+			names, cursor = [], None
+			while True:
+				records, cursor = get_list_after_cursor("CRM Lead", ["name"], filters, order_by, 2, cursor)
+				names.extend(d.name for d in records)
+				if not cursor:
+					break
+			self.assertEqual(names, expected, order_by)
+
+	def test_seek_condition_compares_tuples(self):
+		condition, params = get_seek_condition(
+			[("modified", "desc"), ("name", "desc")], [MODIFIED, "CRM-LEAD-0001"], "_page"
+		)
+		self.assertEqual(condition, "((_page.`modified`, _page.`name`) < (%(_seek_0)s, %(_seek_1)s))")
+		self.assertEqual(params, {"_seek_0": MODIFIED, "_seek_1": "CRM-LEAD-0001"})
+
+	def test_group_by_applies_me_and_default_filters(self):
+		for name in self.leads[:3]:
+			frappe.db.set_value("CRM Lead", name, "lead_owner", "Administrator", update_modified=False)
+
+		filters = {"organization": self.organization, "lead_owner": "@me"}
+		result = get_group_by_data("CRM Lead", filters, "modified desc", "status", "New", ["name"])
+		self.assertEqual({d.name for d in result["data"]}, set(self.leads[:3]))
+
+		counts = get_group_by_counts("CRM Lead", get_list_filters(filters), "status")
+		self.assertEqual(counts, {"New": 3})
+
+		default_filters = {"name": self.leads[0]}
+		result = get_group_by_data(
+			"CRM Lead", filters, "modified desc", "status", "New", ["name"], default_filters=default_filters
+		)
+		self.assertEqual([d.name for d in result["data"]], self.leads[:1])
+		counts = get_group_by_counts("CRM Lead", get_list_filters(filters, default_filters), "status")
+		self.assertEqual(counts, {"New": 1})
+
+	def test_group_by_rejects_unknown_field(self):
+		group_by_field = "status` = 'x' or sleep(5) or `status"
+		with self.assertRaises(frappe.ValidationError):
+			get_group_by_data("CRM Lead", {}, "modified desc", group_by_field, "New")
+		with self.assertRaises(frappe.ValidationError):
+			get_data(
+				"CRM Lead",
+				{},
+				"modified desc",
+				view={"view_type": "group_by", "group_by_field": group_by_field},
+			)
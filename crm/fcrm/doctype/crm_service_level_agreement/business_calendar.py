@@ -0,0 +1,160 @@
+import math
+from bisect import bisect_left
+from datetime import datetime, timedelta
+
+import frappe
+from frappe.utils import get_weekdays, getdate, to_timedelta
+
+ONE_SECOND = timedelta(seconds=1)
+ONE_DAY = timedelta(days=1)
+ONE_WEEK = timedelta(days=7)
+
+# calendars of saved SLAs, by site, SLA and holiday list and their modified timestamps
+_calendars = {}
+MAX_CACHED_CALENDARS = 128
+
+
+class BusinessCalendar:
+	"""
+	Working hours per weekday and holidays of an SLA, to compute in business time.
+
+	Spans are walked day by day only at their ends, whole weeks in between are counted
+	from the business seconds of a week minus the working hours of the holidays in it.
+	"""
+
+	def __init__(self, working_hours, holidays=()):
+		"""
+		:param working_hours: `{weekday: (start_time, end_time)}`, with weekdays numbered
+		        as by `date.weekday()` and times of day as timedeltas
+		:param holidays: Dates without working hours
+		"""
+		# working hours of a weekday as (start, end) seconds from midnight, rounded up to
+		# whole seconds like `calc_elapsed_time` counts them
+		self.hours = [None] * 7
+		for weekday, (start_time, end_time) in working_hours.items():
+			start, end = ceil_seconds(start_time), ceil_seconds(end_time)
+			if end > start:
+				self.hours[weekday] = (start, end)
+
+		self.week_seconds = sum(end - start for start, end in filter(None, self.hours))
+		self.holidays = frozenset(getdate(d) for d in holidays)
+		# only holidays on working days take time out of a week
+		self.sorted_holidays = sorted(d for d in self.holidays if self.hours[d.weekday()])
+
+	def get_working_hours(self, day):
+		"""Return `(start, end)` datetimes of the working hours on `day`, or None"""
+		hours = self.hours[day.weekday()]
+		if not hours or day in self.holidays:
+			return None
+		midnight = datetime.combine(day, datetime.min.time())
+		return midnight + timedelta(seconds=hours[0]), midnight + timedelta(seconds=hours[1])
+
+	def get_holiday_seconds(self, from_date, to_date):
+		"""Working hours, in seconds, of the holidays from `from_date` up to `to_date`"""
+		res = 0
+		for i in range(bisect_left(self.sorted_holidays, from_date), len(self.sorted_holidays)):
+			day = self.sorted_holidays[i]
+			if day >= to_date:
+				break
+			start, end = self.hours[day.weekday()]
+			res += end - start
+		return res
+
+	def seconds_between(self, start_time, end_time):
+		"""
+		Count the business seconds from `start_time` to `end_time`.
+
+		Seconds are counted from `start_time` on, each by the time of day it starts at.
+		"""
+		if end_time <= start_time:
+			return 0
+
+		start = start_time.replace(microsecond=0)
+		end = start + timedelta(seconds=-((start_time - end_time) // ONE_SECOND))
+		last_day = end.date()
+
+		total_seconds = self.get_overlap(start.date(), start, end)
+		day = start.date() + ONE_DAY
+		if (weeks := (last_day - day).days // 7) > 0:
+			# days before the last one are covered as a whole
+			total_seconds += weeks * self.week_seconds - self.get_holiday_seconds(day, day + weeks * ONE_WEEK)
+			day += weeks * ONE_WEEK
+
+		while day <= last_day:
+			total_seconds += self.get_overlap(day, start, end)
+			day += ONE_DAY
+
+		return total_seconds
+
+	def get_overlap(self, day, start, end):
+		if not (hours := self.get_working_hours(day)):
+			return 0
+		overlap_start, overlap_end = max(start, hours[0]), min(end, hours[1])
+		if overlap_end <= overlap_start:
+			return 0
+		return (overlap_end - overlap_start) // ONE_SECOND
+
+	def add_seconds(self, start_time, seconds):
+		"""
+		Return the earliest time at which `seconds` business seconds have passed since
+		`start_time`, or None if there are no working hours at all.
+		"""
+		if seconds <= 0:
+			return start_time
+		if not self.week_seconds:
+			return None
+
+		remaining = seconds
+		day = start_time.date()
+		if hours := self.get_working_hours(day):
+			start = max(start_time, hours[0])
+			available = (hours[1] - start).total_seconds()
+			if available > 0:
+				if remaining <= available:
+					return start + timedelta(seconds=remaining)
+				remaining -= available
+		day += ONE_DAY
+
+		# skip the whole weeks that do not use up the remaining time
+		while remaining > (week_seconds := self.week_seconds - self.get_holiday_seconds(day, day + ONE_WEEK)):
+			remaining -= week_seconds
+			day += ONE_WEEK
+
+		while True:
+			if hours := self.get_working_hours(day):
+				available = (hours[1] - hours[0]).total_seconds()
+				if remaining <= available:
+					return hours[0] + timedelta(seconds=remaining)
+				remaining -= available
+			day += ONE_DAY
+
+
+def ceil_seconds(time):
+	"""Whole seconds of a Time field value, rounded up"""
+	return math.ceil(to_timedelta(time).total_seconds())
+
+
+def get_business_calendar(sla):
+	"""
+	Business calendar of `sla`, built once per version of the SLA and its holiday list.
+
+	Unsaved SLAs get a new calendar on every call.
+	"""
+	if sla.is_new() or not sla.modified:
+		return make_business_calendar(sla)
+
+	holiday_list_modified = None
+	if sla.holiday_list:
+		holiday_list_modified = frappe.get_cached_value("CRM Holiday List", sla.holiday_list, "modified")
+	key = (frappe.local.site, sla.name, str(sla.modified), sla.holiday_list, str(holiday_list_modified))
+	if key not in _calendars:
+		if len(_calendars) >= MAX_CACHED_CALENDARS:
+			_calendars.clear()
+		_calendars[key] = make_business_calendar(sla)
+	return _calendars[key]
+
+
+def make_business_calendar(sla):
+	weekdays = get_weekdays()
+	working_hours = {weekdays.index(workday): hours for workday, hours in sla.get_working_hours().items()}
+	return BusinessCalendar(working_hours, sla.get_holidays())
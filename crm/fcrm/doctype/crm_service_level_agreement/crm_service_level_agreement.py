@@ -1,18 +1,18 @@
 # Copyright (c) 2023, Frappe Technologies Pvt. Ltd. and contributors
 # For license information, please see license.txt
 
+from datetime import timedelta
+
 import frappe
 from frappe import _
-from datetime import timedelta
 from frappe.model.document import Document
 from frappe.utils import (
-	add_to_date,
 	get_datetime,
 	get_weekdays,
-	getdate,
 	now_datetime,
-	time_diff_in_seconds,
 )
+
+from crm.fcrm.doctype.crm_service_level_agreement.business_calendar import get_business_calendar
 from crm.fcrm.doctype.crm_service_level_agreement.utils import get_context
 
 
@@ -30,9 +30,7 @@ class CRMServiceLevelAgreement(Document):
 			)
 			if other_slas:
 				frappe.throw(
-					_(
-						"Default Service Level Agreement already exists for {0}"
-					).format(self.apply_on)
+					_("Default Service Level Agreement already exists for {0}").format(self.apply_on)
 				)
 
 	def validate_condition(self):
@@ -42,9 +40,7 @@ class CRMServiceLevelAgreement(Document):
 			temp_doc = frappe.new_doc(self.apply_on)
 			frappe.safe_eval(self.condition, None, get_context(temp_doc))
 		except Exception as e:
-			frappe.throw(
-				_("The Condition '{0}' is invalid: {1}").format(self.condition, str(e))
-			)
+			frappe.throw(_("The Condition '{0}' is invalid: {1}").format(self.condition, str(e)))
 
 	def apply(self, doc: Document):
 		self.handle_creation(doc)
@@ -63,9 +59,7 @@ class CRMServiceLevelAgreement(Document):
 
 	def set_first_responded_on(self, doc: Document):
 		if doc.communication_status != self.get_default_priority():
-			doc.first_responded_on = (
-				doc.first_responded_on or now_datetime()
-			)
+			doc.first_responded_on = doc.first_responded_on or now_datetime()
 
 	def set_first_response_time(self, doc: Document):
 		start_at = doc.sla_creation
@@ -112,34 +106,12 @@ class CRMServiceLevelAgreement(Document):
 		start_at: str,
 		duration_seconds: int,
 	):
-		res = get_datetime(start_at)
-		time_needed = duration_seconds
-		holidays = self.get_holidays()
-		weekdays = get_weekdays()
-		workdays = self.get_workdays()
-		while time_needed:
-			today = res
-			today_day = getdate(today)
-			today_weekday = weekdays[today.weekday()]
-			is_workday = today_weekday in workdays
-			is_holiday = today_day in holidays
-			if is_holiday or not is_workday:
-				res = add_to_date(res, days=1, as_datetime=True)
-				continue
-			today_workday = workdays[today_weekday]
-			now_in_seconds = time_diff_in_seconds(today, today_day)
-			start_time = max(today_workday.start_time.total_seconds(), now_in_seconds)
-			till_start_time = max(start_time - now_in_seconds, 0)
-			end_time = max(today_workday.end_time.total_seconds(), now_in_seconds)
-			time_left = max(end_time - start_time, 0)
-			if not time_left:
-				res = getdate(add_to_date(res, days=1, as_datetime=True))
-				continue
-			time_taken = min(time_needed, time_left)
-			time_needed -= time_taken
-			time_required = till_start_time + time_taken
-			res = add_to_date(res, seconds=time_required, as_datetime=True)
-		return res
+		"""
+		Get the time at which `duration_seconds` of working hours have passed since `start_at`
+
+		:return: Datetime, or None if the SLA has no working hours
+		"""
+		return self.get_business_calendar().add_seconds(get_datetime(start_at), duration_seconds)
 
 	def calc_elapsed_time(self, start_time, end_time) -> float:
 		"""
@@ -149,25 +121,10 @@ class CRMServiceLevelAgreement(Document):
 		:param end_at: Date at which calculation ends
 		:return: Number of seconds
 		"""
-		start_time = get_datetime(start_time)
-		end_time = get_datetime(end_time)
-		holiday_list = []
-		working_day_list = self.get_working_days()
-		working_hours = self.get_working_hours()
-
-		total_seconds = 0
-		current_time = start_time
-
-		while current_time < end_time:
-			in_holiday_list = current_time.date() in holiday_list
-			not_in_working_day_list = get_weekdays()[current_time.weekday()] not in working_day_list
-			if in_holiday_list or not_in_working_day_list or not self.is_working_time(current_time, working_hours):
-				current_time += timedelta(seconds=1)
-				continue
-			total_seconds += 1
-			current_time += timedelta(seconds=1)
-
-		return total_seconds
+		return self.get_business_calendar().seconds_between(get_datetime(start_time), get_datetime(end_time))
+
+	def get_business_calendar(self):
+		return get_business_calendar(self)
 
 	def get_priorities(self):
 		"""
@@ -1,9 +1,128 @@
 # Copyright (c) 2023, Frappe Technologies Pvt. Ltd. and Contributors
 # See license.txt
 
-# import frappe
+import random
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import frappe
 from frappe.tests import UnitTestCase
+from frappe.utils import get_weekdays
+
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+BASE_DATETIME = datetime(2025, 1, 6)  # a Monday
+
+
+def make_sla(working_hours):
+	sla = frappe.new_doc("CRM Service Level Agreement")
+	for workday, start_time, end_time in working_hours:
+		sla.append("working_hours", {"workday": workday, "start_time": start_time, "end_time": end_time})
+	return sla
+
+
+def elapsed_time_by_second(sla, start_time, end_time, holidays=()):
+	"""The second by second implementation `calc_elapsed_time` replaced, as reference"""
+	working_day_list = sla.get_working_days()
+	working_hours = sla.get_working_hours()
+
+	total_seconds = 0
+	current_time = start_time
+	while current_time < end_time:
+		in_holiday_list = current_time.date() in holidays
+		not_in_working_day_list = get_weekdays()[current_time.weekday()] not in working_day_list
+		if in_holiday_list or not_in_working_day_list or not sla.is_working_time(current_time, working_hours):
+			current_time += timedelta(seconds=1)
+			continue
+		total_seconds += 1
+		current_time += timedelta(seconds=1)
+
+	return total_seconds
 
 
 class TestCRMServiceLevelAgreement(UnitTestCase):
-	pass
+	def test_elapsed_time_office_hours(self):
+		sla = make_sla((day, timedelta(hours=9), timedelta(hours=18)) for day in WEEKDAYS[:5])
+
+		# friday 17:00 to monday 10:00, one hour on each side of the weekend
+		start = BASE_DATETIME + timedelta(days=4, hours=17)
+		self.assertEqual(sla.calc_elapsed_time(start, start + timedelta(days=2, hours=17)), 2 * 3600)
+		self.assertEqual(sla.calc_elapsed_time(start, start), 0)
+		self.assertEqual(sla.calc_elapsed_time(start, start - timedelta(hours=1)), 0)
+
+	def test_elapsed_time_skips_holidays(self):
+		sla = make_sla((day, timedelta(hours=9), timedelta(hours=18)) for day in WEEKDAYS[:5])
+		tuesday = (BASE_DATETIME + timedelta(days=1)).date()
+
+		with patch.object(sla, "get_holidays", return_value=[tuesday]):
+			elapsed = sla.calc_elapsed_time(BASE_DATETIME, BASE_DATETIME + timedelta(days=3))
+		self.assertEqual(elapsed, 2 * 9 * 3600)
+
+	def test_elapsed_time_matches_reference(self):
+		rng = random.Random(42)
+		for _i in range(40):
+			working_hours = []
+			for day in rng.sample(WEEKDAYS, rng.randint(0, 7)):
+				start_time = timedelta(seconds=rng.randint(0, 86399))
+				end_time = timedelta(seconds=rng.choice([86399, rng.randint(0, 86399)]))
+				working_hours.append((day, start_time, end_time))
+			sla = make_sla(working_hours)
+
+			holidays = {
+				(BASE_DATETIME + timedelta(days=rng.randint(0, 2))).date() for _j in range(rng.randint(0, 1))
+			}
+			start = BASE_DATETIME + timedelta(
+				seconds=rng.randint(0, 2 * 86400), microseconds=rng.choice([0, rng.randint(0, 999999)])
+			)
+			end = start + timedelta(
+				seconds=rng.randint(-60, rng.choice([600, 26 * 3600])),
+				microseconds=rng.choice([0, rng.randint(0, 999999)]),
+			)
+
+			with patch.object(sla, "get_holidays", return_value=list(holidays)):
+				elapsed = sla.calc_elapsed_time(start, end)
+			self.assertEqual(
+				elapsed,
+				elapsed_time_by_second(sla, start, end, holidays),
+				f"{working_hours=} {holidays=} {start=} {end=}",
+			)
+
+	def test_calc_time_office_hours(self):
+		sla = make_sla((day, timedelta(hours=9), timedelta(hours=18)) for day in WEEKDAYS[:5])
+		friday = BASE_DATETIME + timedelta(days=4)
+
+		monday = friday + timedelta(days=3)
+
+		self.assertEqual(sla.calc_time(friday + timedelta(hours=17), 2 * 3600), monday + timedelta(hours=10))
+		self.assertEqual(sla.calc_time(friday + timedelta(hours=8), 9 * 3600), friday + timedelta(hours=18))
+		# started on a weekend, counts from monday morning
+		saturday = friday + timedelta(days=1)
+		self.assertEqual(sla.calc_time(saturday + timedelta(hours=15), 3600), monday + timedelta(hours=10))
+		# five weeks of working hours
+		self.assertEqual(
+			sla.calc_time(BASE_DATETIME, 25 * 9 * 3600), BASE_DATETIME + timedelta(days=32, hours=18)
+		)
+
+		with patch.object(sla, "get_holidays", return_value=[monday.date()]):
+			self.assertEqual(
+				sla.calc_time(friday + timedelta(hours=17), 2 * 3600), monday + timedelta(days=1, hours=10)
+			)
+
+	def test_calc_time_is_inverse_of_elapsed_time(self):
+		rng = random.Random(7)
+		for _i in range(100):
+			working_hours = []
+			for day in rng.sample(WEEKDAYS, rng.randint(1, 7)):
+				start_time = timedelta(seconds=rng.randint(0, 80000))
+				working_hours.append((day, start_time, start_time + timedelta(seconds=rng.randint(1, 6400))))
+			sla = make_sla(working_hours)
+
+			holidays = [
+				(BASE_DATETIME + timedelta(days=rng.randint(0, 60))).date() for _j in range(rng.randint(0, 8))
+			]
+			start = BASE_DATETIME + timedelta(seconds=rng.randint(0, 30 * 86400))
+			seconds = rng.randint(1, 10**6)
+
+			with patch.object(sla, "get_holidays", return_value=holidays):
+				end = sla.calc_time(start, seconds)
+				self.assertEqual(sla.calc_elapsed_time(start, end), seconds)
+				self.assertLess(sla.calc_elapsed_time(start, end - timedelta(seconds=1)), seconds)
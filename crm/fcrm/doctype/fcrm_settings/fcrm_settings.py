@@ -15,6 +15,7 @@ class FCRMSettings(Document):
 
 	def validate(self):
 		self.do_not_allow_to_delete_if_standard()
+		self.reset_activity_counters()
 
 	def do_not_allow_to_delete_if_standard(self):
 		if not self.has_value_changed("dropdown_items"):
@@ -26,6 +27,10 @@ class FCRMSettings(Document):
 		if deleted_standard_items:
 			frappe.throw(_("Cannot delete standard items {0}").format(", ".join(deleted_standard_items)))
 
+	def reset_activity_counters(self):
+		# counters are not maintained while disabled, let them backfill from scratch
+		if self.has_value_changed("enable_activity_counter_cache") and self.enable_activity_counter_cache:
+			frappe.db.delete("CRM Activity Counter")
 
 
 def after_migrate():
@@ -141,22 +141,122 @@ override_doctype_class = {
 doc_events = {
 	"Contact": {
 		"validate": ["crm.api.contact.validate"],
+		"on_update": ["crm.integrations.phone_cache.clear_phone_cache"],
+		"after_delete": ["crm.integrations.phone_cache.clear_phone_cache"],
 	},
 	"ToDo": {
 		"after_insert": ["crm.api.todo.after_insert"],
 		"on_update": ["crm.api.todo.on_update"],
 	},
 	"Comment": {
-		"on_update": ["crm.api.comment.on_update"],
+		"on_update": [
+			"crm.api.comment.on_update",
+			"crm.fcrm.doctype.crm_activity_counter.crm_activity_counter.update_activity_counter",
+			"crm.fcrm.doctype.crm_activity.crm_activity.update_snippet",
+			"crm.fcrm.doctype.crm_activity_search.crm_activity_search.update_search_index",
+		],
+		"after_insert": [
+			"crm.fcrm.doctype.crm_activity_counter.crm_activity_counter.update_activity_counter",
+			"crm.fcrm.doctype.crm_activity.crm_activity.add_activity",
+		],
+		"after_delete": [
+			"crm.fcrm.doctype.crm_activity_counter.crm_activity_counter.update_activity_counter",
+			"crm.fcrm.doctype.crm_activity.crm_activity.remove_activities",
+			"crm.fcrm.doctype.crm_activity_search.crm_activity_search.remove_from_search_index",
+		],
+	},
+	"Communication": {
+		"after_insert": [
+			"crm.fcrm.doctype.crm_activity_counter.crm_activity_counter.update_activity_counter"
+		],
+		"on_update": [
+			"crm.fcrm.doctype.crm_activity_counter.crm_activity_counter.update_activity_counter",
+			"crm.fcrm.doctype.crm_activity.crm_activity.add_activity",
+			"crm.fcrm.doctype.crm_activity.crm_activity.update_snippet",
+			"crm.fcrm.doctype.crm_activity_search.crm_activity_search.update_search_index",
+		],
+		"after_delete": [
+			"crm.fcrm.doctype.crm_activity_counter.crm_activity_counter.update_activity_counter",
+			"crm.fcrm.doctype.crm_activity.crm_activity.remove_activities",
+			"crm.fcrm.doctype.crm_activity_search.crm_activity_search.remove_from_search_index",
+		],
+	},
+	"Version": {
+		"after_insert": ["crm.fcrm.doctype.crm_activity.crm_activity.add_activity"],
+		"after_delete": ["crm.fcrm.doctype.crm_activity.crm_activity.remove_activities"],
+	},
+	"CRM Task": {
+		"after_insert": [
+			"crm.fcrm.doctype.crm_activity_counter.crm_activity_counter.update_activity_counter"
+		],
+		"on_update": ["crm.fcrm.doctype.crm_activity_counter.crm_activity_counter.update_activity_counter"],
+		"after_delete": [
+			"crm.fcrm.doctype.crm_activity_counter.crm_activity_counter.update_activity_counter"
+		],
+	},
+	"FCRM Note": {
+		"after_insert": [
+			"crm.fcrm.doctype.crm_activity_counter.crm_activity_counter.update_activity_counter"
+		],
+		"on_update": [
+			"crm.fcrm.doctype.crm_activity_counter.crm_activity_counter.update_activity_counter",
+			"crm.fcrm.doctype.crm_activity_search.crm_activity_search.update_search_index",
+		],
+		"after_delete": [
+			"crm.fcrm.doctype.crm_activity_counter.crm_activity_counter.update_activity_counter",
+			"crm.fcrm.doctype.crm_activity_search.crm_activity_search.remove_from_search_index",
+		],
+	},
+	"CRM Call Log": {
+		"on_update": ["crm.fcrm.doctype.crm_activity_search.crm_activity_search.update_search_index"],
+		"after_delete": ["crm.fcrm.doctype.crm_activity_search.crm_activity_search.remove_from_search_index"],
 	},
 	"WhatsApp Message": {
 		"validate": ["crm.api.whatsapp.validate"],
 		"on_update": ["crm.api.whatsapp.on_update"],
 	},
+	"CRM Lead": {
+		"after_insert": ["crm.fcrm.doctype.crm_activity.crm_activity.add_activity"],
+		"on_change": [
+			"crm.api.doc.clear_list_counts_cache",
+			"crm.integrations.phone_cache.clear_phone_cache",
+		],
+		"after_delete": [
+			"crm.api.doc.clear_list_counts_cache",
+			"crm.fcrm.doctype.crm_activity.crm_activity.remove_activities",
+			"crm.integrations.phone_cache.clear_phone_cache",
+		],
+	},
 	"CRM Deal": {
 		"on_update": [
 			"crm.fcrm.doctype.erpnext_crm_settings.erpnext_crm_settings.create_customer_in_erpnext"
 		],
+		"after_insert": ["crm.fcrm.doctype.crm_activity.crm_activity.add_activity"],
+		"on_change": [
+			"crm.api.doc.clear_list_counts_cache",
+			"crm.integrations.phone_cache.clear_phone_cache",
+		],
+		"after_delete": [
+			"crm.api.doc.clear_list_counts_cache",
+			"crm.fcrm.doctype.crm_activity.crm_activity.remove_activities",
+			"crm.integrations.phone_cache.clear_phone_cache",
+		],
+	},
+	"CRM View Settings": {
+		"on_change": ["crm.api.doc.clear_list_meta_cache"],
+		"after_delete": ["crm.api.doc.clear_list_meta_cache"],
+	},
+	"CRM Form Script": {
+		"on_change": ["crm.api.doc.clear_list_meta_cache"],
+		"after_delete": ["crm.api.doc.clear_list_meta_cache"],
+	},
+	"Custom Field": {
+		"on_change": ["crm.api.doc.clear_list_meta_cache"],
+		"after_delete": ["crm.api.doc.clear_list_meta_cache"],
+	},
+	"Property Setter": {
+		"on_change": ["crm.api.doc.clear_list_meta_cache"],
+		"after_delete": ["crm.api.doc.clear_list_meta_cache"],
 	},
 	"User": {
 		"before_validate": ["crm.api.demo.validate_user"],
@@ -167,23 +267,9 @@ doc_events = {
 # Scheduled Tasks
 # ---------------
 
-# scheduler_events = {
-# "all": [
-# "crm.tasks.all"
-# ],
-# "daily": [
-# "crm.tasks.daily"
-# ],
-# "hourly": [
-# "crm.tasks.hourly"
-# ],
-# "weekly": [
-# "crm.tasks.weekly"
-# ],
-# "monthly": [
-# "crm.tasks.monthly"
-# ],
-# }
+scheduler_events = {
+	"daily_long": ["crm.fcrm.doctype.crm_activity_archive.crm_activity_archive.archive_closed_records"],
+}
 
 # Testing
 # -------
@@ -211,12 +297,17 @@ doc_events = {
 # Ignore links to specified DocTypes when deleting documents
 # -----------------------------------------------------------
 
-# ignore_links_on_delete = ["Communication", "ToDo"]
+ignore_links_on_delete = [
+	"CRM Activity",
+	"CRM Activity Archive",
+	"CRM Activity Counter",
+	"CRM Activity Search",
+]
 
 # Request Events
 # ----------------
-# before_request = ["crm.utils.before_request"]
-# after_request = ["crm.utils.after_request"]
+before_request = ["crm.utils.instrumentation.before_request"]
+after_request = ["crm.utils.instrumentation.after_request"]
 
 # Job Events
 # ----------
@@ -254,7 +345,11 @@ doc_events = {
 # "crm.auth.validate"
 # ]
 
-after_migrate = ["crm.fcrm.doctype.fcrm_settings.fcrm_settings.after_migrate"]
+after_migrate = [
+	"crm.fcrm.doctype.fcrm_settings.fcrm_settings.after_migrate",
+	"crm.utils.indexes.add_crm_indexes",
+	"crm.fcrm.doctype.crm_activity_search.crm_activity_search.add_fulltext_index",
+]
 
 standard_dropdown_items = [
 	{
@@ -16,6 +16,7 @@ def after_install(force=False):
 	add_default_fields_layout(force)
 	add_property_setter()
 	add_email_template_custom_fields()
+	add_contact_phone_custom_fields()
 	add_default_industries()
 	add_default_lead_sources()
 	add_standard_dropdown_items()
@@ -253,6 +254,30 @@ def add_email_template_custom_fields():
 		frappe.clear_cache(doctype="Email Template")
 
 
+def add_contact_phone_custom_fields():
+	if not frappe.get_meta("Contact Phone").has_field("normalized_phone"):
+		click.secho("* Installing Custom Fields in Contact Phone")
+
+		create_custom_fields(
+			{
+				"Contact Phone": [
+					{
+						"fieldname": "normalized_phone",
+						"fieldtype": "Data",
+						"label": "Normalized Phone",
+						"insert_after": "phone",
+						"hidden": 1,
+						"read_only": 1,
+						"no_copy": 1,
+						"search_index": 1,
+					},
+				]
+			}
+		)
+
+		frappe.clear_cache(doctype="Contact Phone")
+
+
 def add_default_industries():
 	industries = [
 		"Accounting",
@@ -1,8 +1,8 @@
 import frappe
 from frappe.query_builder import Order
-from pypika.functions import Replace
 
-from crm.utils import are_same_phone_number, parse_phone_number
+from crm.integrations.phone_cache import get_cached
+from crm.utils import normalize_phone_numbers
 
 
 @frappe.whitelist()
@@ -107,75 +107,110 @@ def add_task_to_call_log(call_sid, task):
 @frappe.whitelist()
 def get_contact_by_phone_number(phone_number):
 	"""Get contact by phone number."""
-	number = parse_phone_number(phone_number)
+	contacts = get_request_contacts()
+	if phone_number not in contacts:
+		contacts[phone_number] = get_contact(phone_number)
+	return contacts[phone_number]
 
-	if number.get("is_valid"):
-		return get_contact(number.get("national_number"))
-	else:
-		return get_contact(phone_number, exact_match=True)
+
+def get_contacts_by_phone_numbers(phone_numbers):
+	"""
+	Batch version of `get_contact_by_phone_number`.
+
+	Contacts, their primary deals and leads of all `phone_numbers` are resolved with one
+	query each instead of a few queries per number. Results are memoized for the request.
+
+	:return: `{phone_number: contact}`
+	"""
+	contacts = get_request_contacts()
+	missing = [n for n in dict.fromkeys(phone_numbers) if n not in contacts]
+	if missing:
+		contacts.update(resolve_contacts(missing))
+
+	return {phone_number: contacts[phone_number] for phone_number in phone_numbers}
+
+
+def get_request_contacts():
+	return frappe.local.cache.setdefault("crm_contacts_by_phone_number", {})
 
 
-def get_contact(phone_number, exact_match=False):
-	if not phone_number:
-		return {"mobile_no": phone_number}
+def resolve_contacts(phone_numbers):
+	"""
+	Resolve `phone_numbers` to the contact, or else the unconverted lead, having that number.
 
-	cleaned_number = (
-		phone_number.strip()
-		.replace(" ", "")
-		.replace("-", "")
-		.replace("(", "")
-		.replace(")", "")
-		.replace("+", "")
-	)
+	Resolutions are cached by E.164 number, see `crm.integrations.phone_cache`.
+	"""
+	normalized = normalize_phone_numbers(phone_numbers)
+	records = get_cached("contact", [n for n in normalized.values() if n], find_contacts)
 
-	# Check if the number is associated with a contact
+	return {
+		phone_number: frappe._dict(records[number]) if records.get(number) else {"mobile_no": phone_number}
+		for phone_number, number in normalized.items()
+	}
+
+
+def find_contacts(numbers):
+	"""
+	Return `{number: contact or lead}` of E.164 `numbers`, None for numbers without either.
+
+	Numbers are matched on the indexed `normalized_phone` of Contact Phone and
+	`normalized_mobile_no` of CRM Lead. A contact that is the primary contact of a deal
+	comes with that `deal`.
+	"""
+	ContactPhone = frappe.qb.DocType("Contact Phone")
 	Contact = frappe.qb.DocType("Contact")
-	normalized_phone = Replace(
-		Replace(Replace(Replace(Replace(Contact.mobile_no, " ", ""), "-", ""), "(", ""), ")", ""), "+", ""
-	)
-
-	query = (
-		frappe.qb.from_(Contact)
-		.select(Contact.name, Contact.full_name, Contact.image, Contact.mobile_no)
-		.where(normalized_phone.like(f"%{cleaned_number}%"))
-		.orderby("modified", order=Order.desc)
-	)
-	contacts = query.run(as_dict=True)
-
-	if len(contacts):
-		# Check if the contact is associated with a deal
-		for contact in contacts:
-			if frappe.db.exists("CRM Contacts", {"contact": contact.name, "is_primary": 1}):
-				deal = frappe.db.get_value(
-					"CRM Contacts", {"contact": contact.name, "is_primary": 1}, "parent"
-				)
-				if are_same_phone_number(contact.mobile_no, phone_number, validate=not exact_match):
-					contact["deal"] = deal
-					return contact
-		# Else, return the first contact
-		if are_same_phone_number(contacts[0].mobile_no, phone_number, validate=not exact_match):
-			return contacts[0]
-
-	# Else, Check if the number is associated with a lead
-	Lead = frappe.qb.DocType("CRM Lead")
-	normalized_phone = Replace(
-		Replace(Replace(Replace(Replace(Lead.mobile_no, " ", ""), "-", ""), "(", ""), ")", ""), "+", ""
-	)
-
-	query = (
-		frappe.qb.from_(Lead)
-		.select(Lead.name, Lead.lead_name, Lead.image, Lead.mobile_no)
-		.where(Lead.converted == 0)
-		.where(normalized_phone.like(f"%{cleaned_number}%"))
-		.orderby("modified", order=Order.desc)
-	)
-	leads = query.run(as_dict=True)
-
-	if len(leads):
-		for lead in leads:
-			if are_same_phone_number(lead.mobile_no, phone_number, validate=not exact_match):
-				lead["lead"] = lead.name
-				lead["full_name"] = lead.lead_name
-				return lead
-
-	return {"mobile_no": phone_number}
+	contacts = (
+		frappe.qb.from_(ContactPhone)
+		.join(Contact)
+		.on(Contact.name == ContactPhone.parent)
+		.select(
+			ContactPhone.normalized_phone,
+			Contact.name,
+			Contact.full_name,
+			Contact.image,
+			Contact.mobile_no,
+		)
+		.where(ContactPhone.parenttype == "Contact")
+		.where(ContactPhone.normalized_phone.isin(numbers))
+		.orderby(Contact.modified, order=Order.desc)
+	).run(as_dict=True)
+
+	deals = {}
+	if contacts:
+		for d in frappe.get_all(
+			"CRM Contacts",
+			filters={"contact": ("in", list({c.name for c in contacts})), "is_primary": 1},
+			fields=["contact", "parent"],
+		):
+			deals.setdefault(d.contact, d.parent)
+
+	matches = {}
+	for contact in contacts:
+		number_matches = matches.setdefault(contact.pop("normalized_phone"), {})
+		number_matches.setdefault(contact.name, contact)
+
+	resolved = {}
+	for number, number_matches in matches.items():
+		for contact in number_matches.values():
+			if contact.name in deals:
+				resolved[number] = frappe._dict(contact, deal=deals[contact.name])
+				break
+		else:
+			resolved[number] = next(iter(number_matches.values()))
+
+	if pending := [number for number in numbers if number not in resolved]:
+		for lead in frappe.get_all(
+			"CRM Lead",
+			filters={"normalized_mobile_no": ("in", pending), "converted": 0},
+			fields=["name", "lead_name", "image", "mobile_no", "normalized_mobile_no"],
+			order_by="modified desc",
+		):
+			number = lead.pop("normalized_mobile_no")
+			if number not in resolved:
+				resolved[number] = frappe._dict(lead, lead=lead.name, full_name=lead.lead_name)
+
+	return {number: resolved.get(number) for number in numbers}
+
+
+def get_contact(phone_number):
+	return resolve_contacts([phone_number])[phone_number]
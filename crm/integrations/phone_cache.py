@@ -0,0 +1,215 @@
+"""
+Cache of phone number resolutions, for inbound calls, call logs and WhatsApp messages.
+
+Resolutions are keyed by E.164 number and kept in an in-process LRU per site, backed by
+redis. Saving or deleting a Contact (and so its Contact Phone rows), CRM Lead or CRM Deal
+invalidates the numbers it affects, once the transaction commits: their redis entries are
+deleted and the numbers are appended to an invalidation log in redis, that every process
+replays on its next lookup to evict just those numbers from its LRU.
+
+Hits and misses are counted per layer and readable with `get_phone_cache_stats`.
+"""
+
+import json
+import threading
+from collections import OrderedDict
+
+import frappe
+from frappe.utils import cint
+
+# resolutions of phone numbers to a contact, lead or deal, and to the record a WhatsApp
+# message from it belongs to
+NAMESPACES = ("contact", "record")
+
+LOCAL_CACHE_SIZE = 10000
+REDIS_TTL = 24 * 60 * 60
+# invalidations kept in the log, processes further behind clear their whole LRU
+INVALIDATION_LOG_SIZE = 10000
+
+CACHE_KEY = "crm:phone_cache"
+SEQUENCE_KEY = "crm:phone_cache_sequence"
+INVALIDATIONS_KEY = "crm:phone_cache_invalidations"
+STATS_KEY = "crm:phone_cache_stats"
+STATS = ("local_hits", "redis_hits", "misses", "invalidations")
+
+_lock = threading.Lock()
+_sites = {}
+
+
+def get_local_state():
+	site = frappe.local.site
+	if site not in _sites:
+		_sites[site] = frappe._dict(entries=OrderedDict(), sequence=None, stats=dict.fromkeys(STATS, 0))
+	return _sites[site]
+
+
+def get_cached(namespace, numbers, resolve):
+	"""
+	Return `{number: value}` of E.164 `numbers` in `namespace`.
+
+	Numbers cached neither in this process nor in redis are resolved with
+	`resolve(numbers) -> {number: value}` and cached in both. Values must be JSON
+	serializable; None is cached as well, for numbers without a record.
+	"""
+	numbers = list(dict.fromkeys(numbers))
+	if not numbers:
+		return {}
+
+	state = get_local_state()
+	sync_local_cache(state)
+
+	res = {}
+	with _lock:
+		for number in numbers:
+			key = (namespace, number)
+			if key in state.entries:
+				state.entries.move_to_end(key)
+				res[number] = state.entries[key]
+	count(state, "local_hits", len(res))
+
+	missing = [number for number in numbers if number not in res]
+	if not missing:
+		return res
+
+	found = {}
+	for number, value in zip(
+		missing, frappe.cache.mget([get_key(namespace, n) for n in missing]), strict=True
+	):
+		if value is not None:
+			found[number] = json.loads(value)
+	count(state, "redis_hits", len(found))
+
+	if unresolved := [number for number in missing if number not in found]:
+		resolved = resolve(unresolved)
+		count(state, "misses", len(unresolved))
+		pipeline = frappe.cache.pipeline()
+		for number in unresolved:
+			found[number] = resolved.get(number)
+			pipeline.set(get_key(namespace, number), json.dumps(found[number], default=str), ex=REDIS_TTL)
+		pipeline.execute()
+
+	with _lock:
+		for number, value in found.items():
+			state.entries[(namespace, number)] = value
+		while len(state.entries) > LOCAL_CACHE_SIZE:
+			state.entries.popitem(last=False)
+
+	res.update(found)
+	return res
+
+
+def count(state, stat, value):
+	with _lock:
+		state.stats[stat] += value
+
+
+def get_key(namespace, number):
+	return frappe.cache.make_key(f"{CACHE_KEY}:{namespace}:{number}")
+
+
+def sync_local_cache(state):
+	"""Evict numbers invalidated by other processes, and flush pending stats, in one round trip"""
+	pipeline = frappe.cache.pipeline()
+	with _lock:
+		for stat, value in state.stats.items():
+			if value:
+				pipeline.hincrby(frappe.cache.make_key(STATS_KEY), stat, value)
+		state.stats = dict.fromkeys(STATS, 0)
+	pipeline.get(frappe.cache.make_key(SEQUENCE_KEY))
+	sequence = cint(pipeline.execute()[-1])
+
+	if sequence == state.sequence:
+		return
+
+	invalidated = None
+	if state.sequence is not None and state.sequence < sequence <= state.sequence + INVALIDATION_LOG_SIZE:
+		invalidated = frappe.cache.zrangebyscore(
+			frappe.cache.make_key(INVALIDATIONS_KEY), state.sequence + 1, sequence
+		)
+
+	with _lock:
+		if invalidated is None:
+			state.entries.clear()
+		else:
+			evict(state, [frappe.safe_decode(number) for number in invalidated])
+		state.sequence = sequence
+
+
+def evict(state, numbers):
+	for number in numbers:
+		for namespace in NAMESPACES:
+			state.entries.pop((namespace, number), None)
+
+
+def invalidate(numbers):
+	"""Drop cached resolutions of E.164 `numbers` in all processes"""
+	numbers = [number for number in set(numbers) if number]
+	if not numbers:
+		return
+
+	frappe.cache.delete(*[get_key(namespace, number) for namespace in NAMESPACES for number in numbers])
+	sequence = frappe.cache.incr(frappe.cache.make_key(SEQUENCE_KEY))
+
+	invalidations_key = frappe.cache.make_key(INVALIDATIONS_KEY)
+	pipeline = frappe.cache.pipeline()
+	pipeline.zadd(invalidations_key, {number: sequence for number in numbers})
+	pipeline.zremrangebyscore(invalidations_key, 0, sequence - INVALIDATION_LOG_SIZE)
+	pipeline.hincrby(frappe.cache.make_key(STATS_KEY), "invalidations", len(numbers))
+	pipeline.execute()
+
+	state = get_local_state()
+	with _lock:
+		evict(state, numbers)
+
+
+def clear_phone_cache(doc, method=None):
+	"""
+	Invalidate the numbers a saved or deleted Contact, CRM Lead or CRM Deal resolves from,
+	called from doc events
+	"""
+	numbers = get_affected_numbers(doc)
+	if doc_before_save := doc.get_doc_before_save():
+		numbers |= get_affected_numbers(doc_before_save)
+
+	if numbers:
+		# after commit, so that a concurrent lookup can not cache the state being replaced
+		frappe.db.after_commit.add(lambda: invalidate(numbers))
+
+
+def get_affected_numbers(doc):
+	if doc.doctype == "Contact":
+		return {phone.get("normalized_phone") for phone in doc.get("phone_nos") or []}
+
+	numbers = {doc.get("normalized_mobile_no")}
+	if doc.doctype == "CRM Deal":
+		# a deal is part of the resolution of the numbers of its primary contact
+		if contacts := [d.contact for d in doc.get("contacts") or [] if d.is_primary]:
+			numbers.update(
+				frappe.get_all(
+					"Contact Phone",
+					filters={"parenttype": "Contact", "parent": ("in", contacts)},
+					pluck="normalized_phone",
+				)
+			)
+	return numbers
+
+
+@frappe.whitelist()
+def get_phone_cache_stats():
+	"""Return hit and miss counts of the phone cache across all processes of this site"""
+	frappe.only_for("System Manager")
+
+	pipeline = frappe.cache.pipeline()
+	pipeline.hgetall(frappe.cache.make_key(STATS_KEY))
+	stats = {frappe.safe_decode(k): cint(v) for k, v in (pipeline.execute()[0] or {}).items()}
+	stats = {stat: stats.get(stat, 0) for stat in STATS}
+	lookups = stats["local_hits"] + stats["redis_hits"] + stats["misses"]
+	stats["hit_ratio"] = round((stats["local_hits"] + stats["redis_hits"]) / lookups, 4) if lookups else 0
+	stats["local_entries"] = len(get_local_state().entries)
+	return stats
+
+
+@frappe.whitelist(methods=["POST"])
+def reset_phone_cache_stats():
+	frappe.only_for("System Manager")
+	frappe.cache.delete(frappe.cache.make_key(STATS_KEY))
@@ -0,0 +1,89 @@
+import random
+from unittest.mock import patch
+
+import frappe
+from frappe.tests import IntegrationTestCase
+
+from crm.api.whatsapp import get_lead_or_deal_from_number
+from crm.integrations.api import get_contact_by_phone_number, get_contacts_by_phone_numbers
+from crm.patches.v1_0.set_normalized_phone_numbers import execute as set_normalized_phone_numbers
+
+
+def get_mobile_no():
+	"""A new Indian mobile number, so that no resolution of it is cached yet"""
+	return "9" + "".join(random.choices("0123456789", k=9))
+
+
+class TestPhoneNumberLookup(IntegrationTestCase):
+	def setUp(self):
+		frappe.set_user("Administrator")
+		self.contact_no = get_mobile_no()
+		self.lead_no = get_mobile_no()
+		self.contact = frappe.get_doc(
+			{
+				"doctype": "Contact",
+				"first_name": "Lookup",
+				"phone_nos": [
+					{"phone": f"+91 {self.contact_no[:5]} {self.contact_no[5:]}", "is_primary_mobile_no": 1}
+				],
+			}
+		).insert(ignore_permissions=True)
+		self.lead = frappe.get_doc(
+			{"doctype": "CRM Lead", "first_name": "Lookup", "mobile_no": f"0{self.lead_no}"}
+		).insert(ignore_permissions=True)
+
+	def tearDown(self):
+		frappe.db.rollback()
+
+	def test_normalized_numbers_are_set_on_save(self):
+		self.assertEqual(self.contact.phone_nos[0].normalized_phone, f"+91{self.contact_no}")
+		self.assertEqual(
+			frappe.db.get_value("CRM Lead", self.lead.name, "normalized_mobile_no"), f"+91{self.lead_no}"
+		)
+
+		self.lead.mobile_no = f"+91-{self.contact_no}"
+		self.lead.save(ignore_permissions=True)
+		self.assertEqual(self.lead.normalized_mobile_no, f"+91{self.contact_no}")
+
+		self.lead.mobile_no = ""
+		self.lead.save(ignore_permissions=True)
+		self.assertIsNone(self.lead.normalized_mobile_no)
+
+		deal = frappe.get_doc(
+			{"doctype": "CRM Deal", "deal_name": "Lookup", "mobile_no": f"+91 {self.lead_no}"}
+		).insert(ignore_permissions=True)
+		self.assertEqual(deal.normalized_mobile_no, f"+91{self.lead_no}")
+
+	def test_patch_backfills_normalized_numbers(self):
+		phone = self.contact.phone_nos[0].name
+		frappe.db.set_value("Contact Phone", phone, "normalized_phone", None, update_modified=False)
+		frappe.db.set_value("CRM Lead", self.lead.name, "normalized_mobile_no", None, update_modified=False)
+
+		with patch.object(frappe.db, "commit"):
+			set_normalized_phone_numbers()
+
+		self.assertEqual(
+			frappe.db.get_value("Contact Phone", phone, "normalized_phone"), f"+91{self.contact_no}"
+		)
+		self.assertEqual(
+			frappe.db.get_value("CRM Lead", self.lead.name, "normalized_mobile_no"), f"+91{self.lead_no}"
+		)
+
+	def test_lookup_matches_any_format(self):
+		for number in (
+			f"+91{self.contact_no}",
+			f"+91 {self.contact_no}",
+			f"0{self.contact_no}",
+			f"({self.contact_no[:3]}) {self.contact_no[3:6]}-{self.contact_no[6:]}",
+		):
+			self.assertEqual(get_contact_by_phone_number(number).get("name"), self.contact.name, number)
+
+		unknown = get_mobile_no()
+		contacts = get_contacts_by_phone_numbers([self.lead_no, f"+91 {self.lead_no}", unknown])
+		self.assertEqual(contacts[self.lead_no].get("lead"), self.lead.name)
+		self.assertEqual(contacts[f"+91 {self.lead_no}"].get("lead"), self.lead.name)
+		self.assertEqual(contacts[unknown], {"mobile_no": unknown})
+
+	def test_whatsapp_number_without_plus_matches(self):
+		self.assertEqual(get_lead_or_deal_from_number(f"91{self.lead_no}"), (self.lead.name, "CRM Lead"))
+		self.assertEqual(get_lead_or_deal_from_number(f"+91 {self.lead_no}"), (self.lead.name, "CRM Lead"))
@@ -0,0 +1,145 @@
+import random
+from unittest.mock import patch
+
+import frappe
+from frappe.tests import IntegrationTestCase
+
+from crm.integrations import phone_cache
+from crm.integrations.phone_cache import get_cached, get_key, get_local_state, invalidate
+
+
+def get_number():
+	"""A new E.164 number, so that no resolution of it is cached yet"""
+	return "+919" + "".join(random.choices("0123456789", k=9))
+
+
+class Resolver:
+	"""Resolves numbers to `{"name": number}` and records the numbers it was asked for"""
+
+	def __init__(self):
+		self.calls = []
+
+	def __call__(self, numbers):
+		self.calls.extend(numbers)
+		return {number: {"name": number} for number in numbers}
+
+
+class TestPhoneCache(IntegrationTestCase):
+	def setUp(self):
+		frappe.set_user("Administrator")
+		frappe.db.after_commit.reset()
+		self.resolve = Resolver()
+
+	def tearDown(self):
+		frappe.db.after_commit.reset()
+		frappe.db.rollback()
+
+	def switch_worker(self, state=None):
+		"""Swap this process's LRU for `state`, or a new one, to act as another worker"""
+		site = frappe.local.site
+		previous = phone_cache._sites.pop(site, None)
+		if state is not None:
+			phone_cache._sites[site] = state
+		get_local_state()
+		return previous
+
+	def lookup(self, *numbers):
+		return get_cached("contact", numbers, self.resolve)
+
+	def test_local_hits_and_misses(self):
+		first, second = get_number(), get_number()
+		self.assertEqual(self.lookup(first), {first: {"name": first}})
+		self.assertEqual(self.lookup(first, second), {first: {"name": first}, second: {"name": second}})
+		self.assertEqual(self.resolve.calls, [first, second])
+		self.assertIn(("contact", first), get_local_state().entries)
+
+		# served from redis by a worker that has not seen the numbers
+		self.switch_worker()
+		self.assertEqual(self.lookup(first, second), {first: {"name": first}, second: {"name": second}})
+		self.assertEqual(self.resolve.calls, [first, second])
+
+	def test_numbers_without_record_are_cached(self):
+		number = get_number()
+		self.assertEqual(get_cached("contact", [number], self.resolve_nothing), {number: None})
+		self.assertEqual(get_cached("contact", [number], self.resolve_nothing), {number: None})
+		self.assertEqual(self.resolve.calls, [number])
+
+	def resolve_nothing(self, numbers):
+		self.resolve.calls.extend(numbers)
+		return {}
+
+	@patch("crm.integrations.phone_cache.LOCAL_CACHE_SIZE", 2)
+	def test_least_recently_used_is_evicted(self):
+		self.switch_worker()
+		first, second, third = get_number(), get_number(), get_number()
+		self.lookup(first)
+		self.lookup(second)
+		self.lookup(first)
+		self.lookup(third)
+
+		entries = get_local_state().entries
+		self.assertEqual(list(entries), [("contact", first), ("contact", third)])
+
+	def test_invalidations_are_replayed_by_other_workers(self):
+		first, second = get_number(), get_number()
+		self.lookup(first, second)
+
+		worker = self.switch_worker()
+		invalidate([first])
+		self.switch_worker(worker)
+
+		self.assertIn(("contact", first), worker.entries)
+		self.lookup(first, second)
+		# only the invalidated number is resolved again, the other is still in this worker's LRU
+		self.assertEqual(self.resolve.calls, [first, second, first])
+		self.assertIsNotNone(frappe.cache.get(get_key("contact", first)))
+
+	@patch("crm.integrations.phone_cache.INVALIDATION_LOG_SIZE", 1)
+	def test_workers_behind_the_log_clear_their_cache(self):
+		first, second = get_number(), get_number()
+		self.lookup(first, second)
+
+		worker = self.switch_worker()
+		invalidate([get_number()])
+		invalidate([get_number()])
+		self.switch_worker(worker)
+
+		self.lookup(first)
+		self.assertNotIn(("contact", second), get_local_state().entries)
+
+	def assert_invalidated_on_commit(self, number, change):
+		self.lookup(number)
+		resolved = self.resolve.calls.count(number)
+		change()
+		self.lookup(number)
+		self.assertEqual(self.resolve.calls.count(number), resolved)
+
+		frappe.db.after_commit.run()
+		self.lookup(number)
+		self.assertEqual(self.resolve.calls.count(number), resolved + 1)
+
+	def test_contact_changes_clear_its_numbers(self):
+		number = get_number()
+		contact = frappe.get_doc({"doctype": "Contact", "first_name": "Cache"})
+		contact.append("phone_nos", {"phone": number, "is_primary_mobile_no": 1})
+		self.assert_invalidated_on_commit(number, lambda: contact.insert(ignore_permissions=True))
+
+		# the number it had before the change as well
+		contact.phone_nos[0].phone = get_number()
+		self.assert_invalidated_on_commit(number, lambda: contact.save(ignore_permissions=True))
+
+	def test_lead_changes_clear_its_number(self):
+		number = get_number()
+		lead = frappe.get_doc({"doctype": "CRM Lead", "first_name": "Cache", "mobile_no": number})
+		self.assert_invalidated_on_commit(number, lambda: lead.insert(ignore_permissions=True))
+
+		# conversion only sets `converted` with db_set
+		self.assert_invalidated_on_commit(number, lambda: lead.db_set("converted", 1))
+
+	def test_deal_changes_clear_its_number(self):
+		number = get_number()
+		deal = frappe.get_doc(
+			{"doctype": "CRM Deal", "deal_name": "Cache", "mobile_no": number, "status": "Qualification"}
+		)
+		self.assert_invalidated_on_commit(number, lambda: deal.insert(ignore_permissions=True))
+		self.assert_invalidated_on_commit(number, lambda: deal.delete(ignore_permissions=True))
@@ -0,0 +1,5 @@
+from crm.utils.indexes import add_crm_indexes
+
+
+def execute():
+	add_crm_indexes()
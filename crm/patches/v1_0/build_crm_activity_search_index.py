@@ -0,0 +1,9 @@
+from crm.fcrm.doctype.crm_activity_search.crm_activity_search import (
+	add_fulltext_index,
+	build_search_index,
+)
+
+
+def execute():
+	add_fulltext_index()
+	build_search_index()
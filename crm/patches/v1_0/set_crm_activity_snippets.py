@@ -0,0 +1,5 @@
+from crm.fcrm.doctype.crm_activity.crm_activity import backfill_snippets
+
+
+def execute():
+	backfill_snippets()
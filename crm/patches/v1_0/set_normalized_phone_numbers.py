@@ -0,0 +1,34 @@
+import frappe
+
+from crm.install import add_contact_phone_custom_fields
+from crm.utils import normalize_phone_numbers
+
+
+def execute():
+	add_contact_phone_custom_fields()
+
+	for doctype, field, normalized_field in (
+		("CRM Lead", "mobile_no", "normalized_mobile_no"),
+		("CRM Deal", "mobile_no", "normalized_mobile_no"),
+		("Contact Phone", "phone", "normalized_phone"),
+	):
+		set_normalized_numbers(doctype, field, normalized_field)
+
+
+def set_normalized_numbers(doctype, field, normalized_field, chunk_size=1000):
+	last = ""
+	while rows := frappe.get_all(
+		doctype,
+		filters={field: ("is", "set"), "name": (">", last)},
+		fields=["name", field],
+		order_by="name asc",
+		limit=chunk_size,
+	):
+		normalized = normalize_phone_numbers([row[field] for row in rows])
+		updates = {
+			row.name: {normalized_field: normalized[row[field]]} for row in rows if normalized[row[field]]
+		}
+		if updates:
+			frappe.db.bulk_update(doctype, updates, update_modified=False)
+		frappe.db.commit()
+		last = rows[-1].name
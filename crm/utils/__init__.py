@@ -1,33 +1,113 @@
+from dataclasses import dataclass, field
+from functools import lru_cache
+
 import phonenumbers
 from frappe.utils import floor
 from phonenumbers import NumberParseException
 from phonenumbers import PhoneNumberFormat as PNF
 
 
-def parse_phone_number(phone_number, default_country="IN"):
+@dataclass(frozen=True, slots=True)
+class ParsedPhoneNumber:
+	"""
+	A parsed phone number, as returned by `get_parsed_phone_number`.
+
+	Results are shared between callers, so other formats than E.164 are computed on
+	access instead of on parse.
+	"""
+
+	e164: str
+	is_valid: bool
+	country: str | None
+	type: int
+	number: phonenumbers.PhoneNumber = field(repr=False, compare=False)
+
+	@property
+	def country_code(self):
+		return self.number.country_code
+
+	@property
+	def national_number(self):
+		return str(self.number.national_number)
+
+	@property
+	def is_possible(self):
+		return phonenumbers.is_possible_number(self.number)
+
+	def format(self, number_format):
+		"""Format the number, `number_format` being one of `phonenumbers.PhoneNumberFormat`"""
+		return phonenumbers.format_number(self.number, number_format)
+
+
+@lru_cache(maxsize=16384)
+def get_parsed_phone_number(phone_number, region="IN"):
+	"""
+	Parse `phone_number`, memoized by number and region.
+
+	Returns a `ParsedPhoneNumber`, or None if the number can not be parsed.
+	"""
 	try:
-		# Parse the number
-		number = phonenumbers.parse(phone_number, default_country)
-
-		# Get various information about the number
-		result = {
-			"is_valid": phonenumbers.is_valid_number(number),
-			"country_code": number.country_code,
-			"national_number": str(number.national_number),
-			"formats": {
-				"international": phonenumbers.format_number(number, PNF.INTERNATIONAL),
-				"national": phonenumbers.format_number(number, PNF.NATIONAL),
-				"E164": phonenumbers.format_number(number, PNF.E164),
-				"RFC3966": phonenumbers.format_number(number, PNF.RFC3966),
-			},
-			"type": phonenumbers.number_type(number),
-			"country": phonenumbers.region_code_for_number(number),
-			"is_possible": phonenumbers.is_possible_number(number),
-		}
-
-		return {"success": True, **result}
-	except NumberParseException as e:
-		return {"success": False, "error": str(e)}
+		number = phonenumbers.parse(phone_number, region)
+	except NumberParseException:
+		return None
+
+	return ParsedPhoneNumber(
+		e164=phonenumbers.format_number(number, PNF.E164),
+		is_valid=phonenumbers.is_valid_number(number),
+		country=phonenumbers.region_code_for_number(number),
+		type=phonenumbers.number_type(number),
+		number=number,
+	)
+
+
+def parse_phone_number(phone_number, default_country="IN"):
+	number = get_parsed_phone_number(phone_number, default_country)
+	if not number:
+		try:
+			phonenumbers.parse(phone_number, default_country)
+		except NumberParseException as e:
+			return {"success": False, "error": str(e)}
+
+	return {
+		"success": True,
+		"is_valid": number.is_valid,
+		"country_code": number.country_code,
+		"national_number": number.national_number,
+		"formats": {
+			"international": number.format(PNF.INTERNATIONAL),
+			"national": number.format(PNF.NATIONAL),
+			"E164": number.e164,
+			"RFC3966": number.format(PNF.RFC3966),
+		},
+		"type": number.type,
+		"country": number.country,
+		"is_possible": number.is_possible,
+	}
+
+
+def get_normalized_phone_number(phone_number, default_country="IN"):
+	"""
+	E.164 form of `phone_number`, as stored next to phone fields for indexed lookups.
+
+	Returns None if the number can not be parsed.
+	"""
+	if not phone_number:
+		return None
+
+	number = get_parsed_phone_number(phone_number, default_country)
+	return number.e164 if number else None
+
+
+def normalize_phone_numbers(phone_numbers, default_country="IN"):
+	"""
+	Batch version of `get_normalized_phone_number`, for imports and backfills.
+
+	:return: `{phone_number: E.164 number or None}`, each distinct number parsed once
+	"""
+	return {
+		phone_number: get_normalized_phone_number(phone_number, default_country)
+		for phone_number in dict.fromkeys(phone_numbers)
+	}
 
 
 def are_same_phone_number(number1, number2, default_region="IN", validate=True):
@@ -42,24 +122,17 @@ def are_same_phone_number(number1, number2, default_region="IN", validate=True):
 	Returns:
 	    bool: True if numbers are same, False otherwise
 	"""
-	try:
-		# Parse both numbers
-		parsed1 = phonenumbers.parse(number1, default_region)
-		parsed2 = phonenumbers.parse(number2, default_region)
-
-		# Check if both numbers are valid
-		if validate and not (phonenumbers.is_valid_number(parsed1) and phonenumbers.is_valid_number(parsed2)):
-			return False
-
-		# Convert both to E164 format and compare
-		formatted1 = phonenumbers.format_number(parsed1, phonenumbers.PhoneNumberFormat.E164)
-		formatted2 = phonenumbers.format_number(parsed2, phonenumbers.PhoneNumberFormat.E164)
-
-		return formatted1 == formatted2
+	parsed1 = get_parsed_phone_number(number1, default_region)
+	parsed2 = get_parsed_phone_number(number2, default_region)
+	if not parsed1 or not parsed2:
+		return False
 
-	except phonenumbers.NumberParseException:
+	# Check if both numbers are valid
+	if validate and not (parsed1.is_valid and parsed2.is_valid):
 		return False
 
+	return parsed1.e164 == parsed2.e164
+
 
 def seconds_to_duration(seconds):
 	if not seconds:
@@ -0,0 +1,145 @@
+"""
+Lightweight extraction of the few tags CRM reads from stored HTML.
+
+Mentions in comments, the link of an attachment log and the editor div of an email
+signature are found with a streaming `HTMLParser` that stops as soon as it has what it
+needs, instead of building a full BeautifulSoup tree.
+"""
+
+from functools import lru_cache
+from html.parser import HTMLParser
+
+import frappe
+
+
+class StopParsing(Exception):
+	pass
+
+
+class MentionParser(HTMLParser):
+	def __init__(self):
+		super().__init__(convert_charrefs=True)
+		self.mentions = []
+
+	def handle_starttag(self, tag, attrs):
+		if tag != "span":
+			return
+		attrs = dict(attrs)
+		if attrs.get("data-type") == "mention":
+			self.mentions.append(frappe._dict(full_name=attrs.get("data-label"), email=attrs.get("data-id")))
+
+
+class AnchorParser(HTMLParser):
+	"""Finds the first `<a>` and its text, then stops"""
+
+	def __init__(self):
+		super().__init__(convert_charrefs=True)
+		self.href = None
+		self.text = []
+		self.depth = 0
+
+	def handle_starttag(self, tag, attrs):
+		if self.depth:
+			if tag == "a":
+				self.depth += 1
+			return
+		if tag == "a":
+			self.href = dict(attrs).get("href") or ""
+			self.depth = 1
+
+	def handle_endtag(self, tag):
+		if self.depth and tag == "a":
+			self.depth -= 1
+			if not self.depth:
+				raise StopParsing
+
+	def handle_data(self, data):
+		if self.depth:
+			self.text.append(data)
+
+
+class DivParser(HTMLParser):
+	"""Finds the inner HTML of the first `<div>` with exactly the given class, then stops"""
+
+	def __init__(self, html, css_class):
+		super().__init__(convert_charrefs=True)
+		self.html = html
+		self.css_class = css_class
+		self.line_offsets = get_line_offsets(html)
+		self.start = None
+		self.depth = 0
+		self.inner_html = None
+
+	def position(self):
+		line, column = self.getpos()
+		return self.line_offsets[line - 1] + column
+
+	def handle_starttag(self, tag, attrs):
+		if tag != "div":
+			return
+		if self.depth:
+			self.depth += 1
+		elif dict(attrs).get("class") == self.css_class:
+			self.start = self.position() + len(self.get_starttag_text())
+			self.depth = 1
+
+	def handle_endtag(self, tag):
+		if self.depth and tag == "div":
+			self.depth -= 1
+			if not self.depth:
+				self.inner_html = self.html[self.start : self.position()]
+				raise StopParsing
+
+
+def get_line_offsets(text):
+	"""Offset of every line start, lines counted the way `HTMLParser.getpos` does"""
+	offsets = [0]
+	position = text.find("\n")
+	while position != -1:
+		offsets.append(position + 1)
+		position = text.find("\n", position + 1)
+	return offsets
+
+
+def feed(parser, html):
+	try:
+		parser.feed(html)
+		parser.close()
+	except StopParsing:
+		pass
+	return parser
+
+
+def extract_mentions(html):
+	"""Return `full_name` and `email` of every mention span in `html`"""
+	if not html or "mention" not in html:
+		return []
+	return feed(MentionParser(), html).mentions
+
+
+@lru_cache(maxsize=4096)
+def extract_first_anchor(html):
+	"""
+	Return `(href, text)` of the first link in `html`, or None if there is none.
+
+	Memoized, as it is used on immutable content like attachment logs.
+	"""
+	if not html or "<a" not in html:
+		return None
+
+	parser = feed(AnchorParser(), html)
+	if parser.href is None:
+		return None
+	return parser.href, "".join(parser.text)
+
+
+def extract_div(html, css_class):
+	"""Return the inner HTML of the first div with class `css_class`, or None"""
+	if not html or css_class not in html:
+		return None
+
+	parser = feed(DivParser(html, css_class), html)
+	if parser.inner_html is None and parser.depth:
+		# unclosed div, its content runs to the end
+		return html[parser.start :]
+	return parser.inner_html
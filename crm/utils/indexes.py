@@ -0,0 +1,97 @@
+"""
+Composite indexes for the filters used by the timeline, counter and notification paths.
+
+Each index matches the exact filter shape of the queries listed next to it. They are
+created by the `add_crm_indexes` patch and re-checked after every migrate, since
+schema syncs of core doctypes do not know about them.
+"""
+
+import frappe
+
+# doctype -> list of (index name, columns)
+CRM_INDEXES = {
+	# get_linked_records, activity counters
+	"CRM Task": [("crm_reference_docname_doctype", ("reference_docname", "reference_doctype"))],
+	"FCRM Note": [("crm_reference_docname_doctype", ("reference_docname", "reference_doctype"))],
+	"CRM Call Log": [("crm_reference_docname_doctype", ("reference_docname", "reference_doctype"))],
+	# call logs linked to a lead/deal in get_linked_records
+	"Dynamic Link": [("crm_link_name_parenttype", ("link_name", "parenttype"))],
+	# timeline and email counts
+	"Communication": [
+		("crm_reference_communication_type", ("reference_doctype", "reference_name", "communication_type"))
+	],
+	# comment counts
+	"Comment": [("crm_reference_comment_type", ("reference_doctype", "reference_name", "comment_type"))],
+	# timeline feed range scan in get_activities
+	"CRM Activity": [("crm_reference_creation", ("reference_name", "reference_doctype", "creation"))],
+	# get_notifications, mark_as_read
+	"CRM Notification": [("crm_to_user_read", ("to_user", "read"))],
+}
+
+
+def add_crm_indexes():
+	for doctype, indexes in CRM_INDEXES.items():
+		if not frappe.db.table_exists(doctype):
+			continue
+		for index_name, columns in indexes:
+			# quoted, as some columns (e.g. `read`) are reserved words
+			quote = '"' if frappe.db.db_type == "postgres" else "`"
+			frappe.db.add_index(doctype, [f"{quote}{column}{quote}" for column in columns], index_name)
+
+
+@frappe.whitelist()
+def get_index_report():
+	"""
+	Report the state of every managed index.
+
+	`status` is `missing` if the index does not exist, otherwise `used` or `unused`
+	based on the database's index usage statistics, or `unknown` if those are not
+	available (performance_schema disabled or an unsupported database).
+	"""
+	frappe.only_for("System Manager")
+
+	report = []
+	for doctype, indexes in CRM_INDEXES.items():
+		table = f"tab{doctype}"
+		usage = get_index_usage(table)
+		for index_name, columns in indexes:
+			if not frappe.db.has_index(table, index_name):
+				status = "missing"
+			elif usage is None:
+				status = "unknown"
+			else:
+				status = "used" if usage.get(index_name) else "unused"
+
+			report.append(
+				{
+					"doctype": doctype,
+					"index_name": index_name,
+					"columns": list(columns),
+					"status": status,
+					"reads": (usage or {}).get(index_name),
+				}
+			)
+
+	return report
+
+
+def get_index_usage(table):
+	"""Return `{index_name: rows read}` since server start, or None if it can not be determined"""
+	try:
+		if frappe.db.db_type == "postgres":
+			result = frappe.db.sql(
+				"select indexrelname, idx_scan from pg_stat_user_indexes where relname = %s", table
+			)
+		else:
+			result = frappe.db.sql(
+				"""
+				select index_name, count_read
+				from performance_schema.table_io_waits_summary_by_index_usage
+				where object_schema = database() and object_name = %s and index_name is not null
+				""",
+				table,
+			)
+	except Exception:
+		return None
+
+	return {index_name: reads for index_name, reads in result} or None
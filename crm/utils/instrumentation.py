@@ -0,0 +1,192 @@
+"""
+Per-request instrumentation of the whitelisted `crm.*` methods.
+
+Enable it with `"crm_instrumentation": 1` in site config. For every call to a `crm.*`
+method it records wall time per named phase, SQL query count, rows returned and
+payload size. The numbers are sent back in the `Server-Timing` and `X-CRM-Instrumentation`
+response headers and aggregated per endpoint into latency histograms in redis, readable
+with `get_endpoint_stats`.
+"""
+
+import json
+import time
+
+import frappe
+
+# upper bounds (in ms) of the latency histogram buckets
+LATENCY_BUCKETS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+STATS_KEY = "crm:instrumentation"
+API_METHOD_PATHS = ("/api/method/", "/api/v1/method/", "/api/v2/method/")
+
+
+def is_enabled():
+	return bool(frappe.conf.get("crm_instrumentation"))
+
+
+def get_current():
+	return getattr(frappe.local, "crm_instrumentation", None)
+
+
+def before_request():
+	endpoint = get_endpoint()
+	if not endpoint.startswith("crm.") or not is_enabled():
+		return
+
+	now = time.perf_counter()
+	frappe.local.crm_instrumentation = frappe._dict(
+		endpoint=endpoint,
+		start=now,
+		last_checkpoint=now,
+		sql_count=0,
+		last_sql_count=0,
+		phases={},
+	)
+	count_queries()
+
+
+def get_endpoint():
+	"""
+	Method called by the current request. `frappe.form_dict.cmd` of `/api/method/` calls
+	is only set once the request is handled, after `before_request`.
+	"""
+	path = frappe.request.path if getattr(frappe.local, "request", None) else ""
+	for prefix in API_METHOD_PATHS:
+		if path.startswith(prefix):
+			return path[len(prefix) :].strip("/")
+	return frappe.form_dict.get("cmd") or ""
+
+
+def count_queries():
+	"""Wrap `frappe.db.sql` of this request's connection to count queries"""
+	sql = frappe.db.sql
+
+	def counted_sql(*args, **kwargs):
+		if current := get_current():
+			current.sql_count += 1
+		return sql(*args, **kwargs)
+
+	frappe.db.sql = counted_sql
+
+
+def checkpoint(name):
+	"""
+	Attribute the time and queries since the previous checkpoint to phase `name`.
+
+	Does nothing unless instrumentation is enabled for the current request.
+	"""
+	if not (current := get_current()):
+		return
+
+	now = time.perf_counter()
+	phase = current.phases.setdefault(name, {"ms": 0.0, "sql_count": 0})
+	phase["ms"] += (now - current.last_checkpoint) * 1000
+	phase["sql_count"] += current.sql_count - current.last_sql_count
+	current.last_checkpoint = now
+	current.last_sql_count = current.sql_count
+
+
+def after_request(response, request):
+	if not (current := get_current()):
+		return
+
+	frappe.local.crm_instrumentation = None
+	total_ms = (time.perf_counter() - current.start) * 1000
+	payload_bytes = 0 if response.direct_passthrough else len(response.get_data())
+	stats = {
+		"endpoint": current.endpoint,
+		"ms": round(total_ms, 2),
+		"sql_count": current.sql_count,
+		"rows": get_row_count(frappe.local.response.get("message")),
+		"payload_bytes": payload_bytes,
+		"phases": {
+			name: {"ms": round(phase["ms"], 2), "sql_count": phase["sql_count"]}
+			for name, phase in current.phases.items()
+		},
+	}
+
+	server_timing = [f"{name};dur={phase['ms']}" for name, phase in stats["phases"].items()]
+	server_timing.append(f"total;dur={stats['ms']}")
+	response.headers["Server-Timing"] = ", ".join(server_timing)
+	response.headers["X-CRM-Instrumentation"] = json.dumps(stats, separators=(",", ":"))
+
+	record_stats(stats)
+
+
+def get_row_count(message):
+	if isinstance(message, list):
+		return len(message)
+	if isinstance(message, dict) and isinstance(message.get("data"), list):
+		return len(message["data"])
+	return 0
+
+
+def record_stats(stats):
+	"""Add a request to the aggregated histogram of its endpoint"""
+	bucket = next((f"le_{b}" for b in LATENCY_BUCKETS if stats["ms"] <= b), "le_inf")
+	key = frappe.cache.make_key(f"{STATS_KEY}:{stats['endpoint']}")
+
+	pipeline = frappe.cache.pipeline()
+	pipeline.hincrby(key, "count", 1)
+	pipeline.hincrby(key, bucket, 1)
+	pipeline.hincrbyfloat(key, "total_ms", stats["ms"])
+	pipeline.hincrby(key, "sql_count", stats["sql_count"])
+	pipeline.hincrby(key, "rows", stats["rows"])
+	pipeline.hincrby(key, "payload_bytes", stats["payload_bytes"])
+	for name, phase in stats["phases"].items():
+		pipeline.hincrbyfloat(key, f"phase:{name}:ms", phase["ms"])
+		pipeline.hincrby(key, f"phase:{name}:sql_count", phase["sql_count"])
+	pipeline.execute()
+
+
+@frappe.whitelist()
+def get_endpoint_stats(endpoint=None):
+	"""Return aggregated latency histograms and averages per instrumented endpoint of this site"""
+	frappe.only_for("System Manager")
+
+	prefix = frappe.safe_decode(frappe.cache.make_key(f"{STATS_KEY}:"))
+	keys = [f"{prefix}{endpoint}"] if endpoint else get_stats_keys()
+
+	# raw hashes, `frappe.cache.hgetall` would prefix the keys again and unpickle the values
+	keys = [frappe.safe_decode(key) for key in keys]
+	pipeline = frappe.cache.pipeline()
+	for key in keys:
+		pipeline.hgetall(key)
+
+	res = {}
+	for key, fields in zip(keys, pipeline.execute(), strict=True):
+		values = {frappe.safe_decode(k): float(frappe.safe_decode(v)) for k, v in (fields or {}).items()}
+		count = values.get("count")
+		if not count:
+			continue
+
+		phases = {}
+		for field, value in values.items():
+			if field.startswith("phase:"):
+				_prefix, name, metric = field.split(":")
+				phases.setdefault(name, {})[f"avg_{metric}"] = round(value / count, 2)
+
+		res[key[len(prefix) :]] = {
+			"count": int(count),
+			"histogram_ms": {
+				b: int(values.get(f"le_{b}", 0)) for b in [*[str(b) for b in LATENCY_BUCKETS], "inf"]
+			},
+			"avg_ms": round(values.get("total_ms", 0) / count, 2),
+			"avg_sql_count": round(values.get("sql_count", 0) / count, 2),
+			"avg_rows": round(values.get("rows", 0) / count, 2),
+			"avg_payload_bytes": round(values.get("payload_bytes", 0) / count, 2),
+			"phases": phases,
+		}
+
+	return res
+
+
+@frappe.whitelist(methods=["POST"])
+def reset_endpoint_stats():
+	frappe.only_for("System Manager")
+	if keys := get_stats_keys():
+		frappe.cache.delete(*keys)
+
+
+def get_stats_keys():
+	prefix = frappe.safe_decode(frappe.cache.make_key(f"{STATS_KEY}:"))
+	return frappe.cache.keys(f"{prefix}*")
@@ -0,0 +1,64 @@
+from frappe.tests import UnitTestCase
+
+from crm.utils.html_extract import extract_div, extract_first_anchor, extract_mentions
+
+
+class TestHTMLExtract(UnitTestCase):
+	def test_mentions(self):
+		html = (
+			'<p>Hi <span class="mention" data-type="mention" data-id="jane@example.com" '
+			'data-label="Jane O&#39;Brien">@Jane</span>, see '
+			'<!-- <span data-type="mention" data-id="old@example.com"></span> -->'
+			'<span data-type="mention" data-id="raj@example.com" data-label="Raj">@Raj</span></p>'
+		)
+		self.assertEqual(
+			extract_mentions(html),
+			[
+				{"full_name": "Jane O'Brien", "email": "jane@example.com"},
+				{"full_name": "Raj", "email": "raj@example.com"},
+			],
+		)
+		self.assertEqual(extract_mentions("<p>No mentions</p>"), [])
+		self.assertEqual(extract_mentions(None), [])
+
+	def test_first_anchor(self):
+		self.assertEqual(
+			extract_first_anchor(
+				'<!-- <a href="/old">old</a> --><a href="/files/a.txt">a.txt</a><a href="/b">b</a>'
+			),
+			("/files/a.txt", "a.txt"),
+		)
+		self.assertEqual(
+			extract_first_anchor('<a href="/files/r.pdf?x=1&amp;y=2">R&amp;D <b>plan</b></a>'),
+			("/files/r.pdf?x=1&y=2", "R&D plan"),
+		)
+		self.assertEqual(
+			extract_first_anchor('Added <a href="/files/c.txt">c.txt'), ("/files/c.txt", "c.txt")
+		)
+		self.assertEqual(extract_first_anchor("<a>no link</a>"), ("", "no link"))
+		self.assertIsNone(extract_first_anchor("Removed c.txt"))
+
+	def test_div(self):
+		html = (
+			'<div class="outer"><div class="ProseMirror editor">'
+			"<div><p>Regards</p></div><div>Jane</div>"
+			'</div><div class="ProseMirror editor">second</div></div>'
+		)
+		self.assertEqual(extract_div(html, "ProseMirror editor"), "<div><p>Regards</p></div><div>Jane</div>")
+		# the class has to match exactly
+		self.assertIsNone(extract_div('<div class="ProseMirror editor x">x</div>', "ProseMirror editor"))
+		self.assertIsNone(extract_div("<p>no div</p>", "ProseMirror editor"))
+
+	def test_div_with_comments_and_entities(self):
+		html = '<div class="sig"><!-- </div> -->Tom &amp; Co<br></div>'
+		self.assertEqual(extract_div(html, "sig"), "<!-- </div> -->Tom &amp; Co<br>")
+
+	def test_unclosed_div(self):
+		self.assertEqual(extract_div('<div class="sig"><p>Regards<div>Jane', "sig"), "<p>Regards<div>Jane")
+
+	def test_crlf_input(self):
+		html = '<p>Hi</p>\r\n<div class="sig">\r\n<p>Regards</p>\r\n<div>Jane</div>\r\n</div>\r\n<p>Bye</p>'
+		self.assertEqual(extract_div(html, "sig"), "\r\n<p>Regards</p>\r\n<div>Jane</div>\r\n")
+		self.assertEqual(
+			extract_first_anchor('<p>\r\nAdded\r\n<a href="/a.txt">a\r\n.txt</a>'), ("/a.txt", "a\r\n.txt")
+		)
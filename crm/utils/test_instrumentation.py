@@ -0,0 +1,32 @@
+import frappe
+from frappe.installer import update_site_config
+from frappe.tests.test_api import FrappeAPITestCase
+
+from crm.utils.instrumentation import get_endpoint_stats, reset_endpoint_stats
+
+ENDPOINT = "crm.api.doc.get_data"
+
+
+class TestInstrumentation(FrappeAPITestCase):
+	def setUp(self):
+		frappe.set_user("Administrator")
+		update_site_config("crm_instrumentation", 1)
+		reset_endpoint_stats()
+
+	def tearDown(self):
+		update_site_config("crm_instrumentation", 0)
+		frappe.set_user("Administrator")
+
+	def test_api_method_request_is_recorded(self):
+		response = self.get(
+			f"/api/method/{ENDPOINT}",
+			{"doctype": "CRM Lead", "filters": "{}", "order_by": "modified desc", "sid": self.sid},
+		)
+		self.assertEqual(response.status_code, 200)
+		self.assertIn("total;dur=", response.headers.get("Server-Timing"))
+
+		stats = get_endpoint_stats(ENDPOINT)
+		self.assertEqual(stats[ENDPOINT]["count"], 1)
+		self.assertEqual(sum(stats[ENDPOINT]["histogram_ms"].values()), 1)
+		self.assertGreater(stats[ENDPOINT]["avg_sql_count"], 0)
+		self.assertIn("filters", stats[ENDPOINT]["phases"])
@@ -0,0 +1,89 @@
+from frappe.tests import UnitTestCase
+from phonenumbers import PhoneNumberFormat as PNF
+from phonenumbers import PhoneNumberType
+
+from crm.utils import (
+	ParsedPhoneNumber,
+	are_same_phone_number,
+	get_normalized_phone_number,
+	get_parsed_phone_number,
+	normalize_phone_numbers,
+	parse_phone_number,
+)
+
+
+class TestPhoneNumbers(UnitTestCase):
+	def test_parsed_phone_number(self):
+		number = get_parsed_phone_number("098765 43210")
+		self.assertIsInstance(number, ParsedPhoneNumber)
+		self.assertEqual(number.e164, "+919876543210")
+		self.assertTrue(number.is_valid)
+		self.assertTrue(number.is_possible)
+		self.assertEqual(number.country, "IN")
+		self.assertEqual(number.country_code, 91)
+		self.assertEqual(number.national_number, "9876543210")
+		self.assertEqual(number.type, PhoneNumberType.MOBILE)
+		self.assertEqual(number.format(PNF.INTERNATIONAL), "+91 98765 43210")
+
+	def test_parsing_is_memoized(self):
+		get_parsed_phone_number.cache_clear()
+		number = get_parsed_phone_number("+1 650-253-0000", "US")
+		self.assertIs(get_parsed_phone_number("+1 650-253-0000", "US"), number)
+		self.assertEqual(get_parsed_phone_number.cache_info().hits, 1)
+
+		# the region is part of the key
+		self.assertEqual(get_parsed_phone_number("6502530000", "US").e164, "+16502530000")
+		self.assertEqual(get_parsed_phone_number("6502530000", "IN").e164, "+916502530000")
+
+	def test_e164_output(self):
+		for phone_number in ("+91 98765 43210", "+91-98765-43210", "(+91) 9876543210", "09876543210"):
+			self.assertEqual(get_normalized_phone_number(phone_number), "+919876543210", phone_number)
+		self.assertEqual(get_normalized_phone_number("020 7946 0018", "GB"), "+442079460018")
+
+	def test_invalid_numbers(self):
+		self.assertIsNone(get_parsed_phone_number("not a number"))
+		self.assertIsNone(get_normalized_phone_number("not a number"))
+		self.assertIsNone(get_normalized_phone_number(""))
+		self.assertIsNone(get_normalized_phone_number(None))
+
+		# parses, but is not a valid number
+		number = get_parsed_phone_number("+91 12345")
+		self.assertFalse(number.is_valid)
+		self.assertFalse(are_same_phone_number("+91 12345", "+9112345"))
+		self.assertTrue(are_same_phone_number("+91 12345", "+9112345", validate=False))
+
+		result = parse_phone_number("not a number")
+		self.assertFalse(result["success"])
+		self.assertIn("error", result)
+
+	def test_missing_default_country(self):
+		# without a region only numbers with a country code can be parsed
+		self.assertIsNone(get_parsed_phone_number("9876543210", None))
+		self.assertEqual(get_normalized_phone_number("+919876543210", None), "+919876543210")
+		self.assertFalse(parse_phone_number("9876543210", None)["success"])
+
+	def test_normalize_phone_numbers(self):
+		self.assertEqual(
+			normalize_phone_numbers(["+91 98765 43210", "09876543210", "+91 98765 43210", "invalid", ""]),
+			{
+				"+91 98765 43210": "+919876543210",
+				"09876543210": "+919876543210",
+				"invalid": None,
+				"": None,
+			},
+		)
+
+	def test_parse_phone_number(self):
+		result = parse_phone_number("+91 98765 43210")
+		self.assertTrue(result["success"])
+		self.assertTrue(result["is_valid"])
+		self.assertEqual(result["country"], "IN")
+		self.assertEqual(
+			result["formats"],
+			{
+				"international": "+91 98765 43210",
+				"national": "098765 43210",
+				"E164": "+919876543210",
+				"RFC3966": "tel:+91-98765-43210",
+			},
+		)